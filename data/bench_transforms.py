@@ -0,0 +1,298 @@
+"""Parity check and benchmark: batch transforms vs. per-row Pydantic models.
+
+The transforms in pipeline.py validate whole lists through a TypeAdapter. This
+script keeps copies of the hand-written per-row transforms they replaced (one
+model instance per row, fields mapped inline), asserts the output is identical
+(keys, order, values and types) and times both.
+
+Input is the latest raw archive when one exists (see scrapers/raw_archive.py),
+otherwise a synthetic season of roughly production size:
+
+    python bench_transforms.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+# pipeline builds a Supabase client at import; the transforms never use it.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "unused")
+
+import pipeline as p
+from rates import toi_to_seconds
+from scrapers.raw_archive import read_records
+
+
+def _synthetic_inputs(players=900, games=80, seed=0):
+    rng = random.Random(seed)
+    teams = {"data": [
+        {"teamId": team_id, "seasonId": 20252026, "teamFullName": f"Team {team_id}", "gamesPlayed": games,
+         "wins": rng.randint(20, 50), "losses": rng.randint(20, 40), "otLosses": rng.randint(0, 12),
+         "points": rng.randint(50, 110), "goalsFor": rng.randint(180, 300), "goalsAgainst": rng.randint(180, 300),
+         "goalsForPerGame": rng.uniform(2.5, 3.8), "goalsAgainstPerGame": rng.uniform(2.5, 3.8),
+         "shotsForPerGame": rng.uniform(26, 34), "shotsAgainstPerGame": rng.uniform(26, 34),
+         "powerPlayPct": rng.random() / 4, "penaltyKillPct": 0.7 + rng.random() / 5,
+         "faceoffWinPct": 0.45 + rng.random() / 10}
+        for team_id in range(1, 33)
+    ]}
+    skater_logs, goalie_logs = {}, {}
+    for i in range(players):
+        log = []
+        for n in range(games):
+            game = {
+                "gameId": 2025020001 + n,
+                "teamAbbrev": {"default": "EDM"},
+                "homeRoadFlag": rng.choice("HR"),
+                "gameDate": f"2025-{10 + n // 28:02d}-{1 + n % 28:02d}",
+                "opponentAbbrev": {"default": "VAN"},
+                "pim": rng.choice([0, 0, 2]),
+                "toi": rng.choice([f"{rng.randint(8, 25)}:{rng.randint(0, 59):02d}", None]),
+            }
+            if i % 15 == 0:
+                shots = rng.randint(18, 40)
+                game.update(goalsAgainst=rng.randint(0, 5), shotsAgainst=shots, savePctg=0.9,
+                            decision=rng.choice(["W", "L", None]), shutouts=0, gamesStarted=1)
+            else:
+                goals, assists = rng.randint(0, 1), rng.randint(0, 2)
+                game.update(goals=goals, assists=assists, points=goals + assists, plusMinus=rng.randint(-2, 2),
+                            powerPlayGoals=0, powerPlayPoints=rng.randint(0, 1), shorthandedGoals=0,
+                            shorthandedPoints=0, gameWinningGoals=0, otGoals=0, shots=rng.randint(0, 6),
+                            shifts=rng.randint(14, 30))
+            log.append(game)
+        (goalie_logs if i % 15 == 0 else skater_logs)[8470000 + i] = log
+    skaters = {"data": [
+        {"playerId": pid, "seasonId": 20252026, "teamAbbrevs": "EDM", "skaterFullName": "A B",
+         "positionCode": "C", "gamesPlayed": games, "goals": rng.randint(0, 40), "points": rng.randint(0, 90),
+         "shootingPct": rng.random() / 5, "timeOnIcePerGame": rng.uniform(600, 1500), "shootsCatches": "L"}
+        for pid in skater_logs
+    ]}
+    goalies = {"data": [
+        {"playerId": pid, "seasonId": 20252026, "teamAbbrevs": "EDM", "goalieFullName": "G K",
+         "gamesPlayed": games, "wins": rng.randint(0, 40), "savePct": rng.uniform(0.88, 0.93),
+         "goalsAgainstAverage": rng.uniform(2, 3.5), "timeOnIce": games * 3600}
+        for pid in goalie_logs
+    ]}
+    return teams, skaters, goalies, skater_logs, goalie_logs
+
+
+def _archived_inputs():
+    teams = {"data": list(read_records("teams"))}
+    skaters = {"data": list(read_records("skater_stats"))}
+    goalies = {"data": list(read_records("goalie_stats"))}
+    logs = {rec["player_id"]: rec["gameLog"] for rec in read_records("game_logs")}
+    if not (teams["data"] and skaters["data"] and goalies["data"] and logs):
+        return None
+    goalie_ids = {row["playerId"] for row in goalies["data"]}
+    skater_logs = {pid: log for pid, log in logs.items() if pid not in goalie_ids}
+    goalie_logs = {pid: log for pid, log in logs.items() if pid in goalie_ids}
+    return teams, skaters, goalies, skater_logs, goalie_logs
+
+
+# The per-row transforms as they were before the batch rewrite.
+
+def _old_team_stats(raw_data):
+    transformed = []
+    for item in raw_data['data']:
+        team_stats = p.TeamStats(
+            team_id=item['teamId'],
+            season_id=item['seasonId'],
+            games_played=item['gamesPlayed'],
+            wins=item['wins'],
+            losses=item['losses'],
+            ot_losses=item['otLosses'],
+            points=item['points'],
+            goals_for=item['goalsFor'],
+            goals_against=item['goalsAgainst'],
+            goals_for_per_game=item['goalsForPerGame'],
+            goals_against_per_game=item['goalsAgainstPerGame'],
+            shots_for_per_game=item['shotsForPerGame'],
+            shots_against_per_game=item['shotsAgainstPerGame'],
+            power_play_pct=item['powerPlayPct'],
+            penalty_kill_pct=item['penaltyKillPct'],
+            faceoff_win_pct=item['faceoffWinPct'],
+            team_full_name=item['teamFullName']
+        )
+        transformed.append(team_stats.model_dump())
+    return transformed
+
+def _old_skater_season_stats(raw_data):
+    transformed = []
+    for item in raw_data['data']:
+        stats = p.SkaterSeasonStats(
+            player_id=item['playerId'],
+            season_id=item['seasonId'],
+            team_abbrev=item.get('teamAbbrevs'),
+            full_name=item.get('skaterFullName'),
+            position_code=item.get('positionCode'),
+            games_played=item.get('gamesPlayed'),
+            goals=item.get('goals'),
+            assists=item.get('assists'),
+            points=item.get('points'),
+            plus_minus=item.get('plusMinus'),
+            penalty_minutes=item.get('penaltyMinutes'),
+            power_play_goals=item.get('ppGoals'),
+            pp_points=item.get('ppPoints'),
+            sh_goals=item.get('shGoals'),
+            sh_points=item.get('shPoints'),
+            ev_goals=item.get('evGoals'),
+            ev_points=item.get('evPoints'),
+            game_winning_goals=item.get('gameWinningGoals'),
+            ot_goals=item.get('otGoals'),
+            shots=item.get('shots'),
+            shooting_pct=item.get('shootingPct'),
+            toi_per_game=item.get('timeOnIcePerGame'),
+            faceoff_win_pct=item.get('faceoffWinPct'),
+            points_per_game=item.get('pointsPerGame'),
+            shoots_catches=item.get('shootsCatches'),
+        )
+        transformed.append(stats.model_dump())
+    return transformed
+
+def _old_goalie_season_stats(raw_data):
+    transformed = []
+    for item in raw_data['data']:
+        stats = p.GoalieSeasonStats(
+            player_id=item['playerId'],
+            season_id=item['seasonId'],
+            team_abbrev=item.get('teamAbbrevs'),
+            full_name=item.get('goalieFullName'),
+            games_played=item.get('gamesPlayed'),
+            games_started=item.get('gamesStarted'),
+            wins=item.get('wins'),
+            losses=item.get('losses'),
+            ot_losses=item.get('otLosses'),
+            goals_against=item.get('goalsAgainst'),
+            goals_against_average=item.get('goalsAgainstAverage'),
+            shots_against=item.get('shotsAgainst'),
+            saves=item.get('saves'),
+            save_pct=item.get('savePct'),
+            shutouts=item.get('shutouts'),
+            goals=item.get('goals'),
+            assists=item.get('assists'),
+            points=item.get('points'),
+            penalty_minutes=item.get('penaltyMinutes'),
+            toi=item.get('timeOnIce'),
+            shoots_catches=item.get('shootsCatches'),
+        )
+        transformed.append(stats.model_dump())
+    return transformed
+
+def _old_skater_game_logs(player_id, game_log):
+    transformed = []
+    for game in game_log:
+        stats = p.SkaterGameStats(
+            player_id=player_id,
+            game_id=game['gameId'],
+            team_abbrev=p._extract_default(game.get('teamAbbrev')),
+            home_road=game.get('homeRoadFlag'),
+            game_date=game.get('gameDate'),
+            opponent_abbrev=p._extract_default(game.get('opponentAbbrev')),
+            goals=game.get('goals'),
+            assists=game.get('assists'),
+            points=game.get('points'),
+            plus_minus=game.get('plusMinus'),
+            penalty_minutes=game.get('pim'),
+            power_play_goals=game.get('powerPlayGoals'),
+            pp_points=game.get('powerPlayPoints'),
+            sh_goals=game.get('shorthandedGoals'),
+            sh_points=game.get('shorthandedPoints'),
+            game_winning_goals=game.get('gameWinningGoals'),
+            ot_goals=game.get('otGoals'),
+            shots=game.get('shots'),
+            shifts=game.get('shifts'),
+            toi=game.get('toi'),
+            toi_seconds=toi_to_seconds(game.get('toi')),
+        )
+        transformed.append(stats.model_dump())
+    return transformed
+
+def _old_goalie_game_logs(player_id, game_log):
+    transformed = []
+    for game in game_log:
+        stats = p.GoalieGameStats(
+            player_id=player_id,
+            game_id=game['gameId'],
+            team_abbrev=p._extract_default(game.get('teamAbbrev')),
+            home_road=game.get('homeRoadFlag'),
+            game_date=game.get('gameDate'),
+            opponent_abbrev=p._extract_default(game.get('opponentAbbrev')),
+            goals_against=game.get('goalsAgainst'),
+            saves=None,  # Not in game log API; computed from shotsAgainst - goalsAgainst
+            save_pct=game.get('savePctg'),
+            shots_against=game.get('shotsAgainst'),
+            decision=game.get('decision'),
+            shutouts=game.get('shutouts'),
+            games_started=game.get('gamesStarted'),
+            penalty_minutes=game.get('pim'),
+            toi=game.get('toi'),
+            toi_seconds=toi_to_seconds(game.get('toi')),
+        )
+        # Compute saves if we have the data
+        if game.get('shotsAgainst') is not None and game.get('goalsAgainst') is not None:
+            stats.saves = game['shotsAgainst'] - game['goalsAgainst']
+        transformed.append(stats.model_dump())
+    return transformed
+
+
+def _identical(a, b):
+    return json.dumps(a) == json.dumps(b) and all(
+        type(x) is type(y) for ra, rb in zip(a, b) for x, y in zip(ra.values(), rb.values())
+    )
+
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = _archived_inputs()
+    print("Input: latest raw archive" if inputs else "Input: synthetic season")
+    teams, skaters, goalies, skater_logs, goalie_logs = inputs or _synthetic_inputs()
+
+    cases = {
+        "team stats": (
+            lambda: p.transform_team_stats(teams),
+            lambda: _old_team_stats(teams),
+        ),
+        "skater season stats": (
+            lambda: p.transform_skater_season_stats(skaters),
+            lambda: _old_skater_season_stats(skaters),
+        ),
+        "goalie season stats": (
+            lambda: p.transform_goalie_season_stats(goalies),
+            lambda: _old_goalie_season_stats(goalies),
+        ),
+        "skater game logs": (
+            lambda: [r for pid, log in skater_logs.items() for r in p.transform_skater_game_logs(pid, log)],
+            lambda: [r for pid, log in skater_logs.items() for r in _old_skater_game_logs(pid, log)],
+        ),
+        "goalie game logs": (
+            lambda: [r for pid, log in goalie_logs.items() for r in p.transform_goalie_game_logs(pid, log)],
+            lambda: [r for pid, log in goalie_logs.items() for r in _old_goalie_game_logs(pid, log)],
+        ),
+    }
+
+    failed = False
+    for name, (batch, per_row) in cases.items():
+        fast, fast_s = _timed(batch, args.repeat)
+        slow, slow_s = _timed(per_row, args.repeat)
+        same = _identical(fast, slow)
+        failed |= not same
+        print(
+            f"{name:<20} {len(fast):>7} rows  batch {fast_s * 1000:8.1f} ms  "
+            f"per-row {slow_s * 1000:8.1f} ms  x{slow_s / max(fast_s, 1e-9):4.1f}  "
+            f"{'identical' if same else 'MISMATCH'}"
+        )
+    raise SystemExit(1 if failed else 0)
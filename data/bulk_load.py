@@ -0,0 +1,166 @@
+"""Bulk upserts over a direct Postgres connection, used when SUPABASE_DB_URL is set.
+
+PostgREST upserts serialize every row to JSON and merge it with one statement per
+request. Here a table's rows are streamed with ``COPY`` into a temporary staging
+table (session-local and never WAL-logged) and merged into the target table with a
+single ``INSERT ... ON CONFLICT DO UPDATE`` in the same transaction, so the rows are
+written entirely or not at all.
+
+``upsert`` stages, copies and merges one list of rows; ``UploadEngine`` hands it a
+whole table at once through the same retry loop as PostgREST uploads, and
+``error_code`` maps psycopg errors onto its retry codes. ``stage`` is for rows that
+arrive in pieces (the streamed game logs): every piece is copied into one staging
+table as it comes and the table is merged once by ``StagedUpsert.commit``.
+
+The shared connection is opened on the first upsert, so it does not sit idle
+through the scrape, and is reopened after it drops.
+
+The loader works against any Postgres with the schema from ``data.sql``, e.g.
+``SUPABASE_DB_URL=postgresql://localhost/nhl python pipeline.py``.
+"""
+
+import threading
+
+import psycopg
+from psycopg import sql
+
+
+def _connect(dsn, autocommit):
+    # prepare_threshold=None: Supabase's transaction-mode pooler cannot reuse
+    # server-side prepared statements across transactions.
+    return psycopg.connect(dsn, autocommit=autocommit, prepare_threshold=None)
+
+
+def _create_stage(cur, stage, target):
+    # LIKE copies column types and defaults but no constraints or indexes, so the
+    # COPY itself never checks keys.
+    cur.execute(sql.SQL(
+        "CREATE TEMP TABLE {} (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ).format(stage, target))
+
+
+def _copy_rows(cur, stage, rows, columns):
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    with cur.copy(sql.SQL("COPY {} ({}) FROM STDIN").format(stage, column_list)) as copy:
+        for row in rows:
+            copy.write_row([row.get(col) for col in columns])
+
+
+def _merge_stage(cur, stage, target, columns, conflict_cols):
+    keys = [col.strip() for col in conflict_cols.split(",")]
+    updates = [col for col in columns if col not in keys]
+    if updates:
+        on_conflict = sql.SQL("DO UPDATE SET {}").format(sql.SQL(", ").join(
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(col)) for col in updates
+        ))
+    else:
+        on_conflict = sql.SQL("DO NOTHING")
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    cur.execute(sql.SQL(
+        "INSERT INTO {target} ({cols}) SELECT {cols} FROM {stage} "
+        "ON CONFLICT ({keys}) {on_conflict}"
+    ).format(
+        target=target,
+        cols=column_list,
+        stage=stage,
+        keys=sql.SQL(", ").join(map(sql.Identifier, keys)),
+        on_conflict=on_conflict,
+    ))
+
+
+class StagedUpsert:
+    """One table's rows copied into a staging table piece by piece and merged once.
+
+    Runs as a single transaction on its own connection, so staging one table
+    does not hold up the loader's other work and nothing is visible until
+    ``commit``. A failure rolls the whole table back; it is not retried.
+    """
+
+    def __init__(self, dsn, table, conflict_cols, schema="public"):
+        self.conflict_cols = conflict_cols
+        self.rows = 0
+        self._stage = sql.Identifier(f"stage_{table}")
+        self._target = sql.Identifier(schema, table)
+        self._columns = {}
+        self._conn = _connect(dsn, autocommit=False)
+        with self._conn.cursor() as cur:
+            _create_stage(cur, self._stage, self._target)
+
+    def copy(self, rows):
+        """COPY ``rows`` into the staging table."""
+        if not rows:
+            return
+        columns = list(dict.fromkeys(col for row in rows for col in row))
+        self._columns.update(dict.fromkeys(columns))
+        with self._conn.cursor() as cur:
+            _copy_rows(cur, self._stage, rows, columns)
+        self.rows += len(rows)
+
+    def commit(self):
+        """Merge everything staged into the target table; returns the staged row count."""
+        try:
+            if self.rows:
+                with self._conn.cursor() as cur:
+                    _merge_stage(cur, self._stage, self._target, list(self._columns), self.conflict_cols)
+            self._conn.commit()
+        finally:
+            self._conn.close()
+        return self.rows
+
+    def abort(self):
+        self._conn.close()
+
+
+class CopyLoader:
+    def __init__(self, dsn, schema="public"):
+        self.dsn = dsn
+        self.schema = schema
+        self.conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self.conn is None or self.conn.closed:
+            self.conn = _connect(self.dsn, autocommit=True)
+        return self.conn
+
+    @staticmethod
+    def error_code(exc):
+        """Map a psycopg error onto UploadEngine's retry codes (see RETRY_UPLOAD_CODES)."""
+        if not isinstance(exc, psycopg.Error):
+            return None
+        # Class 08 (connection exception), 57P01-57P03 (server shutting down or
+        # restarting) and errors without a SQLSTATE mean the connection itself
+        # failed; retry on a fresh one.
+        if isinstance(exc, psycopg.OperationalError) and (exc.sqlstate or "08").startswith(("08", "57P")):
+            return "transport"
+        return exc.sqlstate
+
+    def upsert(self, table, rows, conflict_cols):
+        """COPY ``rows`` into a staging table and merge them into ``table``; returns the row count."""
+        if not rows:
+            return 0
+        columns = list(dict.fromkeys(col for row in rows for col in row))
+        stage = sql.Identifier(f"stage_{table}")
+        target = sql.Identifier(self.schema, table)
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn.transaction(), conn.cursor() as cur:
+                    _create_stage(cur, stage, target)
+                    _copy_rows(cur, stage, rows, columns)
+                    _merge_stage(cur, stage, target, columns, conflict_cols)
+            except psycopg.OperationalError:
+                if self.conn is not None and self.conn.broken:
+                    self.conn.close()
+                    self.conn = None
+                raise
+        return len(rows)
+
+    def stage(self, table, conflict_cols):
+        """Open a StagedUpsert for rows of ``table`` that arrive in pieces."""
+        return StagedUpsert(self.dsn, table, conflict_cols, self.schema)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
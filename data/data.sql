@@ -38,6 +38,7 @@ CREATE TABLE players (
     draft_team_abbrev VARCHAR(10),
     draft_round INTEGER,
     draft_overall_pick INTEGER,
+    row_hash TEXT,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     FOREIGN KEY (current_team_id) REFERENCES teams(team_id)
@@ -61,6 +62,7 @@ CREATE TABLE team_stats (
     power_play_pct DOUBLE PRECISION,
     penalty_kill_pct DOUBLE PRECISION,
     faceoff_win_pct DOUBLE PRECISION,
+    row_hash TEXT,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     PRIMARY KEY (team_id, season_id),
@@ -93,6 +95,11 @@ CREATE TABLE player_season_stats (
     faceoff_win_pct DOUBLE PRECISION,
     points_per_game DOUBLE PRECISION,
     shoots_catches VARCHAR(5),
+    goals_per_60 DOUBLE PRECISION,
+    points_per_60 DOUBLE PRECISION,
+    shots_per_60 DOUBLE PRECISION,
+    pp_point_share DOUBLE PRECISION,
+    row_hash TEXT,
     PRIMARY KEY (player_id, season_id),
     FOREIGN KEY (season_id) REFERENCES seasons(season_id)
 );
@@ -119,23 +126,67 @@ CREATE TABLE goalie_season_stats (
     penalty_minutes INTEGER,
     toi INTEGER,
     shoots_catches VARCHAR(5),
+    row_hash TEXT,
+    PRIMARY KEY (player_id, season_id),
+    FOREIGN KEY (season_id) REFERENCES seasons(season_id)
+);
+
+CREATE TABLE player_projections (
+    player_id BIGINT NOT NULL,
+    season_id BIGINT NOT NULL,
+    season_type VARCHAR(10) NOT NULL,
+    games_remaining INTEGER,
+    projected_games DOUBLE PRECISION,
+    goals_per_game DOUBLE PRECISION,
+    assists_per_game DOUBLE PRECISION,
+    points_per_game DOUBLE PRECISION,
+    shots_per_game DOUBLE PRECISION,
+    pp_points_per_game DOUBLE PRECISION,
+    wins_per_game DOUBLE PRECISION,
+    saves_per_game DOUBLE PRECISION,
+    shutouts_per_game DOUBLE PRECISION,
+    goals_against_per_game DOUBLE PRECISION,
+    ros_goals DOUBLE PRECISION,
+    ros_assists DOUBLE PRECISION,
+    ros_points DOUBLE PRECISION,
+    ros_shots DOUBLE PRECISION,
+    ros_pp_points DOUBLE PRECISION,
+    ros_wins DOUBLE PRECISION,
+    ros_saves DOUBLE PRECISION,
+    ros_shutouts DOUBLE PRECISION,
+    ros_goals_against DOUBLE PRECISION,
+    projected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     PRIMARY KEY (player_id, season_id),
     FOREIGN KEY (season_id) REFERENCES seasons(season_id)
 );
 
 CREATE TABLE games (
     game_id BIGINT PRIMARY KEY,
-    game_date DATE NOT NULL,
-    home_team_id BIGINT NOT NULL,
-    away_team_id BIGINT NOT NULL,
+    season_id BIGINT NOT NULL,
+    game_date DATE,
+    home_team_abbrev VARCHAR(10),
+    away_team_abbrev VARCHAR(10),
     home_team_score INTEGER,
     away_team_score INTEGER,
-    season_id BIGINT NOT NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-    FOREIGN KEY (season_id) REFERENCES seasons(season_id),
-    FOREIGN KEY (home_team_id) REFERENCES teams(team_id),
-    FOREIGN KEY (away_team_id) REFERENCES teams(team_id)
+    FOREIGN KEY (season_id) REFERENCES seasons(season_id)
+);
+
+-- Team totals only; the team_game_log view adds date, season, opponent and score.
+CREATE TABLE team_game_stats (
+    team_abbrev VARCHAR(10) NOT NULL,
+    game_id BIGINT NOT NULL,
+    goals INTEGER,
+    shots INTEGER,
+    power_play_goals INTEGER,
+    penalty_minutes INTEGER,
+    goals_against INTEGER,
+    shots_against INTEGER,
+    decision VARCHAR(5),
+    skaters_dressed INTEGER,
+    PRIMARY KEY (team_abbrev, game_id),
+    FOREIGN KEY (game_id) REFERENCES games(game_id)
 );
 
 CREATE TABLE player_game_stats (
@@ -159,6 +210,11 @@ CREATE TABLE player_game_stats (
     shots INTEGER,
     shifts INTEGER,
     toi VARCHAR(10),
+    toi_seconds INTEGER,
+    goals_per_60 DOUBLE PRECISION,
+    points_per_60 DOUBLE PRECISION,
+    shots_per_60 DOUBLE PRECISION,
+    pp_point_share DOUBLE PRECISION,
     PRIMARY KEY (player_id, game_id)
 );
 
@@ -178,6 +234,7 @@ CREATE TABLE goalie_game_stats (
     games_started INTEGER,
     penalty_minutes INTEGER,
     toi VARCHAR(10),
+    toi_seconds INTEGER,
     PRIMARY KEY (player_id, game_id)
 );
 
@@ -193,5 +250,47 @@ CREATE INDEX idx_player_season_stats_season
 CREATE INDEX idx_goalie_season_stats_season
     ON goalie_season_stats (season_id DESC);
 
+CREATE INDEX idx_player_projections_season
+    ON player_projections (season_id DESC);
+
 CREATE INDEX idx_team_stats_season_points
     ON team_stats (season_id, points DESC, goals_for DESC);
+
+CREATE INDEX idx_games_game_date
+    ON games (game_date);
+
+CREATE INDEX idx_games_season
+    ON games (season_id);
+
+CREATE INDEX idx_player_game_stats_game
+    ON player_game_stats (game_id);
+
+CREATE INDEX idx_goalie_game_stats_game
+    ON goalie_game_stats (game_id);
+
+CREATE INDEX idx_players_updated_at
+    ON players (updated_at);
+
+CREATE VIEW team_game_log AS
+SELECT
+    t.team_abbrev,
+    t.game_id,
+    g.season_id,
+    g.game_date,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev THEN 'H' ELSE 'R' END AS home_road,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.away_team_abbrev ELSE g.home_team_abbrev END AS opponent_abbrev,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.home_team_score ELSE g.away_team_score END AS score,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.away_team_score ELSE g.home_team_score END AS opponent_score,
+    t.goals,
+    t.shots,
+    t.power_play_goals,
+    t.penalty_minutes,
+    t.goals_against,
+    t.shots_against,
+    t.decision,
+    t.skaters_dressed
+FROM team_game_stats t
+JOIN games g ON g.game_id = t.game_id;
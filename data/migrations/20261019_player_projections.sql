@@ -0,0 +1,44 @@
+-- Rest-of-season projections written by data/projections.py after each pipeline run.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.player_projections (
+    player_id BIGINT NOT NULL,
+    season_id BIGINT NOT NULL,
+    season_type TEXT NOT NULL,
+    games_remaining INTEGER,
+    projected_games DOUBLE PRECISION,
+    goals_per_game DOUBLE PRECISION,
+    assists_per_game DOUBLE PRECISION,
+    points_per_game DOUBLE PRECISION,
+    shots_per_game DOUBLE PRECISION,
+    pp_points_per_game DOUBLE PRECISION,
+    wins_per_game DOUBLE PRECISION,
+    saves_per_game DOUBLE PRECISION,
+    shutouts_per_game DOUBLE PRECISION,
+    goals_against_per_game DOUBLE PRECISION,
+    ros_goals DOUBLE PRECISION,
+    ros_assists DOUBLE PRECISION,
+    ros_points DOUBLE PRECISION,
+    ros_shots DOUBLE PRECISION,
+    ros_pp_points DOUBLE PRECISION,
+    ros_wins DOUBLE PRECISION,
+    ros_saves DOUBLE PRECISION,
+    ros_shutouts DOUBLE PRECISION,
+    ros_goals_against DOUBLE PRECISION,
+    projected_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS player_projections_player_id_season_id_uniq
+    ON public.player_projections (player_id, season_id);
+
+CREATE INDEX IF NOT EXISTS player_projections_season_id_idx
+    ON public.player_projections (season_id DESC);
+
+ALTER TABLE IF EXISTS public.player_projections
+    DROP CONSTRAINT IF EXISTS player_projections_season_id_fkey,
+    ADD CONSTRAINT player_projections_season_id_fkey
+        FOREIGN KEY (season_id) REFERENCES public.seasons (season_id);
+
+COMMIT;
@@ -0,0 +1,123 @@
+-- Aggregated form windows and home/away splits for the player detail endpoint.
+-- Called through PostgREST rpc() so the API ships three summary rows per player
+-- instead of raw game logs. Both functions filter on player_id and order by
+-- game_date DESC, which is served by the *_player_game_date_idx indexes.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+-- One row per bucket: 'form' (latest p_form_games games), 'home' and 'away'
+-- (every game in the season). The season defaults to the player's most recent
+-- game; NHL game ids start with the season's start year (2025020001 -> 2025).
+CREATE OR REPLACE FUNCTION public.skater_form_splits(
+    p_player_id BIGINT,
+    p_season_id BIGINT DEFAULT NULL,
+    p_form_games INTEGER DEFAULT 5
+)
+RETURNS TABLE (
+    bucket TEXT,
+    games BIGINT,
+    goals BIGINT,
+    assists BIGINT,
+    points BIGINT,
+    shots BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scope AS (
+        SELECT COALESCE(
+            p_season_id / 10000,
+            (
+                SELECT last_game.game_id / 1000000
+                FROM public.player_game_stats AS last_game
+                WHERE last_game.player_id = p_player_id
+                ORDER BY last_game.game_date DESC
+                LIMIT 1
+            )
+        ) AS start_year
+    ),
+    season_games AS (
+        SELECT g.home_road,
+               g.goals,
+               g.assists,
+               g.points,
+               g.shots,
+               row_number() OVER (ORDER BY g.game_date DESC) AS recency
+        FROM public.player_game_stats AS g
+        CROSS JOIN scope
+        WHERE g.player_id = p_player_id
+          AND g.game_id BETWEEN scope.start_year * 1000000
+                            AND (scope.start_year + 1) * 1000000 - 1
+    )
+    SELECT b.bucket,
+           COUNT(sg.recency),
+           COALESCE(SUM(sg.goals), 0),
+           COALESCE(SUM(sg.assists), 0),
+           COALESCE(SUM(sg.points), 0),
+           COALESCE(SUM(sg.shots), 0)
+    FROM (VALUES ('form'), ('home'), ('away')) AS b (bucket)
+    LEFT JOIN season_games AS sg
+        ON (b.bucket = 'form' AND sg.recency <= p_form_games)
+        OR (b.bucket = 'home' AND sg.home_road = 'H')
+        OR (b.bucket = 'away' AND sg.home_road = 'R')
+    GROUP BY b.bucket;
+$$;
+
+CREATE OR REPLACE FUNCTION public.goalie_form_splits(
+    p_player_id BIGINT,
+    p_season_id BIGINT DEFAULT NULL,
+    p_form_games INTEGER DEFAULT 5
+)
+RETURNS TABLE (
+    bucket TEXT,
+    games BIGINT,
+    wins BIGINT,
+    losses BIGINT,
+    ot_losses BIGINT,
+    goals_against BIGINT,
+    shots_against BIGINT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH scope AS (
+        SELECT COALESCE(
+            p_season_id / 10000,
+            (
+                SELECT last_game.game_id / 1000000
+                FROM public.goalie_game_stats AS last_game
+                WHERE last_game.player_id = p_player_id
+                ORDER BY last_game.game_date DESC
+                LIMIT 1
+            )
+        ) AS start_year
+    ),
+    season_games AS (
+        SELECT g.home_road,
+               g.decision,
+               g.goals_against,
+               g.shots_against,
+               row_number() OVER (ORDER BY g.game_date DESC) AS recency
+        FROM public.goalie_game_stats AS g
+        CROSS JOIN scope
+        WHERE g.player_id = p_player_id
+          AND g.game_id BETWEEN scope.start_year * 1000000
+                            AND (scope.start_year + 1) * 1000000 - 1
+    )
+    SELECT b.bucket,
+           COUNT(sg.recency),
+           COUNT(*) FILTER (WHERE sg.decision = 'W'),
+           COUNT(*) FILTER (WHERE sg.decision = 'L'),
+           COUNT(*) FILTER (WHERE sg.decision = 'OTL'),
+           COALESCE(SUM(sg.goals_against), 0),
+           COALESCE(SUM(sg.shots_against), 0)
+    FROM (VALUES ('form'), ('home'), ('away')) AS b (bucket)
+    LEFT JOIN season_games AS sg
+        ON (b.bucket = 'form' AND sg.recency <= p_form_games)
+        OR (b.bucket = 'home' AND sg.home_road = 'H')
+        OR (b.bucket = 'away' AND sg.home_road = 'R')
+    GROUP BY b.bucket;
+$$;
+
+COMMIT;
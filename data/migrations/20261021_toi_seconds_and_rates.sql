@@ -0,0 +1,59 @@
+-- Numeric time on ice and per-60 rate columns filled by data/rates.py at ingest.
+-- The "MM:SS" toi strings are kept for display; existing rows are backfilled.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+ALTER TABLE IF EXISTS public.player_game_stats
+    ADD COLUMN IF NOT EXISTS toi_seconds INTEGER,
+    ADD COLUMN IF NOT EXISTS goals_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS points_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS shots_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS pp_point_share DOUBLE PRECISION;
+
+ALTER TABLE IF EXISTS public.goalie_game_stats
+    ADD COLUMN IF NOT EXISTS toi_seconds INTEGER;
+
+ALTER TABLE IF EXISTS public.player_season_stats
+    ADD COLUMN IF NOT EXISTS goals_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS points_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS shots_per_60 DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS pp_point_share DOUBLE PRECISION;
+
+-- Backfill rows loaded before the pipeline wrote these columns.
+UPDATE public.player_game_stats
+SET toi_seconds = split_part(toi, ':', 1)::INTEGER * 60 + split_part(toi, ':', 2)::INTEGER
+WHERE toi_seconds IS NULL
+  AND toi ~ '^[0-9]+:[0-9]{2}$';
+
+UPDATE public.goalie_game_stats
+SET toi_seconds = split_part(toi, ':', 1)::INTEGER * 60 + split_part(toi, ':', 2)::INTEGER
+WHERE toi_seconds IS NULL
+  AND toi ~ '^[0-9]+:[0-9]{2}$';
+
+UPDATE public.player_game_stats
+SET goals_per_60 = round((COALESCE(goals, 0) * 3600.0 / toi_seconds)::NUMERIC, 2),
+    points_per_60 = round((COALESCE(points, 0) * 3600.0 / toi_seconds)::NUMERIC, 2),
+    shots_per_60 = round((COALESCE(shots, 0) * 3600.0 / toi_seconds)::NUMERIC, 2)
+WHERE points_per_60 IS NULL
+  AND toi_seconds > 0;
+
+UPDATE public.player_game_stats
+SET pp_point_share = round((COALESCE(pp_points, 0)::NUMERIC / points), 2)
+WHERE pp_point_share IS NULL
+  AND points > 0;
+
+UPDATE public.player_season_stats
+SET goals_per_60 = round((COALESCE(goals, 0) * 3600.0 / (toi_per_game * games_played))::NUMERIC, 2),
+    points_per_60 = round((COALESCE(points, 0) * 3600.0 / (toi_per_game * games_played))::NUMERIC, 2),
+    shots_per_60 = round((COALESCE(shots, 0) * 3600.0 / (toi_per_game * games_played))::NUMERIC, 2)
+WHERE points_per_60 IS NULL
+  AND toi_per_game > 0
+  AND games_played > 0;
+
+UPDATE public.player_season_stats
+SET pp_point_share = round((COALESCE(pp_points, 0)::NUMERIC / points), 2)
+WHERE pp_point_share IS NULL
+  AND points > 0;
+
+COMMIT;
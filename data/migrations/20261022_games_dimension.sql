@@ -0,0 +1,114 @@
+-- Game dimension keyed by game_id (from the schedule feed, with final scores) and a
+-- per-team game fact table rolled up by data/pipeline.py from the scraped player game
+-- logs. Game-centric lookups ("games on a date", "a team's game log") hit these
+-- instead of scanning the ~40 player rows each game has in player_game_stats /
+-- goalie_game_stats. team_game_stats holds only the team's own totals; the
+-- team_game_log view joins the date, season, opponent and score back in.
+-- player_game_stats / goalie_game_stats deliberately keep their own game_date,
+-- opponent_abbrev and home_road: the (player_id, game_date DESC) indexes, the form
+-- split and recent-game functions and the API's per-player date filters all read
+-- them without a join, and per-player reads far outnumber game-centric ones.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.games (
+    game_id BIGINT PRIMARY KEY,
+    season_id BIGINT NOT NULL,
+    game_date DATE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE IF EXISTS public.games
+    ADD COLUMN IF NOT EXISTS home_team_abbrev TEXT,
+    ADD COLUMN IF NOT EXISTS away_team_abbrev TEXT,
+    ADD COLUMN IF NOT EXISTS home_team_score INTEGER,
+    ADD COLUMN IF NOT EXISTS away_team_score INTEGER;
+
+-- Older copies of data.sql defined games with NOT NULL team-id columns that the
+-- pipeline does not populate (game logs only carry abbreviations).
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM information_schema.columns
+        WHERE table_schema = 'public'
+          AND table_name = 'games'
+          AND column_name = 'home_team_id'
+    ) THEN
+        EXECUTE 'ALTER TABLE public.games ALTER COLUMN home_team_id DROP NOT NULL';
+        EXECUTE 'ALTER TABLE public.games ALTER COLUMN away_team_id DROP NOT NULL';
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS public.team_game_stats (
+    team_abbrev TEXT NOT NULL,
+    game_id BIGINT NOT NULL,
+    goals INTEGER,
+    shots INTEGER,
+    power_play_goals INTEGER,
+    penalty_minutes INTEGER,
+    goals_against INTEGER,
+    shots_against INTEGER,
+    decision TEXT,
+    skaters_dressed INTEGER,
+    PRIMARY KEY (team_abbrev, game_id)
+);
+
+CREATE INDEX IF NOT EXISTS games_game_date_idx
+    ON public.games (game_date);
+
+CREATE INDEX IF NOT EXISTS games_season_id_idx
+    ON public.games (season_id);
+
+-- "Who played in game X" from the player facts.
+CREATE INDEX IF NOT EXISTS player_game_stats_game_id_idx
+    ON public.player_game_stats (game_id);
+
+CREATE INDEX IF NOT EXISTS goalie_game_stats_game_id_idx
+    ON public.goalie_game_stats (game_id);
+
+ALTER TABLE IF EXISTS public.games
+    DROP CONSTRAINT IF EXISTS games_season_id_fkey,
+    ADD CONSTRAINT games_season_id_fkey
+        FOREIGN KEY (season_id) REFERENCES public.seasons (season_id);
+
+ALTER TABLE IF EXISTS public.team_game_stats
+    DROP CONSTRAINT IF EXISTS team_game_stats_game_id_fkey,
+    ADD CONSTRAINT team_game_stats_game_id_fkey
+        FOREIGN KEY (game_id) REFERENCES public.games (game_id);
+
+-- Earlier revisions of this migration copied these onto every team-game row.
+DROP VIEW IF EXISTS public.team_game_log;
+ALTER TABLE IF EXISTS public.team_game_stats
+    DROP COLUMN IF EXISTS season_id,
+    DROP COLUMN IF EXISTS game_date,
+    DROP COLUMN IF EXISTS opponent_abbrev,
+    DROP COLUMN IF EXISTS home_road;
+
+CREATE VIEW public.team_game_log AS
+SELECT
+    t.team_abbrev,
+    t.game_id,
+    g.season_id,
+    g.game_date,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev THEN 'H' ELSE 'R' END AS home_road,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.away_team_abbrev ELSE g.home_team_abbrev END AS opponent_abbrev,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.home_team_score ELSE g.away_team_score END AS score,
+    CASE WHEN t.team_abbrev = g.home_team_abbrev
+        THEN g.away_team_score ELSE g.home_team_score END AS opponent_score,
+    t.goals,
+    t.shots,
+    t.power_play_goals,
+    t.penalty_minutes,
+    t.goals_against,
+    t.shots_against,
+    t.decision,
+    t.skaters_dressed
+FROM public.team_game_stats t
+JOIN public.games g ON g.game_id = t.game_id;
+
+COMMIT;
@@ -0,0 +1,28 @@
+-- Per-player latest stored game_date, read by `pipeline.py --game-logs incremental`
+-- to decide which players need their game log re-scraped.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.game_log_watermarks(p_season_id BIGINT)
+RETURNS TABLE (
+    player_id BIGINT,
+    last_game_date DATE
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT logs.player_id, MAX(logs.game_date)
+    FROM (
+        SELECT s.player_id, s.game_date, s.game_id
+        FROM public.player_game_stats AS s
+        UNION ALL
+        SELECT g.player_id, g.game_date, g.game_id
+        FROM public.goalie_game_stats AS g
+    ) AS logs
+    WHERE logs.game_id BETWEEN (p_season_id / 10000) * 1000000
+                           AND (p_season_id / 10000 + 1) * 1000000 - 1
+    GROUP BY logs.player_id;
+$$;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Refresh timestamp on the player dimension, used by `pipeline.py --players incremental`
+-- to skip landing-page fetches for players refreshed recently.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+-- Existing rows get the epoch, not NOW(): their bios were never refreshed through
+-- this column, so the first incremental run must treat them as stale. New rows
+-- default to NOW() afterwards.
+ALTER TABLE IF EXISTS public.players
+    ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT 'epoch';
+
+ALTER TABLE IF EXISTS public.players
+    ALTER COLUMN updated_at SET DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS players_updated_at_idx
+    ON public.players (updated_at);
+
+COMMIT;
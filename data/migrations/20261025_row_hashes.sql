@@ -0,0 +1,19 @@
+-- Content hash of the last upserted row, compared by pipeline.py so that unchanged
+-- rows are not re-sent on every run.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+ALTER TABLE IF EXISTS public.players
+    ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+ALTER TABLE IF EXISTS public.team_stats
+    ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+ALTER TABLE IF EXISTS public.player_season_stats
+    ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+ALTER TABLE IF EXISTS public.goalie_season_stats
+    ADD COLUMN IF NOT EXISTS row_hash TEXT;
+
+COMMIT;
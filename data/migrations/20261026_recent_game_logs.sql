@@ -0,0 +1,72 @@
+-- Each player's latest games this season, read by pipeline.py to compute recent form
+-- for projections without shipping every stored game row. The per-player LATERAL
+-- lookups filter on player_id and order by game_date DESC, which is served by the
+-- *_player_game_date_idx indexes.
+-- Safe to run multiple times (idempotent operations only).
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.recent_skater_games(
+    p_season_id BIGINT,
+    p_games INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    player_id BIGINT,
+    game_date DATE,
+    goals INTEGER,
+    assists INTEGER,
+    points INTEGER,
+    shots INTEGER,
+    pp_points INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT season.player_id, recent.game_date, recent.goals, recent.assists,
+           recent.points, recent.shots, recent.pp_points
+    FROM public.player_season_stats AS season
+    CROSS JOIN LATERAL (
+        SELECT s.game_date, s.goals, s.assists, s.points, s.shots, s.pp_points
+        FROM public.player_game_stats AS s
+        WHERE s.player_id = season.player_id
+          AND s.game_id BETWEEN (p_season_id / 10000) * 1000000
+                            AND (p_season_id / 10000 + 1) * 1000000 - 1
+        ORDER BY s.game_date DESC
+        LIMIT p_games
+    ) AS recent
+    WHERE season.season_id = p_season_id
+    ORDER BY season.player_id, recent.game_date;
+$$;
+
+CREATE OR REPLACE FUNCTION public.recent_goalie_games(
+    p_season_id BIGINT,
+    p_games INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    player_id BIGINT,
+    game_date DATE,
+    decision TEXT,
+    saves INTEGER,
+    shutouts INTEGER,
+    goals_against INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT season.player_id, recent.game_date, recent.decision::TEXT, recent.saves,
+           recent.shutouts, recent.goals_against
+    FROM public.goalie_season_stats AS season
+    CROSS JOIN LATERAL (
+        SELECT g.game_date, g.decision, g.saves, g.shutouts, g.goals_against
+        FROM public.goalie_game_stats AS g
+        WHERE g.player_id = season.player_id
+          AND g.game_id BETWEEN (p_season_id / 10000) * 1000000
+                            AND (p_season_id / 10000 + 1) * 1000000 - 1
+        ORDER BY g.game_date DESC
+        LIMIT p_games
+    ) AS recent
+    WHERE season.season_id = p_season_id
+    ORDER BY season.player_id, recent.game_date;
+$$;
+
+COMMIT;
@@ -1,14 +1,43 @@
+import argparse
+import hashlib
+import json
 import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional, List
+import httpx
+from postgrest.exceptions import APIError
 from supabase import create_client
 from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
 from scrapers.scrape_teams import scrape_teams
-from scrapers.scrape_players import scrape_players
+from scrapers.scrape_players import acknowledge_players, scrape_players
 from scrapers.scrape_skater_stats import scrape_skater_stats
 from scrapers.scrape_goalie_stats import scrape_goalie_stats
-from scrapers.scrape_game_logs import scrape_all_game_logs
-from scrapers.season_config import season_label
+from scrapers.scrape_game_logs import (
+    WATERMARK_FILE,
+    advance_watermarks,
+    iter_game_logs,
+    load_watermark_file,
+    logs_since,
+    new_games_only,
+    players_with_new_games,
+    load_retry_state,
+    save_retry_state,
+    save_watermark_file,
+    schedule_start,
+    scrape_all_game_logs,
+)
+from scrapers.scrape_schedule import scrape_completed_games, scrape_schedule_games
+from scrapers.season_config import DEFAULT_SEASON_ID, season_label
+from projections import RECENT_WINDOW, compute_projections
+from rates import add_skater_game_rates, add_skater_season_rates, toi_to_seconds
 
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -23,12 +52,15 @@ supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 REQUIRED_SCHEMA = {
     "seasons": ["season_id", "season_label"],
-    "team_stats": ["team_id", "season_id", "points"],
-    "players": ["player_id", "first_name", "last_name", "position"],
-    "player_season_stats": ["player_id", "season_id", "points"],
-    "goalie_season_stats": ["player_id", "season_id", "save_pct"],
-    "player_game_stats": ["player_id", "game_id", "points"],
-    "goalie_game_stats": ["player_id", "game_id", "save_pct"],
+    "team_stats": ["team_id", "season_id", "points", "row_hash"],
+    "players": ["player_id", "first_name", "last_name", "position", "updated_at", "row_hash"],
+    "player_season_stats": ["player_id", "season_id", "points", "points_per_60", "row_hash"],
+    "goalie_season_stats": ["player_id", "season_id", "save_pct", "row_hash"],
+    "player_game_stats": ["player_id", "game_id", "points", "toi_seconds", "points_per_60"],
+    "goalie_game_stats": ["player_id", "game_id", "save_pct", "toi_seconds"],
+    "player_projections": ["player_id", "season_id", "ros_points"],
+    "games": ["game_id", "season_id", "game_date", "home_team_abbrev"],
+    "team_game_stats": ["team_abbrev", "game_id", "goals"],
 }
 
 
@@ -40,7 +72,7 @@ def validate_supabase_schema():
             raise RuntimeError(
                 f"Supabase schema check failed for table '{table}'. "
                 f"Expected columns: {', '.join(columns)}. "
-                "Run data/migrations/20260213_pipeline_schema_upgrade.sql in Supabase SQL Editor."
+                "Run the SQL files in data/migrations/ (in order) in Supabase SQL Editor."
             ) from exc
 
 # ---------------------
@@ -98,6 +130,11 @@ class SkaterSeasonStats(BaseModel):
     faceoff_win_pct: Optional[float] = None
     points_per_game: Optional[float] = None
     shoots_catches: Optional[str] = None
+    # Filled in batch by rates.add_skater_*_rates after transform.
+    goals_per_60: Optional[float] = None
+    points_per_60: Optional[float] = None
+    shots_per_60: Optional[float] = None
+    pp_point_share: Optional[float] = None
 
 class GoalieSeasonStats(BaseModel):
     player_id: int
@@ -143,6 +180,12 @@ class SkaterGameStats(BaseModel):
     shots: Optional[int] = None
     shifts: Optional[int] = None
     toi: Optional[str] = None
+    toi_seconds: Optional[int] = None
+    # Filled in batch by rates.add_skater_*_rates after transform.
+    goals_per_60: Optional[float] = None
+    points_per_60: Optional[float] = None
+    shots_per_60: Optional[float] = None
+    pp_point_share: Optional[float] = None
 
 class GoalieGameStats(BaseModel):
     player_id: int
@@ -160,35 +203,175 @@ class GoalieGameStats(BaseModel):
     games_started: Optional[int] = None
     penalty_minutes: Optional[int] = None
     toi: Optional[str] = None
+    toi_seconds: Optional[int] = None
+
+class Game(BaseModel):
+    game_id: int
+    season_id: int
+    game_date: Optional[str] = None
+    home_team_abbrev: Optional[str] = None
+    away_team_abbrev: Optional[str] = None
+    home_team_score: Optional[int] = None
+    away_team_score: Optional[int] = None
+
+class TeamGameStats(BaseModel):
+    # Date, season, opponent and home/road live on the game row; the
+    # team_game_log view joins them back in.
+    team_abbrev: str
+    game_id: int
+    goals: int = 0
+    shots: int = 0
+    power_play_goals: int = 0
+    penalty_minutes: int = 0
+    goals_against: int = 0
+    shots_against: int = 0
+    decision: Optional[str] = None
+    skaters_dressed: int = 0
 
 # ---------------------
 # Transform Functions
 # ---------------------
 
+def _row_adapter(model):
+    """Validate a whole list of plain dicts against ``model``'s field types in one call.
+
+    Produces exactly what ``model(**row).model_dump()`` would, without building a
+    model instance per row. Rows must carry every field, so optional ones are
+    filled from ``_defaults(model)`` first.
+    """
+    fields = {name: info.annotation for name, info in model.model_fields.items()}
+    return TypeAdapter(List[TypedDict(f"{model.__name__}Row", fields)])
+
+def _defaults(model):
+    return {name: info.default for name, info in model.model_fields.items() if not info.is_required()}
+
+# Output column -> NHL stats API field, per transform.
+TEAM_STATS_FIELDS = {
+    "team_id": "teamId",
+    "season_id": "seasonId",
+    "games_played": "gamesPlayed",
+    "wins": "wins",
+    "losses": "losses",
+    "ot_losses": "otLosses",
+    "points": "points",
+    "goals_for": "goalsFor",
+    "goals_against": "goalsAgainst",
+    "goals_for_per_game": "goalsForPerGame",
+    "goals_against_per_game": "goalsAgainstPerGame",
+    "shots_for_per_game": "shotsForPerGame",
+    "shots_against_per_game": "shotsAgainstPerGame",
+    "power_play_pct": "powerPlayPct",
+    "penalty_kill_pct": "penaltyKillPct",
+    "faceoff_win_pct": "faceoffWinPct",
+    "team_full_name": "teamFullName",
+}
+
+SKATER_SEASON_FIELDS = {
+    "player_id": "playerId",
+    "season_id": "seasonId",
+    "team_abbrev": "teamAbbrevs",
+    "full_name": "skaterFullName",
+    "position_code": "positionCode",
+    "games_played": "gamesPlayed",
+    "goals": "goals",
+    "assists": "assists",
+    "points": "points",
+    "plus_minus": "plusMinus",
+    "penalty_minutes": "penaltyMinutes",
+    "power_play_goals": "ppGoals",
+    "pp_points": "ppPoints",
+    "sh_goals": "shGoals",
+    "sh_points": "shPoints",
+    "ev_goals": "evGoals",
+    "ev_points": "evPoints",
+    "game_winning_goals": "gameWinningGoals",
+    "ot_goals": "otGoals",
+    "shots": "shots",
+    "shooting_pct": "shootingPct",
+    "toi_per_game": "timeOnIcePerGame",
+    "faceoff_win_pct": "faceoffWinPct",
+    "points_per_game": "pointsPerGame",
+    "shoots_catches": "shootsCatches",
+}
+
+GOALIE_SEASON_FIELDS = {
+    "player_id": "playerId",
+    "season_id": "seasonId",
+    "team_abbrev": "teamAbbrevs",
+    "full_name": "goalieFullName",
+    "games_played": "gamesPlayed",
+    "games_started": "gamesStarted",
+    "wins": "wins",
+    "losses": "losses",
+    "ot_losses": "otLosses",
+    "goals_against": "goalsAgainst",
+    "goals_against_average": "goalsAgainstAverage",
+    "shots_against": "shotsAgainst",
+    "saves": "saves",
+    "save_pct": "savePct",
+    "shutouts": "shutouts",
+    "goals": "goals",
+    "assists": "assists",
+    "points": "points",
+    "penalty_minutes": "penaltyMinutes",
+    "toi": "timeOnIce",
+    "shoots_catches": "shootsCatches",
+}
+
+# Game-log fields copied as-is; team/opponent abbrevs and TOI are handled per transform.
+SKATER_GAME_FIELDS = {
+    "game_id": "gameId",
+    "home_road": "homeRoadFlag",
+    "game_date": "gameDate",
+    "goals": "goals",
+    "assists": "assists",
+    "points": "points",
+    "plus_minus": "plusMinus",
+    "penalty_minutes": "pim",
+    "power_play_goals": "powerPlayGoals",
+    "pp_points": "powerPlayPoints",
+    "sh_goals": "shorthandedGoals",
+    "sh_points": "shorthandedPoints",
+    "game_winning_goals": "gameWinningGoals",
+    "ot_goals": "otGoals",
+    "shots": "shots",
+    "shifts": "shifts",
+    "toi": "toi",
+}
+
+GOALIE_GAME_FIELDS = {
+    "game_id": "gameId",
+    "home_road": "homeRoadFlag",
+    "game_date": "gameDate",
+    "goals_against": "goalsAgainst",
+    "save_pct": "savePctg",
+    "shots_against": "shotsAgainst",
+    "decision": "decision",
+    "shutouts": "shutouts",
+    "games_started": "gamesStarted",
+    "penalty_minutes": "pim",
+    "toi": "toi",
+}
+
+_TEAM_STATS_ROWS = _row_adapter(TeamStats)
+_SKATER_SEASON_ROWS = _row_adapter(SkaterSeasonStats)
+_GOALIE_SEASON_ROWS = _row_adapter(GoalieSeasonStats)
+_SKATER_GAME_ROWS = _row_adapter(SkaterGameStats)
+_GOALIE_GAME_ROWS = _row_adapter(GoalieGameStats)
+_GAME_ROWS = _row_adapter(Game)
+_SKATER_SEASON_DEFAULTS = _defaults(SkaterSeasonStats)
+_GOALIE_SEASON_DEFAULTS = _defaults(GoalieSeasonStats)
+_SKATER_GAME_DEFAULTS = _defaults(SkaterGameStats)
+_GOALIE_GAME_DEFAULTS = _defaults(GoalieGameStats)
+
+def _map_fields(items, fields, defaults=None):
+    defaults = defaults or {}
+    return [{**defaults, **{col: item.get(src) for col, src in fields.items()}} for item in items]
+
 def transform_team_stats(raw_data):
-    transformed = []
-    for item in raw_data['data']:
-        team_stats = TeamStats(
-            team_id=item['teamId'],
-            season_id=item['seasonId'],
-            games_played=item['gamesPlayed'],
-            wins=item['wins'],
-            losses=item['losses'],
-            ot_losses=item['otLosses'],
-            points=item['points'],
-            goals_for=item['goalsFor'],
-            goals_against=item['goalsAgainst'],
-            goals_for_per_game=item['goalsForPerGame'],
-            goals_against_per_game=item['goalsAgainstPerGame'],
-            shots_for_per_game=item['shotsForPerGame'],
-            shots_against_per_game=item['shotsAgainstPerGame'],
-            power_play_pct=item['powerPlayPct'],
-            penalty_kill_pct=item['penaltyKillPct'],
-            faceoff_win_pct=item['faceoffWinPct'],
-            team_full_name=item['teamFullName']
-        )
-        transformed.append(team_stats.model_dump())
-    return transformed
+    return _TEAM_STATS_ROWS.validate_python(
+        _map_fields(raw_data['data'], TEAM_STATS_FIELDS)
+    )
 
 
 def transform_seasons(*season_ids):
@@ -208,6 +391,9 @@ def transform_seasons(*season_ids):
     return transformed
 
 def transform_players_dimension(raw):
+    # Stamped explicitly: upserts do not re-apply column defaults, and incremental
+    # runs use this to decide which bios are stale.
+    refreshed_at = datetime.now(timezone.utc).isoformat()
     rows = []
     for p in raw:
         rows.append({
@@ -228,70 +414,19 @@ def transform_players_dimension(raw):
             "draft_team_abbrev": p.get("draftDetails", {}).get("teamAbbrev"),
             "draft_round": p.get("draftDetails", {}).get("round"),
             "draft_overall_pick": p.get("draftDetails", {}).get("overallPick"),
+            "updated_at": refreshed_at,
         })
     return rows
 
 def transform_skater_season_stats(raw_data):
-    transformed = []
-    for item in raw_data['data']:
-        stats = SkaterSeasonStats(
-            player_id=item['playerId'],
-            season_id=item['seasonId'],
-            team_abbrev=item.get('teamAbbrevs'),
-            full_name=item.get('skaterFullName'),
-            position_code=item.get('positionCode'),
-            games_played=item.get('gamesPlayed'),
-            goals=item.get('goals'),
-            assists=item.get('assists'),
-            points=item.get('points'),
-            plus_minus=item.get('plusMinus'),
-            penalty_minutes=item.get('penaltyMinutes'),
-            power_play_goals=item.get('ppGoals'),
-            pp_points=item.get('ppPoints'),
-            sh_goals=item.get('shGoals'),
-            sh_points=item.get('shPoints'),
-            ev_goals=item.get('evGoals'),
-            ev_points=item.get('evPoints'),
-            game_winning_goals=item.get('gameWinningGoals'),
-            ot_goals=item.get('otGoals'),
-            shots=item.get('shots'),
-            shooting_pct=item.get('shootingPct'),
-            toi_per_game=item.get('timeOnIcePerGame'),
-            faceoff_win_pct=item.get('faceoffWinPct'),
-            points_per_game=item.get('pointsPerGame'),
-            shoots_catches=item.get('shootsCatches'),
-        )
-        transformed.append(stats.model_dump())
-    return transformed
+    return _SKATER_SEASON_ROWS.validate_python(
+        _map_fields(raw_data['data'], SKATER_SEASON_FIELDS, _SKATER_SEASON_DEFAULTS)
+    )
 
 def transform_goalie_season_stats(raw_data):
-    transformed = []
-    for item in raw_data['data']:
-        stats = GoalieSeasonStats(
-            player_id=item['playerId'],
-            season_id=item['seasonId'],
-            team_abbrev=item.get('teamAbbrevs'),
-            full_name=item.get('goalieFullName'),
-            games_played=item.get('gamesPlayed'),
-            games_started=item.get('gamesStarted'),
-            wins=item.get('wins'),
-            losses=item.get('losses'),
-            ot_losses=item.get('otLosses'),
-            goals_against=item.get('goalsAgainst'),
-            goals_against_average=item.get('goalsAgainstAverage'),
-            shots_against=item.get('shotsAgainst'),
-            saves=item.get('saves'),
-            save_pct=item.get('savePct'),
-            shutouts=item.get('shutouts'),
-            goals=item.get('goals'),
-            assists=item.get('assists'),
-            points=item.get('points'),
-            penalty_minutes=item.get('penaltyMinutes'),
-            toi=item.get('timeOnIce'),
-            shoots_catches=item.get('shootsCatches'),
-        )
-        transformed.append(stats.model_dump())
-    return transformed
+    return _GOALIE_SEASON_ROWS.validate_python(
+        _map_fields(raw_data['data'], GOALIE_SEASON_FIELDS, _GOALIE_SEASON_DEFAULTS)
+    )
 
 def _extract_default(value):
     """Extract string from NHL API's {"default": "value"} wrapper."""
@@ -299,73 +434,294 @@ def _extract_default(value):
         return value.get("default")
     return value
 
+def _skater_game_inputs(player_id, game_log):
+    rows = _map_fields(game_log, SKATER_GAME_FIELDS, _SKATER_GAME_DEFAULTS)
+    for row, game in zip(rows, game_log):
+        row['player_id'] = player_id
+        row['team_abbrev'] = _extract_default(game.get('teamAbbrev'))
+        row['opponent_abbrev'] = _extract_default(game.get('opponentAbbrev'))
+        row['toi_seconds'] = toi_to_seconds(game.get('toi'))
+    return rows
+
+def _goalie_game_inputs(player_id, game_log):
+    rows = _map_fields(game_log, GOALIE_GAME_FIELDS, _GOALIE_GAME_DEFAULTS)
+    for row, game in zip(rows, game_log):
+        row['player_id'] = player_id
+        row['team_abbrev'] = _extract_default(game.get('teamAbbrev'))
+        row['opponent_abbrev'] = _extract_default(game.get('opponentAbbrev'))
+        row['toi_seconds'] = toi_to_seconds(game.get('toi'))
+        # Not in the game log API; derived when both inputs are present.
+        if game.get('shotsAgainst') is not None and game.get('goalsAgainst') is not None:
+            row['saves'] = game['shotsAgainst'] - game['goalsAgainst']
+    return rows
+
 def transform_skater_game_logs(player_id, game_log):
-    transformed = []
-    for game in game_log:
-        stats = SkaterGameStats(
-            player_id=player_id,
-            game_id=game['gameId'],
-            team_abbrev=_extract_default(game.get('teamAbbrev')),
-            home_road=game.get('homeRoadFlag'),
-            game_date=game.get('gameDate'),
-            opponent_abbrev=_extract_default(game.get('opponentAbbrev')),
-            goals=game.get('goals'),
-            assists=game.get('assists'),
-            points=game.get('points'),
-            plus_minus=game.get('plusMinus'),
-            penalty_minutes=game.get('pim'),
-            power_play_goals=game.get('powerPlayGoals'),
-            pp_points=game.get('powerPlayPoints'),
-            sh_goals=game.get('shorthandedGoals'),
-            sh_points=game.get('shorthandedPoints'),
-            game_winning_goals=game.get('gameWinningGoals'),
-            ot_goals=game.get('otGoals'),
-            shots=game.get('shots'),
-            shifts=game.get('shifts'),
-            toi=game.get('toi'),
-        )
-        transformed.append(stats.model_dump())
-    return transformed
+    return _SKATER_GAME_ROWS.validate_python(_skater_game_inputs(player_id, game_log))
 
 def transform_goalie_game_logs(player_id, game_log):
-    transformed = []
-    for game in game_log:
-        stats = GoalieGameStats(
-            player_id=player_id,
-            game_id=game['gameId'],
-            team_abbrev=_extract_default(game.get('teamAbbrev')),
-            home_road=game.get('homeRoadFlag'),
-            game_date=game.get('gameDate'),
-            opponent_abbrev=_extract_default(game.get('opponentAbbrev')),
-            goals_against=game.get('goalsAgainst'),
-            saves=None,  # Not in game log API; computed from shotsAgainst - goalsAgainst
-            save_pct=game.get('savePctg'),
-            shots_against=game.get('shotsAgainst'),
-            decision=game.get('decision'),
-            shutouts=game.get('shutouts'),
-            games_started=game.get('gamesStarted'),
-            penalty_minutes=game.get('pim'),
-            toi=game.get('toi'),
-        )
-        # Compute saves if we have the data
-        if game.get('shotsAgainst') is not None and game.get('goalsAgainst') is not None:
-            stats.saves = game['shotsAgainst'] - game['goalsAgainst']
-        transformed.append(stats.model_dump())
-    return transformed
+    return _GOALIE_GAME_ROWS.validate_python(_goalie_game_inputs(player_id, game_log))
+
+class TeamGameRollup:
+    """Accumulates per-player game rows into one TeamGameStats per (team, game).
+
+    Memory is proportional to team-games, not player-games, so streaming runs can
+    feed it batch by batch.
+    """
+
+    def __init__(self):
+        self.teams = {}
+
+    def _row(self, game):
+        key = (game.get('team_abbrev'), game['game_id'])
+        if key not in self.teams:
+            self.teams[key] = TeamGameStats(team_abbrev=game.get('team_abbrev'), game_id=game['game_id'])
+        return self.teams[key]
+
+    def add_skater_games(self, skater_games):
+        for game in skater_games:
+            if not game.get('team_abbrev'):
+                continue
+            row = self._row(game)
+            row.goals += game.get('goals') or 0
+            row.shots += game.get('shots') or 0
+            row.power_play_goals += game.get('power_play_goals') or 0
+            row.penalty_minutes += game.get('penalty_minutes') or 0
+            row.skaters_dressed += 1
+
+    def add_goalie_games(self, goalie_games):
+        for game in goalie_games:
+            if not game.get('team_abbrev'):
+                continue
+            row = self._row(game)
+            row.goals_against += game.get('goals_against') or 0
+            row.shots_against += game.get('shots_against') or 0
+            row.penalty_minutes += game.get('penalty_minutes') or 0
+            if game.get('decision'):
+                row.decision = game['decision']
+
+    def rows(self):
+        return [row.model_dump() for row in self.teams.values()]
+
+def transform_team_game_stats(skater_games, goalie_games):
+    """Roll per-player game rows up to one row per (team, game)."""
+    rollup = TeamGameRollup()
+    rollup.add_skater_games(skater_games)
+    rollup.add_goalie_games(goalie_games)
+    return rollup.rows()
+
+def transform_games(schedule_games):
+    """One row per completed game from the schedule feed.
+
+    Scores are the final ones from the schedule, so a shootout winner is credited
+    with its deciding goal, which no player's game log records.
+    """
+    return _GAME_ROWS.validate_python([
+        {
+            'game_id': game['id'],
+            'season_id': game['season'],
+            'game_date': game['gameDate'],
+            'home_team_abbrev': game['homeTeam']['abbrev'],
+            'away_team_abbrev': game['awayTeam']['abbrev'],
+            'home_team_score': game['homeTeam'].get('score'),
+            'away_team_score': game['awayTeam'].get('score'),
+        }
+        for game in schedule_games
+    ])
+
+# ---------------------
+# Upload Engine
+# ---------------------
+
+UPLOAD_CONCURRENCY = 4
+UPLOAD_BATCH_SIZE = 500
+MIN_UPLOAD_BATCH = 50
+MAX_UPLOAD_BATCH = 5000
+# Keep request bodies well under the Supabase gateway limit.
+MAX_UPLOAD_BYTES = 2_000_000
+# Batch size is steered towards batches that take about this long.
+UPLOAD_TARGET_SECONDS = 2.0
+UPLOAD_MAX_RETRIES = 4
+UPLOAD_BACKOFF_SECONDS = 1.0
+# Postgres/PostgREST error codes, plus bare HTTP statuses for non-JSON gateway
+# errors, that are worth retrying. Timeouts and oversized bodies retry as two halves.
+RETRY_UPLOAD_CODES = {
+    "transport", "408", "429", "500", "502", "503", "504", "520",
+    "40001", "40P01", "53300", "PGRST000", "PGRST001", "PGRST002", "PGRST003",
+}
+SPLIT_UPLOAD_CODES = {"413", "57014"}
+
+def _upload_error_code(exc):
+    if isinstance(exc, httpx.TransportError):
+        return "transport"
+    if isinstance(exc, APIError):
+        return str(exc.code)
+    return None
+
+class UploadEngine:
+    """Upserts rows as a bounded number of concurrent batches.
+
+    Batch size is tuned per table from each batch's throughput, towards
+    UPLOAD_TARGET_SECONDS per request, and capped so a request body stays under
+    MAX_UPLOAD_BYTES. A batch that fails transiently is retried on its own with
+    backoff while the others keep going; ``upsert`` raises once the rest is sent.
+    With a ``bulk`` loader attached (see bulk_load.CopyLoader), the rows go over
+    COPY instead of PostgREST as one batch per call, merged by one statement; the
+    byte cap is a gateway limit and does not apply. Retries and splits still do.
+    """
+
+    def __init__(self, concurrency=UPLOAD_CONCURRENCY, batch_size=UPLOAD_BATCH_SIZE):
+        self.bulk = None
+        self.concurrency = concurrency
+        self.initial_batch_size = batch_size
+        self.batch_sizes = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="upload")
+
+    def _next_batch_size(self, table, row_bytes):
+        with self._lock:
+            size = self.batch_sizes.get(table, self.initial_batch_size)
+        return max(1, min(size, MAX_UPLOAD_BYTES // row_bytes))
+
+    def _record(self, table, rows, seconds):
+        with self._lock:
+            size = self.batch_sizes.get(table, self.initial_batch_size)
+            ideal = rows * UPLOAD_TARGET_SECONDS / max(seconds, 0.001)
+            size = min(max(ideal, size * 0.5), size * 1.5)
+            self.batch_sizes[table] = int(min(max(size, MIN_UPLOAD_BATCH), MAX_UPLOAD_BATCH))
+
+    def _shrink(self, table):
+        with self._lock:
+            size = self.batch_sizes.get(table, self.initial_batch_size)
+            self.batch_sizes[table] = max(MIN_UPLOAD_BATCH, size // 2)
+
+    def _send(self, table, batch, conflict_cols, attempt):
+        if attempt:
+            time.sleep(UPLOAD_BACKOFF_SECONDS * 2 ** (attempt - 1) * (0.5 + random.random()))
+        started = time.monotonic()
+        if self.bulk is not None:
+            self.bulk.upsert(table, batch, conflict_cols)
+        else:
+            supabase.table(table).upsert(batch, on_conflict=conflict_cols).execute()
+        return time.monotonic() - started
+
+    def _error_code(self, exc):
+        if self.bulk is not None:
+            return self.bulk.error_code(exc)
+        return _upload_error_code(exc)
+
+    def upsert(self, table, rows, conflict_cols):
+        """Upsert ``rows`` into ``table``; returns the number of rows written."""
+        if not rows:
+            return 0
+        sample = rows[:50]
+        row_bytes = len(json.dumps(sample, default=str)) // len(sample) + 1
+        retries = deque()
+        in_flight = {}
+        offset = written = 0
+        error = None
+        while in_flight or ((retries or offset < len(rows)) and error is None):
+            while len(in_flight) < self.concurrency and error is None and (retries or offset < len(rows)):
+                if retries:
+                    batch, attempt = retries.popleft()
+                else:
+                    size = len(rows) if self.bulk is not None else self._next_batch_size(table, row_bytes)
+                    batch, attempt = rows[offset:offset + size], 0
+                    offset += len(batch)
+                future = self._pool.submit(self._send, table, batch, conflict_cols, attempt)
+                in_flight[future] = (batch, attempt)
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch, attempt = in_flight.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as exc:
+                    code = self._error_code(exc)
+                    retryable = code in RETRY_UPLOAD_CODES or code in SPLIT_UPLOAD_CODES
+                    if not retryable or attempt >= UPLOAD_MAX_RETRIES:
+                        # Permanent errors would fail every batch; stop dispatching.
+                        error = error or exc
+                        continue
+                    self._shrink(table)
+                    print(f"  {table}: retrying {len(batch)} rows after error {code}")
+                    if code in SPLIT_UPLOAD_CODES and len(batch) > 1:
+                        middle = len(batch) // 2
+                        retries.extend([(batch[:middle], attempt + 1), (batch[middle:], attempt + 1)])
+                    else:
+                        retries.append((batch, attempt + 1))
+                else:
+                    written += len(batch)
+                    if self.bulk is None:
+                        self._record(table, len(batch), seconds)
+        if error is not None:
+            raise RuntimeError(
+                f"Upload to {table} failed: {len(rows) - written} of {len(rows)} rows not written"
+            ) from error
+        return written
+
+
+_upload_engine = UploadEngine()
+
+# ---------------------
+# Change Detection
+# ---------------------
+
+# Bookkeeping columns that change on every run without the content changing.
+UNHASHED_COLUMNS = {"row_hash", "updated_at"}
+
+def row_hash(row):
+    content = {k: v for k, v in row.items() if k not in UNHASHED_COLUMNS}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _key(row, key_cols):
+    return tuple(row[col] for col in key_cols)
+
+def load_row_hashes(table, key_cols, season_ids=None):
+    """Stored ``row_hash`` per key, optionally limited to the given seasons."""
+    columns = ", ".join([*key_cols, "row_hash"])
+
+    def build_query():
+        query = supabase.table(table).select(columns).not_.is_("row_hash", "null")
+        return query.in_("season_id", season_ids) if season_ids else query
+
+    return {_key(row, key_cols): row["row_hash"] for row in _fetch_all(build_query)}
+
+def split_changed(table, cleaned, conflict_cols):
+    """Stamp each row's ``row_hash`` and split rows into ``(changed, unchanged)``.
+
+    Stored hashes come from the table itself, so a row is re-sent whenever its
+    content differs from what was last written, whichever run wrote it.
+    """
+    key_cols = [col.strip() for col in conflict_cols.split(",")]
+    season_ids = sorted({row["season_id"] for row in cleaned}) if "season_id" in key_cols else None
+    stored = load_row_hashes(table, key_cols, season_ids)
+    changed, unchanged = [], []
+    for row in cleaned:
+        row["row_hash"] = row_hash(row)
+        (unchanged if stored.get(_key(row, key_cols)) == row["row_hash"] else changed).append(row)
+    return changed, unchanged
+
+def _upload_changed(table, cleaned, conflict_cols, only_changed):
+    unchanged = []
+    if only_changed:
+        cleaned, unchanged = split_changed(table, cleaned, conflict_cols)
+    else:
+        # Still stamp hashes so the next diffed run compares against this content.
+        for row in cleaned:
+            row["row_hash"] = row_hash(row)
+    _upload_engine.upsert(table, cleaned, conflict_cols)
+    return cleaned, unchanged
 
 # ---------------------
 # Upload Functions
 # ---------------------
 
-def upload_teams(cleaned):
+def upload_teams(cleaned, only_changed=True):
     if not cleaned:
         print("No team data to upload")
         return
-    supabase.table("team_stats").upsert(
-        cleaned,
-        on_conflict="team_id, season_id"
-    ).execute()
-    print(f"Team stats uploaded: {len(cleaned)} rows")
+    sent, unchanged = _upload_changed("team_stats", cleaned, "team_id, season_id", only_changed)
+    print(f"Team stats uploaded: {len(sent)} rows ({len(unchanged)} unchanged)")
 
 
 def upload_seasons(cleaned):
@@ -380,55 +736,116 @@ def upload_seasons(cleaned):
         supabase.table("seasons").update({"is_current": False}).neq(
             "season_id", current_season_id
         ).execute()
-    supabase.table("seasons").upsert(
-        cleaned,
-        on_conflict="season_id"
-    ).execute()
+    _upload_engine.upsert("seasons", cleaned, "season_id")
     print(f"Season data uploaded: {len(cleaned)} rows")
 
-def upload_players(cleaned):
-    if not cleaned:
+def upload_players(cleaned, only_changed=True, unchanged_ids=()):
+    """Upsert player rows; ``unchanged_ids`` had landing pages identical to their last load."""
+    if not cleaned and not unchanged_ids:
         print("No player data to upload")
         return
-    supabase.table("players").upsert(
-        cleaned,
-        on_conflict="player_id"
-    ).execute()
-    print(f"Player data uploaded: {len(cleaned)} rows")
+    sent, unchanged = _upload_changed("players", cleaned, "player_id", only_changed) if cleaned else ([], [])
+    # Unchanged bios were still refreshed; keep updated_at current so incremental
+    # runs don't treat them as stale.
+    ids = [row["player_id"] for row in unchanged] + list(unchanged_ids)
+    refreshed_at = datetime.now(timezone.utc).isoformat()
+    for i in range(0, len(ids), 200):
+        supabase.table("players").update({"updated_at": refreshed_at}).in_(
+            "player_id", ids[i:i + 200]
+        ).execute()
+    print(f"Player data uploaded: {len(sent)} rows ({len(ids)} unchanged)")
 
-def upload_skater_season_stats(cleaned):
+def upload_skater_season_stats(cleaned, only_changed=True):
     if not cleaned:
         print("No skater season stats to upload")
         return
-    supabase.table("player_season_stats").upsert(
-        cleaned,
-        on_conflict="player_id, season_id"
-    ).execute()
-    print(f"Skater season stats uploaded: {len(cleaned)} rows")
+    sent, unchanged = _upload_changed("player_season_stats", cleaned, "player_id, season_id", only_changed)
+    print(f"Skater season stats uploaded: {len(sent)} rows ({len(unchanged)} unchanged)")
 
-def upload_goalie_season_stats(cleaned):
+def upload_goalie_season_stats(cleaned, only_changed=True):
     if not cleaned:
         print("No goalie season stats to upload")
         return
-    supabase.table("goalie_season_stats").upsert(
-        cleaned,
-        on_conflict="player_id, season_id"
-    ).execute()
-    print(f"Goalie season stats uploaded: {len(cleaned)} rows")
+    sent, unchanged = _upload_changed("goalie_season_stats", cleaned, "player_id, season_id", only_changed)
+    print(f"Goalie season stats uploaded: {len(sent)} rows ({len(unchanged)} unchanged)")
 
-def _upload_in_batches(table, cleaned, conflict_cols, batch_size=500):
+def _upload_in_batches(table, cleaned, conflict_cols):
     if not cleaned:
         print(f"No data to upload to {table}")
         return
-    total = 0
-    for i in range(0, len(cleaned), batch_size):
-        batch = cleaned[i:i + batch_size]
-        supabase.table(table).upsert(
-            batch,
-            on_conflict=conflict_cols
-        ).execute()
-        total += len(batch)
-    print(f"{table} uploaded: {total} rows")
+    total = _upload_engine.upsert(table, cleaned, conflict_cols)
+    print(f"{table} uploaded: {total} rows (batch size now {_upload_engine.batch_sizes.get(table)})")
+
+class BatchUploader:
+    """Upserts rows on a background thread, fed through a bounded queue.
+
+    ``submit`` blocks once ``queue_size`` submissions are waiting, which keeps a fast
+    producer from buffering more than a few batches. Rows are grouped per table and
+    handed to the upload engine ``flush_rows`` at a time, enough to keep all of its
+    concurrent batches busy; ``close`` flushes the remainder and re-raises any
+    upload error. With a bulk loader, each table is instead staged once, every
+    flush is COPYed into it and ``close`` merges it with one statement.
+    """
+
+    def __init__(self, conflict_cols, flush_rows=2000, queue_size=8):
+        self.conflict_cols = conflict_cols
+        self.flush_rows = flush_rows
+        self.totals = {table: 0 for table in conflict_cols}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._staged = {}
+        if _upload_engine.bulk is not None:
+            for table, cols in conflict_cols.items():
+                self._staged[table] = _upload_engine.bulk.stage(table, cols)
+        self._thread = threading.Thread(target=self._run, name="batch-uploader", daemon=True)
+        self._thread.start()
+
+    def submit(self, table, rows):
+        if rows:
+            self._queue.put((table, rows))
+
+    def _upsert(self, table, batch):
+        if self._error is not None:
+            return
+        try:
+            if table in self._staged:
+                self._staged[table].copy(batch)
+            else:
+                self.totals[table] += _upload_engine.upsert(table, batch, self.conflict_cols[table])
+        except Exception as exc:
+            # Keep draining so submit() never blocks on a dead consumer.
+            self._error = exc
+
+    def _run(self):
+        pending = {table: [] for table in self.conflict_cols}
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            table, rows = item
+            pending[table].extend(rows)
+            if len(pending[table]) >= self.flush_rows:
+                self._upsert(table, pending[table])
+                pending[table] = []
+        for table, rows in pending.items():
+            if rows:
+                self._upsert(table, rows)
+        for table, staged in self._staged.items():
+            if self._error is not None:
+                staged.abort()
+                continue
+            try:
+                self.totals[table] = staged.commit()
+            except Exception as exc:
+                self._error = exc
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        for table, total in self.totals.items():
+            print(f"{table} uploaded: {total} rows")
 
 def upload_skater_game_stats(cleaned):
     _upload_in_batches("player_game_stats", cleaned, "player_id, game_id")
@@ -436,71 +853,363 @@ def upload_skater_game_stats(cleaned):
 def upload_goalie_game_stats(cleaned):
     _upload_in_batches("goalie_game_stats", cleaned, "player_id, game_id")
 
+def upload_games(cleaned):
+    _upload_in_batches("games", cleaned, "game_id")
+
+def upload_team_game_stats(cleaned):
+    _upload_in_batches("team_game_stats", cleaned, "team_abbrev, game_id")
+
+def season_opening(season_id):
+    """A date no later than the first regular-season game of ``season_id``."""
+    return date(int(season_id) // 10000, 9, 1)
+
+def upload_game_facts(team_games, since):
+    """Upload the schedule's completed games from ``since`` on, then the team-game rows.
+
+    The schedule is read after the logs, so a game the logs include is normally
+    final there too; any that is not yet is left for the next run rather than
+    written without its game row.
+    """
+    games = transform_games(scrape_schedule_games(since))
+    upload_games(games)
+    scheduled = {game['game_id'] for game in games}
+    upload_team_game_stats([row for row in team_games if row['game_id'] in scheduled])
+
+def upload_projections(cleaned):
+    # Skater and goalie rows carry different stat columns; PostgREST bulk upserts
+    # need uniform keys, so each type goes up as its own batch set.
+    for season_type in ("skater", "goalie"):
+        rows = [row for row in cleaned if row["season_type"] == season_type]
+        _upload_in_batches("player_projections", rows, "player_id, season_id")
+
+# ---------------------
+# Incremental Loads
+# ---------------------
+
+def _fetch_all(build_query, page_size=1000):
+    """Page through a PostgREST query; Supabase caps each response at 1000 rows."""
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+def _season_game_id_bounds(season_id):
+    start_year = int(season_id) // 10000
+    return start_year * 1_000_000, (start_year + 1) * 1_000_000 - 1
+
+def load_fresh_player_ids(max_age_days):
+    """Players whose landing data was refreshed within the last ``max_age_days``."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    # A NULL updated_at never matches gte, so unstamped rows count as stale.
+    rows = _fetch_all(
+        lambda: supabase.table("players").select("player_id").gte("updated_at", cutoff.isoformat())
+    )
+    return {row["player_id"] for row in rows}
+
+def load_game_log_watermarks(source, season_id):
+    """Latest stored game_date per player this season, from Supabase or the local file."""
+    if source == "file":
+        return load_watermark_file()
+    try:
+        rows = _fetch_all(
+            lambda: supabase.rpc("game_log_watermarks", {"p_season_id": int(season_id)})
+        )
+    except Exception as exc:
+        print(f"Watermark lookup failed ({exc}); using {WATERMARK_FILE.name}")
+        return load_watermark_file()
+    return {
+        row["player_id"]: date.fromisoformat(row["last_game_date"])
+        for row in rows
+        if row.get("last_game_date")
+    }
+
+def load_stored_games(table, season_id, columns):
+    """Read this season's stored game rows, for consumers that need full logs."""
+    first_game_id, last_game_id = _season_game_id_bounds(season_id)
+    return _fetch_all(
+        lambda: supabase.table(table)
+        .select(columns)
+        .gte("game_id", first_game_id)
+        .lte("game_id", last_game_id)
+        .order("player_id")
+        .order("game_id")
+    )
+
+def load_recent_games(kind, season_id, columns, games=RECENT_WINDOW):
+    """Each player's latest ``games`` stored rows this season (kind: "skater" or "goalie").
+
+    Served by the recent_*_games RPC, so the transfer is bounded by the window
+    rather than the season; falls back to the full season when it is missing.
+    """
+    try:
+        return _fetch_all(
+            lambda: supabase.rpc(f"recent_{kind}_games", {"p_season_id": int(season_id), "p_games": games})
+        )
+    except Exception as exc:
+        print(f"Recent {kind} games lookup failed ({exc}); reading the full season")
+        table = "player_game_stats" if kind == "skater" else "goalie_game_stats"
+        return load_stored_games(table, season_id, columns)
+
+def load_team_game_counts(season_id):
+    """Completed games per team abbreviation this season, from the games dimension.
+
+    Returns ``{}`` when the lookup fails; projections then estimate team games
+    from the rosters instead.
+    """
+    try:
+        rows = _fetch_all(
+            lambda: supabase.table("games")
+            .select("game_id, home_team_abbrev, away_team_abbrev")
+            .eq("season_id", int(season_id))
+            .order("game_id")
+        )
+    except Exception as exc:
+        print(f"Team game counts unavailable ({exc}); estimating from rosters")
+        return {}
+    counts = {}
+    for row in rows:
+        for team in (row.get("home_team_abbrev"), row.get("away_team_abbrev")):
+            if team:
+                counts[team] = counts.get(team, 0) + 1
+    return counts
+
+def stream_game_logs(player_ids, skater_ids, watermarks, since=None, queue_size=64, failed=None):
+    """Scrape, transform and upload game logs as an overlapping stream.
+
+    Each completed scrape is transformed immediately and handed to a BatchUploader,
+    so peak memory is bounded by the queues rather than the season. Only the
+    team-game rollup (one row per team-game) and the watermarks are kept.
+    Returns ``(team_games, watermarks)``; ids whose scrape failed go to ``failed``.
+    """
+    skater_ids = set(skater_ids)
+    uploader = BatchUploader({
+        "player_game_stats": "player_id, game_id",
+        "goalie_game_stats": "player_id, game_id",
+    })
+    rollup = TeamGameRollup()
+    advanced = dict(watermarks)
+    cutoff = since.isoformat() if since is not None else ''
+    try:
+        for pid, logs in iter_game_logs(player_ids, queue_size=queue_size, failed=failed):
+            if since is not None and pid in watermarks:
+                logs = logs_since(logs, since)
+            if not logs:
+                continue
+            latest = max(date.fromisoformat(g['gameDate']) for g in logs)
+            advanced[pid] = max(latest, advanced.get(pid, latest))
+            if pid in skater_ids:
+                rows = add_skater_game_rates(transform_skater_game_logs(pid, logs))
+                rollup.add_skater_games(g for g in rows if (g.get('game_date') or '') >= cutoff)
+                uploader.submit("player_game_stats", rows)
+            else:
+                rows = transform_goalie_game_logs(pid, logs)
+                rollup.add_goalie_games(g for g in rows if (g.get('game_date') or '') >= cutoff)
+                uploader.submit("goalie_game_stats", rows)
+    finally:
+        uploader.close()
+    return rollup.rows(), advanced
+
 # ---------------------
 # Main Pipeline
 # ---------------------
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape NHL stats and load them into Supabase.")
+    parser.add_argument(
+        "--game-logs",
+        choices=("incremental", "full"),
+        default="incremental",
+        help="incremental: only players whose team played since their latest stored game; "
+             "full: re-scrape and re-upload every player's season log",
+    )
+    parser.add_argument(
+        "--watermarks",
+        choices=("supabase", "file"),
+        default="supabase",
+        help=f"where incremental runs read per-player watermarks (file: raw/{WATERMARK_FILE.name})",
+    )
+    parser.add_argument(
+        "--players",
+        choices=("incremental", "full"),
+        default="incremental",
+        help="incremental: fetch landing pages only for players missing from the players "
+             "table or older than --player-max-age-days; full: refresh every rostered player",
+    )
+    parser.add_argument("--player-max-age-days", type=int, default=7)
+    parser.add_argument(
+        "--upserts",
+        choices=("changed", "all"),
+        default="changed",
+        help="changed: send only team, season-stat and player rows whose content hash "
+             "differs from the stored row_hash; all: re-send every row",
+    )
+    parser.add_argument(
+        "--loader",
+        choices=("auto", "postgrest", "copy"),
+        default="auto",
+        help="how rows are written: copy bulk-loads over SUPABASE_DB_URL, postgrest upserts "
+             "through the REST API; auto uses copy whenever SUPABASE_DB_URL is set",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="overlap game-log scraping, transform and upload through bounded queues "
+             "instead of holding the whole season in memory",
+    )
+    args = parser.parse_args()
+
     validate_supabase_schema()
 
-    # 1. Scrape and transform team stats
-    print("=== Scraping team stats ===")
-    raw_teams = scrape_teams()
-    transformed_teams = transform_team_stats(raw_teams)
-
-    # 2. Scrape and transform skater season stats (bulk — 1 API call)
-    print("\n=== Scraping skater season stats ===")
-    raw_skaters = scrape_skater_stats()
-    transformed_skaters = transform_skater_season_stats(raw_skaters)
-
-    # 3. Scrape and transform goalie season stats (bulk — 1 API call)
-    print("\n=== Scraping goalie season stats ===")
-    raw_goalies = scrape_goalie_stats()
-    transformed_goalies = transform_goalie_season_stats(raw_goalies)
-
-    # 4. Upsert season dimension rows before writing season-scoped facts.
-    season_rows = transform_seasons(
-        *(row["season_id"] for row in transformed_teams),
-        *(row["season_id"] for row in transformed_skaters),
-        *(row["season_id"] for row in transformed_goalies),
-    )
-    upload_seasons(season_rows)
-
-    # 5. Upload season-scoped facts after the season dimension is available.
-    upload_teams(transformed_teams)
-    upload_skater_season_stats(transformed_skaters)
-    upload_goalie_season_stats(transformed_goalies)
-
-    # 6. Player dimension data
-    print("\n=== Scraping player dimension data ===")
-    raw_players = scrape_players()
-    transformed_players = transform_players_dimension(raw_players)
-    upload_players(transformed_players)
-
-    # 7. Collect all player IDs from bulk stats, then scrape game logs
-    skater_ids = [s['player_id'] for s in transformed_skaters]
-    goalie_ids = [g['player_id'] for g in transformed_goalies]
-
-    all_player_ids = skater_ids + goalie_ids
-    print(f"\n=== Scraping game logs for {len(all_player_ids)} players ===")
-    all_game_logs = scrape_all_game_logs(all_player_ids)
-
-    # 8. Transform and upload skater game stats
-    print("\n=== Processing skater game stats ===")
-    all_skater_games = []
-    for pid in skater_ids:
-        logs = all_game_logs.get(pid, [])
-        if logs:
-            all_skater_games.extend(transform_skater_game_logs(pid, logs))
-    upload_skater_game_stats(all_skater_games)
-
-    # 9. Transform and upload goalie game stats
-    print("\n=== Processing goalie game stats ===")
-    all_goalie_games = []
-    for pid in goalie_ids:
-        logs = all_game_logs.get(pid, [])
-        if logs:
-            all_goalie_games.extend(transform_goalie_game_logs(pid, logs))
-    upload_goalie_game_stats(all_goalie_games)
+    db_url = os.getenv("SUPABASE_DB_URL")
+    if args.loader == "copy" and not db_url:
+        parser.error("--loader copy requires SUPABASE_DB_URL")
+    if db_url and args.loader != "postgrest":
+        from bulk_load import CopyLoader
+        _upload_engine.bulk = CopyLoader(db_url)
+        print("Writing rows with Postgres COPY via SUPABASE_DB_URL")
+
+    try:
+        # 1. Scrape and transform team stats
+        print("=== Scraping team stats ===")
+        raw_teams = scrape_teams()
+        transformed_teams = transform_team_stats(raw_teams)
+
+        # 2. Scrape and transform skater season stats (bulk — 1 API call)
+        print("\n=== Scraping skater season stats ===")
+        raw_skaters = scrape_skater_stats()
+        transformed_skaters = add_skater_season_rates(transform_skater_season_stats(raw_skaters))
+
+        # 3. Scrape and transform goalie season stats (bulk — 1 API call)
+        print("\n=== Scraping goalie season stats ===")
+        raw_goalies = scrape_goalie_stats()
+        transformed_goalies = transform_goalie_season_stats(raw_goalies)
+
+        # 4. Upsert season dimension rows before writing season-scoped facts.
+        season_rows = transform_seasons(
+            *(row["season_id"] for row in transformed_teams),
+            *(row["season_id"] for row in transformed_skaters),
+            *(row["season_id"] for row in transformed_goalies),
+        )
+        upload_seasons(season_rows)
+
+        # 5. Upload season-scoped facts after the season dimension is available.
+        only_changed = args.upserts == "changed"
+        upload_teams(transformed_teams, only_changed)
+        upload_skater_season_stats(transformed_skaters, only_changed)
+        upload_goalie_season_stats(transformed_goalies, only_changed)
+
+        # 6. Player dimension data
+        print("\n=== Scraping player dimension data ===")
+        fresh_player_ids = set()
+        if args.players == "incremental":
+            fresh_player_ids = load_fresh_player_ids(args.player_max_age_days)
+        # Diffed runs skip landing pages identical to the last one written; full
+        # upserts rewrite every row, so they parse every page.
+        unchanged_player_ids = set() if only_changed else None
+        raw_players = scrape_players(skip_ids=fresh_player_ids, unchanged=unchanged_player_ids)
+        transformed_players = transform_players_dimension(raw_players)
+        upload_players(transformed_players, only_changed, unchanged_player_ids or ())
+        acknowledge_players(p["playerId"] for p in raw_players)
+
+        # 7. Collect all player IDs from bulk stats, then scrape game logs
+        skater_ids = [s['player_id'] for s in transformed_skaters]
+        goalie_ids = [g['player_id'] for g in transformed_goalies]
+
+        all_player_ids = skater_ids + goalie_ids
+        season_id = int(DEFAULT_SEASON_ID)
+        watermarks = {}
+        start = None
+        failed = set()
+        if args.game_logs == "incremental":
+            watermarks = load_game_log_watermarks(args.watermarks, season_id)
+            retry_since, retry_players = load_retry_state()
+            start = schedule_start(watermarks, retry_since)
+            if start is not None:
+                # Traded players carry "OLD,NEW"; a game for either club needs their log.
+                player_teams = {
+                    row['player_id']: {t.strip() for t in (row.get('team_abbrev') or '').split(',') if t.strip()}
+                    for row in transformed_skaters + transformed_goalies
+                }
+                teams_by_date = scrape_completed_games(start)
+                all_player_ids = players_with_new_games(player_teams, watermarks, teams_by_date)
+                all_player_ids += [pid for pid in retry_players if pid in player_teams and pid not in all_player_ids]
+        print(f"\n=== Scraping game logs for {len(all_player_ids)} players ({args.game_logs}) ===")
+        if args.stream:
+            # 7-10. Scrape, transform and upload game stats as one overlapping stream
+            team_games, watermarks = stream_game_logs(
+                all_player_ids, skater_ids, watermarks, since=start, failed=failed
+            )
+            save_watermark_file(watermarks)
+            print("\n=== Processing games ===")
+            upload_game_facts(team_games, start or season_opening(season_id))
+        else:
+            all_game_logs = scrape_all_game_logs(all_player_ids, failed=failed)
+            if start is not None:
+                all_game_logs = new_games_only(all_game_logs, watermarks, start)
+
+            # 8. Transform and upload skater game stats
+            print("\n=== Processing skater game stats ===")
+            all_skater_games = []
+            for pid in skater_ids:
+                logs = all_game_logs.get(pid, [])
+                if logs:
+                    all_skater_games.extend(transform_skater_game_logs(pid, logs))
+            add_skater_game_rates(all_skater_games)
+            upload_skater_game_stats(all_skater_games)
+
+            # 9. Transform and upload goalie game stats
+            print("\n=== Processing goalie game stats ===")
+            all_goalie_games = []
+            for pid in goalie_ids:
+                logs = all_game_logs.get(pid, [])
+                if logs:
+                    all_goalie_games.extend(transform_goalie_game_logs(pid, logs))
+            upload_goalie_game_stats(all_goalie_games)
+            save_watermark_file(advance_watermarks(watermarks, all_game_logs))
+
+            # 10. Game dimension from the schedule, per-team game facts from the same logs
+            print("\n=== Processing games ===")
+            if start is not None:
+                # Older rows here come only from newly seen players; rolling them up would
+                # overwrite complete team-game rows with one player's share.
+                since = start.isoformat()
+                team_games = transform_team_game_stats(
+                    [g for g in all_skater_games if (g.get('game_date') or '') >= since],
+                    [g for g in all_goalie_games if (g.get('game_date') or '') >= since],
+                )
+            else:
+                team_games = transform_team_game_stats(all_skater_games, all_goalie_games)
+            upload_game_facts(team_games, start or season_opening(season_id))
+
+        # A failed scrape leaves that player's games, and their teams' totals, missing
+        # from this run's cutoff on; the next incremental run starts from it again.
+        retry_from = start or season_opening(season_id)
+        save_retry_state(retry_from, failed)
+        if failed:
+            print(f"\n{len(failed)} game logs failed to scrape; the next incremental run restarts from {retry_from}")
+
+        # 11. Rest-of-season projections for the whole league in one batch
+        print("\n=== Computing projections ===")
+        if args.game_logs == "incremental" or args.stream:
+            # Only new rows are in memory (or none, when streaming); recent form needs
+            # each player's latest stored games.
+            all_skater_games = load_recent_games(
+                "skater", season_id, "player_id, game_date, goals, assists, points, shots, pp_points"
+            )
+            all_goalie_games = load_recent_games(
+                "goalie", season_id, "player_id, game_date, decision, saves, shutouts, goals_against"
+            )
+        projections = compute_projections(
+            transformed_skaters, transformed_goalies, all_skater_games, all_goalie_games,
+            team_games=load_team_game_counts(season_id),
+        )
+        upload_projections(projections)
+    finally:
+        if _upload_engine.bulk is not None:
+            _upload_engine.bulk.close()
 
     print("\n=== Pipeline complete ===")
@@ -0,0 +1,144 @@
+"""Rest-of-season projections computed in one vectorized batch per run.
+
+Per-game rates blend each player's season rate with their last-10 form, then
+regress toward the mean rate for their position, weighted by sample size. Rates
+are multiplied by the player's expected share of their team's remaining games.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+SEASON_GAMES = 82
+RECENT_WINDOW = 10
+# Weight given to last-10 form at a full window; scaled down for shorter windows.
+RECENT_WEIGHT = 0.3
+# Games of league-average play mixed into every player's rate (regression to the mean).
+REGRESSION_GAMES = 20
+
+SKATER_STATS = ("goals", "assists", "points", "shots", "pp_points")
+GOALIE_STATS = ("wins", "saves", "shutouts", "goals_against")
+
+
+def _current_team(team_abbrevs):
+    # Traded players carry "OLD,NEW"; project against their latest club.
+    return (team_abbrevs or "").split(",")[-1].strip()
+
+
+def _recent_totals(ids, games, stats):
+    """Sum each player's last RECENT_WINDOW games; returns (totals, games counted)."""
+    position = {pid: i for i, pid in enumerate(ids.tolist())}
+    rows = [g for g in games if g.get("player_id") in position and g.get("game_date")]
+    totals = np.zeros((len(ids), len(stats)))
+    counts = np.zeros(len(ids))
+    if not rows:
+        return totals, counts
+
+    player_idx = np.array([position[g["player_id"]] for g in rows])
+    dates = np.array([g["game_date"] for g in rows])
+    values = np.array([[g.get(s) or 0 for s in stats] for g in rows], dtype=np.float64)
+    if "wins" in stats:
+        values[:, stats.index("wins")] = [g.get("decision") == "W" for g in rows]
+
+    # Sort by player, then newest first, and rank games within each player.
+    date_rank = np.argsort(np.argsort(dates, kind="stable"))
+    order = np.lexsort((-date_rank, player_idx))
+    player_idx, values = player_idx[order], values[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(player_idx)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(player_idx)]))
+    recent = (np.arange(len(player_idx)) - group_start) < RECENT_WINDOW
+
+    np.add.at(totals, player_idx[recent], values[recent])
+    np.add.at(counts, player_idx[recent], 1)
+    return totals, counts
+
+
+def _team_games(season_rows, counted=None):
+    """Games each team has played so far.
+
+    ``counted`` holds each team's own completed games (from the schedule). Teams
+    missing from it fall back to the most games played by anyone on the roster,
+    which overcounts when that player was traded in.
+    """
+    team_games = {}
+    for row in season_rows:
+        team = _current_team(row.get("team_abbrev"))
+        team_games[team] = max(team_games.get(team, 0), row.get("games_played") or 0)
+    team_games.update(counted or {})
+    return team_games
+
+
+def _project(season_rows, games, stats, group_key, share_column, season_type, team_games):
+    rows = [r for r in season_rows if r.get("player_id") is not None]
+    if not rows:
+        return []
+    ids = np.array([r["player_id"] for r in rows], dtype=np.int64)
+    gp = np.array([r.get("games_played") or 0 for r in rows], dtype=np.float64)
+    share_games = np.array([r.get(share_column) or 0 for r in rows], dtype=np.float64)
+    totals = np.array([[r.get(s) or 0 for s in stats] for r in rows], dtype=np.float64)
+
+    safe_gp = np.maximum(gp, 1)[:, None]
+    season_rate = totals / safe_gp
+
+    recent, recent_gp = _recent_totals(ids, games, stats)
+    recent_rate = recent / np.maximum(recent_gp, 1)[:, None]
+    recent_weight = (RECENT_WEIGHT * np.minimum(recent_gp, RECENT_WINDOW) / RECENT_WINDOW)[:, None]
+    blended = recent_weight * recent_rate + (1 - recent_weight) * season_rate
+
+    # Position means, weighted by games played.
+    groups = np.array([group_key(r) for r in rows])
+    labels, inverse = np.unique(groups, return_inverse=True)
+    group_totals = np.zeros((len(labels), len(stats)))
+    np.add.at(group_totals, inverse, totals)
+    group_gp = np.bincount(inverse, weights=gp, minlength=len(labels))
+    group_rate = group_totals / np.maximum(group_gp, 1)[:, None]
+
+    rate = (gp[:, None] * blended + REGRESSION_GAMES * group_rate[inverse]) / (gp[:, None] + REGRESSION_GAMES)
+
+    team_gp = np.array(
+        [team_games.get(_current_team(r.get("team_abbrev")), 0) for r in rows], dtype=np.float64
+    )
+    games_remaining = np.maximum(SEASON_GAMES - team_gp, 0)
+    share = np.clip(share_games / np.maximum(team_gp, 1), 0, 1)
+    projected_games = games_remaining * share
+    ros = rate * projected_games[:, None]
+
+    projected_at = datetime.now(timezone.utc).isoformat()
+    out = []
+    for i, row in enumerate(rows):
+        record = {
+            "player_id": int(ids[i]),
+            "season_id": row.get("season_id"),
+            "season_type": season_type,
+            "games_remaining": int(games_remaining[i]),
+            "projected_games": round(float(projected_games[i]), 2),
+            "projected_at": projected_at,
+        }
+        for j, stat in enumerate(stats):
+            record[f"{stat}_per_game"] = round(float(rate[i, j]), 4)
+            record[f"ros_{stat}"] = round(float(ros[i, j]), 2)
+        out.append(record)
+    return out
+
+
+def compute_projections(skater_rows, goalie_rows, skater_games, goalie_games, team_games=None):
+    """Project every skater and goalie; returns rows for the player_projections table.
+
+    ``team_games`` maps team abbreviations to their completed games this season.
+    """
+    team_games = _team_games(list(skater_rows) + list(goalie_rows), team_games)
+    skaters = _project(
+        skater_rows, skater_games, SKATER_STATS,
+        group_key=lambda r: r.get("position_code") or "F",
+        share_column="games_played",
+        season_type="skater",
+        team_games=team_games,
+    )
+    goalies = _project(
+        goalie_rows, goalie_games, GOALIE_STATS,
+        group_key=lambda r: "G",
+        share_column="games_started",
+        season_type="goalie",
+        team_games=team_games,
+    )
+    return skaters + goalies
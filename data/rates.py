@@ -0,0 +1,70 @@
+"""Numeric time on ice and per-60 rate columns computed once at ingest.
+
+Game logs report TOI as "MM:SS" strings, which neither SQL nor vectorized code can
+aggregate. Transforms store ``toi_seconds`` alongside the display string, and the
+rate columns below are filled in one vectorized pass over every transformed row.
+"""
+
+import numpy as np
+
+# Output column -> counting stat it is derived from.
+PER_60_STATS = {
+    "goals_per_60": "goals",
+    "points_per_60": "points",
+    "shots_per_60": "shots",
+}
+
+
+def toi_to_seconds(toi):
+    """Parse an "MM:SS" time-on-ice string to whole seconds; None if missing or malformed."""
+    if toi is None:
+        return None
+    if isinstance(toi, (int, float)):
+        return int(toi)
+    minutes, sep, seconds = str(toi).strip().partition(":")
+    if not sep or not minutes.isdigit() or not seconds.isdigit():
+        return None
+    return int(minutes) * 60 + int(seconds)
+
+
+def _column(rows, field):
+    return np.array([row.get(field) or 0 for row in rows], dtype=np.float64)
+
+
+def _round_or_none(values, valid):
+    return [round(float(v), 2) if ok else None for v, ok in zip(values, valid)]
+
+
+def _apply_rates(rows, toi_seconds):
+    """Write per-60 rates and power-play point share onto ``rows`` in place."""
+    has_toi = toi_seconds > 0
+    safe_toi = np.where(has_toi, toi_seconds, 1.0)
+    for column, stat in PER_60_STATS.items():
+        rates = _column(rows, stat) * 3600.0 / safe_toi
+        for row, value in zip(rows, _round_or_none(rates, has_toi)):
+            row[column] = value
+
+    points = _column(rows, "points")
+    has_points = points > 0
+    share = _column(rows, "pp_points") / np.where(has_points, points, 1.0)
+    for row, value in zip(rows, _round_or_none(share, has_points)):
+        row["pp_point_share"] = value
+    return rows
+
+
+def add_skater_game_rates(rows):
+    """Fill rate columns on transformed skater game rows (uses ``toi_seconds``)."""
+    if not rows:
+        return rows
+    return _apply_rates(rows, _column(rows, "toi_seconds"))
+
+
+def add_skater_season_rates(rows):
+    """Fill rate columns on transformed skater season rows.
+
+    Season TOI is reported per game (in seconds), so totals are rebuilt from
+    ``toi_per_game * games_played``.
+    """
+    if not rows:
+        return rows
+    return _apply_rates(rows, _column(rows, "toi_per_game") * _column(rows, "games_played"))
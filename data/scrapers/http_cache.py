@@ -0,0 +1,97 @@
+"""On-disk HTTP cache for the scraper engine.
+
+Each URL keeps its last body plus ETag, Last-Modified and a SHA-256 of the content.
+Requests for a cached URL are sent as conditional requests, so an unchanged payload
+comes back as a bodyless 304. Within ``NHL_HTTP_CACHE_TTL`` seconds (default 0, i.e.
+always revalidate) the cached body is reused without any request, so local
+``pipeline.py`` iterations don't hit the NHL API. Set ``NHL_HTTP_CACHE=off`` to
+bypass the cache entirely.
+
+Callers that write a payload somewhere ``acknowledge`` it once the write
+succeeded; only an acknowledged body counts as already loaded (``is_loaded``).
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("NHL_HTTP_CACHE_DIR", Path(__file__).parent.parent / "raw" / "http_cache"))
+CACHE_TTL_SECONDS = float(os.getenv("NHL_HTTP_CACHE_TTL", "0"))
+CACHE_ENABLED = os.getenv("NHL_HTTP_CACHE", "on").lower() not in {"off", "0", "false", "no"}
+
+
+class HttpCache:
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL_SECONDS):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / f"{key}.meta.json", self.directory / f"{key}.body"
+
+    def lookup(self, url):
+        """Stored metadata for ``url`` (with ``body`` bytes), or None."""
+        meta_path, body_path = self._paths(url)
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            entry = json.loads(meta_path.read_text())
+            entry["body"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return self.ttl > 0 and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def is_loaded(entry):
+        """Whether the stored body is the one a caller last acknowledged as loaded."""
+        return entry.get("sha256") is not None and entry.get("loaded_sha256") == entry.get("sha256")
+
+    def acknowledge(self, url):
+        """Mark the stored body of ``url`` as loaded downstream."""
+        meta_path, _ = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return
+        meta["loaded_sha256"] = meta.get("sha256")
+        meta_path.write_text(json.dumps(meta))
+
+    def touch(self, url, entry):
+        """Record a successful revalidation (304) so the TTL restarts."""
+        meta_path, _ = self._paths(url)
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        meta["fetched_at"] = time.time()
+        meta_path.write_text(json.dumps(meta))
+
+    def store(self, url, response, previous=None):
+        """Save a 200 response; returns False when the body matches the previous copy."""
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        meta_path, body_path = self._paths(url)
+        unchanged = previous is not None and previous.get("sha256") == digest
+        if not unchanged:
+            body_path.write_bytes(content)
+        meta_path.write_text(json.dumps({
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": digest,
+            "loaded_sha256": (previous or {}).get("loaded_sha256"),
+            "fetched_at": time.time(),
+        }))
+        return not unchanged
@@ -0,0 +1,269 @@
+"""Shared asyncio HTTP engine for the NHL API scrapers.
+
+All requests go through one pooled ``httpx.AsyncClient`` and an AIMD concurrency
+limiter instead of a hand-tuned worker count:
+
+- every fast success raises the limit by ``1 / limit`` (about +1 per round trip);
+- a 429/503, or a response much slower than the fastest seen, cuts it
+  multiplicatively (at most once per cooldown, so one burst counts once);
+- ``Retry-After`` pauses every request, not just the one that was throttled.
+
+The learned limit is kept at module level, so later stages of a pipeline run start
+where earlier ones settled. JSON fetches go through the on-disk ``HttpCache``
+(conditional requests, TTL reuse). Scrapers use the sync helpers ``fetch_json``
+and ``fetch_json_many``.
+
+With ``skip_unchanged=True`` a payload identical to the cached copy comes back as
+``UNCHANGED`` instead of being parsed again, but only once the caller has
+acknowledged that copy as loaded (``acknowledge_loaded``); a body fetched by a run
+that failed before writing it is returned in full again.
+"""
+
+import asyncio
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+try:
+    from scrapers.http_cache import CACHE_ENABLED, HttpCache
+except ImportError:
+    from http_cache import CACHE_ENABLED, HttpCache
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+# Returned in place of a payload that matches the loaded cached copy (skip_unchanged=True).
+UNCHANGED = object()
+
+INITIAL_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 64
+# Responses slower than this multiple of the fastest one seen signal congestion,
+# as long as they are also slower than SLOW_FLOOR_SECONDS.
+LATENCY_FACTOR = 4.0
+SLOW_FLOOR_SECONDS = 1.0
+THROTTLE_DECREASE = 0.5
+LATENCY_DECREASE = 0.8
+DECREASE_COOLDOWN_SECONDS = 1.0
+
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+TIMEOUT_SECONDS = 30.0
+
+
+def _retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date); None if absent or invalid."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight requests, with a shared pause for Retry-After."""
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self.fastest = None
+        self._last_decrease = 0.0
+        self._cond = None
+
+    def bind(self):
+        # asyncio primitives belong to one event loop; each asyncio.run gets a fresh one.
+        self._cond = asyncio.Condition()
+        self.in_flight = 0
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                delay = self.pause_until - time.monotonic()
+                if delay <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=delay if delay > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, latency=None, throttled=False, retry_after=None):
+        async with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if retry_after:
+                self.pause_until = max(self.pause_until, now + retry_after)
+            if throttled:
+                self._decrease(THROTTLE_DECREASE, now)
+            elif latency is not None:
+                self.fastest = latency if self.fastest is None else min(self.fastest, latency)
+                if latency > SLOW_FLOOR_SECONDS and latency > self.fastest * LATENCY_FACTOR:
+                    self._decrease(LATENCY_DECREASE, now)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, factor, now):
+        if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+
+
+_limiter = AdaptiveLimiter()
+
+
+class HttpEngine:
+    """Async context manager owning the pooled client for one batch of requests."""
+
+    def __init__(self, limiter=None, max_retries=MAX_RETRIES, timeout=TIMEOUT_SECONDS, cache=None):
+        self.limiter = limiter or _limiter
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.cache = cache if cache is not None else (HttpCache() if CACHE_ENABLED else None)
+        self.cache_stats = {"fresh": 0, "not_modified": 0, "unchanged": 0, "changed": 0}
+        self._client = None
+
+    async def __aenter__(self):
+        self.limiter.bind()
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.limiter.maximum,
+                max_keepalive_connections=self.limiter.maximum,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        stats = self.cache_stats
+        if stats["fresh"] or stats["not_modified"] or stats["unchanged"]:
+            print(
+                f"  HTTP cache: {stats['fresh']} reused, {stats['not_modified']} not modified, "
+                f"{stats['unchanged']} unchanged, {stats['changed']} new or changed"
+            )
+
+    async def get(self, url, headers=None):
+        """GET with retries on 429/5xx and transport errors.
+
+        Returns 2xx and 304 responses; raises httpx.HTTPStatusError for anything else.
+        """
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = await self._client.get(url, headers=headers)
+            except httpx.TransportError:
+                await self.limiter.release(throttled=True)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                latency = time.monotonic() - started
+                if response.status_code not in RETRY_STATUSES:
+                    await self.limiter.release(latency=latency)
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+                retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                await self.limiter.release(
+                    latency=latency,
+                    throttled=response.status_code in THROTTLE_STATUSES,
+                    retry_after=retry_after,
+                )
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                if retry_after is not None:
+                    # The limiter already pauses every request until Retry-After expires.
+                    attempt += 1
+                    continue
+            await asyncio.sleep(BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
+
+    async def get_json(self, url, skip_unchanged=False):
+        """Parsed JSON for ``url``, or ``UNCHANGED`` (with ``skip_unchanged``) when it matches the loaded copy."""
+        if self.cache is None:
+            return (await self.get(url)).json()
+
+        entry = self.cache.lookup(url)
+        skippable = skip_unchanged and entry is not None and self.cache.is_loaded(entry)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache_stats["fresh"] += 1
+            return UNCHANGED if skippable else json.loads(entry["body"])
+
+        headers = self.cache.conditional_headers(entry) if entry is not None else None
+        response = await self.get(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url, entry)
+            self.cache_stats["not_modified"] += 1
+            return UNCHANGED if skippable else json.loads(entry["body"])
+
+        changed = self.cache.store(url, response, previous=entry)
+        self.cache_stats["changed" if changed else "unchanged"] += 1
+        if skippable and not changed:
+            return UNCHANGED
+        return response.json()
+
+    async def map_json(self, urls, progress_every=None, label="requests", skip_unchanged=False):
+        """Fetch ``{key: url}`` concurrently; returns ``(results, errors)`` keyed like ``urls``."""
+        results, errors = {}, {}
+        done = 0
+
+        async def run(key, url):
+            nonlocal done
+            try:
+                results[key] = await self.get_json(url, skip_unchanged=skip_unchanged)
+            except (httpx.HTTPError, ValueError) as exc:
+                errors[key] = exc
+            done += 1
+            if progress_every and done % progress_every == 0:
+                print(f"  {label}: {done}/{len(urls)} (concurrency {int(self.limiter.limit)})")
+
+        await asyncio.gather(*(run(key, url) for key, url in urls.items()))
+        return results, errors
+
+
+def fetch_json(url, skip_unchanged=False):
+    """Fetch one JSON document through the shared engine."""
+    async def run():
+        async with HttpEngine() as engine:
+            return await engine.get_json(url, skip_unchanged=skip_unchanged)
+    return asyncio.run(run())
+
+
+def fetch_json_many(urls, progress_every=None, label="requests", skip_unchanged=False):
+    """Fetch ``{key: url}`` concurrently; returns ``(results, errors)``."""
+    async def run():
+        async with HttpEngine() as engine:
+            return await engine.map_json(
+                urls, progress_every=progress_every, label=label, skip_unchanged=skip_unchanged
+            )
+    return asyncio.run(run())
+
+
+def acknowledge_loaded(urls):
+    """Mark the cached bodies of ``urls`` as loaded, so ``skip_unchanged`` may skip them."""
+    if not CACHE_ENABLED:
+        return
+    cache = HttpCache()
+    for url in urls:
+        cache.acknowledge(url)
+
+
+def status_code(exc):
+    """HTTP status of an engine error, or None for transport/decoding errors."""
+    response = getattr(exc, "response", None)
+    return response.status_code if isinstance(exc, httpx.HTTPStatusError) and response is not None else None
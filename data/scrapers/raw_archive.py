@@ -0,0 +1,137 @@
+"""Compressed, partitioned archive of raw scraper payloads.
+
+Each run writes one gzip NDJSON file per entity instead of overwriting a
+pretty-printed ``raw/<entity>.json``:
+
+    raw/archive/run_date=2026-10-19/entity=game_logs/part-0000.ndjson.gz
+    raw/archive/run_date=2026-10-19/manifest.json
+
+The manifest records each file's record count, sizes and the SHA-256 of its
+uncompressed NDJSON, so identical payloads across runs are easy to spot, and
+``read_records`` streams a partition back one record at a time for backfills
+and benchmarks. A re-run on the same date replaces that date's partition.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+ARCHIVE_DIR = Path(__file__).parent.parent / "raw" / "archive"
+# Favour write speed; level 6+ shrinks NDJSON only marginally further.
+COMPRESS_LEVEL = 5
+
+_manifest_lock = threading.Lock()
+
+
+def run_date():
+    """Partition date for this run (UTC), overridable with NHL_RUN_DATE=YYYY-MM-DD."""
+    return os.getenv("NHL_RUN_DATE") or datetime.now(timezone.utc).date().isoformat()
+
+
+def _run_dir(day):
+    return ARCHIVE_DIR / f"run_date={day}"
+
+
+def _part_path(entity, day):
+    return _run_dir(day) / f"entity={entity}" / "part-0000.ndjson.gz"
+
+
+class ArchiveWriter:
+    """Appends records to one entity's partition; the manifest is updated on close."""
+
+    def __init__(self, entity, day=None):
+        self.entity = entity
+        self.day = day or run_date()
+        self.path = _part_path(entity, self.day)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_suffix(".tmp")
+        self._file = gzip.open(self._tmp, "wb", compresslevel=COMPRESS_LEVEL)
+        self._hash = hashlib.sha256()
+        self.records = 0
+        self.raw_bytes = 0
+
+    def write(self, record):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        self._file.write(line)
+        self._hash.update(line)
+        self.records += 1
+        self.raw_bytes += len(line)
+
+    def close(self):
+        self._file.close()
+        os.replace(self._tmp, self.path)
+        _update_manifest(self.day, self.entity, {
+            "path": str(self.path.relative_to(_run_dir(self.day))),
+            "records": self.records,
+            "raw_bytes": self.raw_bytes,
+            "compressed_bytes": self.path.stat().st_size,
+            "sha256": self._hash.hexdigest(),
+            "written_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave the previous partition (if any) in place on failure.
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+
+
+def _update_manifest(day, entity, entry):
+    path = _run_dir(day) / "manifest.json"
+    with _manifest_lock:
+        manifest = json.loads(path.read_text()) if path.exists() else {"run_date": day, "entities": {}}
+        manifest["entities"][entity] = entry
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp, path)
+
+
+def archive_records(entity, records, day=None):
+    """Write an iterable of JSON-serialisable records as this run's ``entity`` partition."""
+    with ArchiveWriter(entity, day) as writer:
+        for record in records:
+            writer.write(record)
+    return writer
+
+
+def read_records(entity, day=None):
+    """Stream records back from one run's partition (default: the latest run that has it)."""
+    if day is None:
+        days = [d for d in list_runs() if _part_path(entity, d).exists()]
+        if not days:
+            return
+        day = days[-1]
+    with gzip.open(_part_path(entity, day), "rb") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def list_runs():
+    """Archived run dates, oldest first."""
+    if not ARCHIVE_DIR.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in ARCHIVE_DIR.glob("run_date=*") if p.is_dir())
+
+
+def read_manifest(day):
+    path = _run_dir(day) / "manifest.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+if __name__ == "__main__":
+    for day in list_runs():
+        manifest = read_manifest(day) or {"entities": {}}
+        for entity, entry in sorted(manifest["entities"].items()):
+            print(
+                f"{day}  {entity:<16} {entry['records']:>7} records  "
+                f"{entry['compressed_bytes'] / 1024:>9.1f} KiB  {entry['sha256'][:12]}"
+            )
@@ -1,88 +1,235 @@
+import asyncio
 import json
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date
 from pathlib import Path
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
 
 try:
+    from scrapers.http_engine import HttpEngine, fetch_json, fetch_json_many, status_code
+    from scrapers.raw_archive import ArchiveWriter, archive_records
     from scrapers.season_config import DEFAULT_SEASON_ID
 except ImportError:
+    from http_engine import HttpEngine, fetch_json, fetch_json_many, status_code
+    from raw_archive import ArchiveWriter, archive_records
     from season_config import DEFAULT_SEASON_ID
 
 RAW_DIR = Path(__file__).parent.parent / "raw"
 RAW_DIR.mkdir(exist_ok=True)
+# Per-player latest ingested game_date, for incremental runs without Supabase access.
+WATERMARK_FILE = RAW_DIR / "game_log_watermarks.json"
+# Cutoff and players of a run whose scrapes failed, so the next run starts there again.
+RETRY_FILE = RAW_DIR / "game_log_retry.json"
 
-# Number of concurrent requests against the NHL API. Kept modest to stay polite
-# and avoid 429s while still cutting wall time by ~10x vs. the old serial loop.
-MAX_WORKERS = 12
+def _game_log_url(player_id, season_id, game_type):
+    return f"https://api-web.nhle.com/v1/player/{player_id}/game-log/{season_id}/{game_type}"
 
-# Thread-local sessions so each worker reuses a pooled keep-alive connection
-# instead of opening a fresh TCP/TLS handshake on every request.
-_thread_local = threading.local()
 
+def scrape_player_game_log(player_id, season_id=DEFAULT_SEASON_ID, game_type="2"):
+    data = fetch_json(_game_log_url(player_id, season_id, game_type))
+    return data.get("gameLog", [])
 
-def _session() -> requests.Session:
-    session = getattr(_thread_local, "session", None)
-    if session is None:
-        session = requests.Session()
-        retry = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET",),
-        )
-        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4)
-        session.mount("https://", adapter)
-        _thread_local.session = session
-    return session
 
+def scrape_all_game_logs(player_ids, season_id=DEFAULT_SEASON_ID, game_type="2", failed=None):
+    """Game logs keyed by player id; ids whose scrape failed are added to ``failed``."""
+    # Concurrency is set by the shared engine's adaptive limiter, not a worker count.
+    urls = {pid: _game_log_url(pid, season_id, game_type) for pid in player_ids}
+    results, errors = fetch_json_many(urls, progress_every=100, label="Game logs")
 
-def scrape_player_game_log(player_id, season_id=DEFAULT_SEASON_ID, game_type="2"):
-    url = f"https://api-web.nhle.com/v1/player/{player_id}/game-log/{season_id}/{game_type}"
+    all_logs = {}
+    for player_id, data in results.items():
+        logs = data.get("gameLog", [])
+        if logs:
+            all_logs[player_id] = logs
+    for player_id, e in errors.items():
+        _report_error(player_id, e, failed)
+
+    archive_records("game_logs", ({"player_id": pid, "gameLog": logs} for pid, logs in all_logs.items()))
+    print(f"Game logs scraped for {len(all_logs)} players")
 
-    response = _session().get(url, timeout=30)
-    response.raise_for_status()
-    data = response.json()
+    return all_logs
 
-    return data.get("gameLog", [])
 
+# Completed scrapes buffered between the network and the consumer in streaming mode.
+STREAM_QUEUE_SIZE = 64
+# How often a producer blocked on a full handoff queue checks whether to give up.
+HANDOFF_POLL_SECONDS = 0.5
 
-def scrape_all_game_logs(player_ids, season_id=DEFAULT_SEASON_ID, game_type="2"):
-    all_logs = {}
-    total = len(player_ids)
-    completed = 0
 
-    def fetch(player_id):
-        return player_id, scrape_player_game_log(player_id, season_id, game_type)
+def _report_error(player_id, e, failed=None):
+    if status_code(e) == 404:
+        print(f"  No game log for player {player_id} (404)")
+        return
+    print(f"  Error scraping player {player_id}: {e}")
+    if failed is not None:
+        failed.add(player_id)
+
+
+def iter_game_logs(player_ids, season_id=DEFAULT_SEASON_ID, game_type="2", queue_size=STREAM_QUEUE_SIZE,
+                   failed=None):
+    """Yield ``(player_id, game_log)`` as each scrape completes.
+
+    Scraping runs on a background event loop and hands results over through a
+    bounded queue. At most ``queue_size`` logs are fetched but not yet consumed,
+    so scraping pauses when the consumer falls behind instead of buffering the
+    whole season. Each log is also appended to this run's ``game_logs`` archive.
+    Ids whose scrape failed are added to ``failed``.
+    """
+    handoff = queue.Queue(maxsize=queue_size)
+    finished = object()
+    # Set when the consumer stops early (an exception or generator close), so the
+    # producer stops fetching and no thread stays blocked on a full queue.
+    stop = threading.Event()
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(fetch, pid): pid for pid in player_ids}
-        for future in as_completed(futures):
-            player_id = futures[future]
-            completed += 1
+    def put(item):
+        while not stop.is_set():
             try:
-                _, logs = future.result()
+                handoff.put(item, timeout=HANDOFF_POLL_SECONDS)
+                return
+            except queue.Full:
+                continue
+
+    async def produce():
+        slots = asyncio.Semaphore(queue_size)
+
+        async def one(engine, player_id):
+            async with slots:
+                if stop.is_set():
+                    return
+                try:
+                    data = await engine.get_json(_game_log_url(player_id, season_id, game_type))
+                    item = (player_id, data.get("gameLog", []), None)
+                except (httpx.HTTPError, ValueError) as e:
+                    item = (player_id, None, e)
+                await asyncio.to_thread(put, item)
+
+        async with HttpEngine() as engine:
+            await asyncio.gather(*(one(engine, pid) for pid in player_ids))
+
+    def run():
+        try:
+            asyncio.run(produce())
+        finally:
+            put(finished)
+
+    producer = threading.Thread(target=run, name="game-log-scraper", daemon=True)
+    producer.start()
+    scraped = 0
+    try:
+        with ArchiveWriter("game_logs") as raw:
+            while True:
+                item = handoff.get()
+                if item is finished:
+                    break
+                player_id, logs, error = item
+                if error is not None:
+                    _report_error(player_id, error, failed)
+                    continue
+                scraped += 1
+                if scraped % 100 == 0:
+                    print(f"  Game logs: {scraped}/{len(player_ids)} players streamed")
                 if logs:
-                    all_logs[player_id] = logs
-            except requests.exceptions.HTTPError as e:
-                status = e.response.status_code if e.response is not None else "?"
-                if status == 404:
-                    print(f"  No game log for player {player_id} (404)")
-                else:
-                    print(f"  Error scraping player {player_id}: {e}")
-            except requests.exceptions.RequestException as e:
-                print(f"  Error scraping player {player_id}: {e}")
-            if completed % 100 == 0:
-                print(f"  Game logs: {completed}/{total} players scraped")
-
-    with open(RAW_DIR / "game_logs.json", "w") as f:
-        json.dump(all_logs, f, indent=4)
-    print(f"Game logs scraped for {len(all_logs)} players")
-
-    return all_logs
+                    raw.write({"player_id": player_id, "gameLog": logs})
+                    yield player_id, logs
+    finally:
+        stop.set()
+    producer.join()
+
+
+def load_watermark_file(path=WATERMARK_FILE):
+    if not Path(path).exists():
+        return {}
+    with open(path) as f:
+        return {int(pid): date.fromisoformat(day) for pid, day in json.load(f).items()}
+
+
+def save_watermark_file(watermarks, path=WATERMARK_FILE):
+    with open(path, "w") as f:
+        json.dump({str(pid): day.isoformat() for pid, day in sorted(watermarks.items())}, f, indent=4)
+
+
+def load_retry_state(path=RETRY_FILE):
+    """``(since, player_ids)`` left by a run whose scrapes failed, or ``(None, set())``."""
+    if not Path(path).exists():
+        return None, set()
+    with open(path) as f:
+        state = json.load(f)
+    return date.fromisoformat(state["since"]), set(state["players"])
+
+
+def save_retry_state(since, failed, path=RETRY_FILE):
+    """Record this run's cutoff when any scrape failed; clear it after a clean run."""
+    if not failed:
+        Path(path).unlink(missing_ok=True)
+        return
+    with open(path, "w") as f:
+        json.dump({"since": since.isoformat(), "players": sorted(failed)}, f, indent=4)
+
+
+def schedule_start(watermarks, retry_since=None):
+    """First date whose games may not be ingested yet.
+
+    A run ingests every game its players' teams had finished, so anything before
+    the newest stored date is complete. The day itself is rechecked in case a
+    late game was still in progress when the previous run scraped. A run whose
+    scrapes failed left ``retry_since``, its own cutoff: the failed players' games
+    since then are missing, and so are their teams' share of those games.
+    """
+    if not watermarks:
+        return None
+    start = max(watermarks.values())
+    return min(start, retry_since) if retry_since is not None else start
+
+
+def players_with_new_games(player_teams, watermarks, teams_by_date):
+    """Player ids that may have a game on or after the schedule start.
+
+    ``teams_by_date`` covers ``schedule_start`` onwards, and every game in it is
+    re-ingested from that cutoff. So every player on either side has to be scraped,
+    including players whose own watermark is already that day, or the team-game
+    rollup would see only part of a roster. ``player_teams`` maps each player to
+    all of their clubs this season, so traded players follow games for both.
+
+    Players without a watermark (new to the league or to the table) are always
+    included so their full log is loaded once.
+    """
+    active = set().union(*teams_by_date.values()) if teams_by_date else set()
+    return [
+        player_id
+        for player_id, teams in player_teams.items()
+        if player_id not in watermarks or teams & active
+    ]
+
+
+def logs_since(logs, since):
+    return [g for g in logs if date.fromisoformat(g["gameDate"]) >= since]
+
+
+def new_games_only(all_logs, watermarks, since):
+    """Drop game-log entries before ``since`` for players that already have a watermark.
+
+    Every scraped player keeps the same cutoff (not their own watermark), so any game
+    on or after ``since`` comes back with every player who played in it.
+    """
+    trimmed = {}
+    for player_id, logs in all_logs.items():
+        if player_id in watermarks:
+            logs = logs_since(logs, since)
+        if logs:
+            trimmed[player_id] = logs
+    return trimmed
+
+
+def advance_watermarks(watermarks, all_logs):
+    """Watermarks moved forward to the newest game in each scraped log."""
+    advanced = dict(watermarks)
+    for player_id, logs in all_logs.items():
+        latest = max(date.fromisoformat(g["gameDate"]) for g in logs)
+        if player_id not in advanced or latest > advanced[player_id]:
+            advanced[player_id] = latest
+    return advanced
 
 
 if __name__ == "__main__":
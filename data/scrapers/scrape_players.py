@@ -1,16 +1,17 @@
-import json
-import requests
-from pathlib import Path
-
 try:
+    from scrapers.http_engine import UNCHANGED, acknowledge_loaded, fetch_json, fetch_json_many
+    from scrapers.raw_archive import archive_records
     from scrapers.season_config import DEFAULT_SEASON_ID
 except ImportError:
+    from http_engine import UNCHANGED, acknowledge_loaded, fetch_json, fetch_json_many
+    from raw_archive import archive_records
     from season_config import DEFAULT_SEASON_ID
 
-RAW_DIR = Path(__file__).parent.parent / "raw"
-RAW_DIR.mkdir(exist_ok=True)
 SEASON_ID = DEFAULT_SEASON_ID
 
+def _landing_url(player_id):
+    return f"https://api-web.nhle.com/v1/player/{player_id}/landing"
+
 # Scrape NHL teams data and save to a JSON file
 def scrapePlayer(playerId, key=None):
 
@@ -62,11 +63,7 @@ def scrapePlayer(playerId, key=None):
         - currentTeamRoster
     """
 
-    url = f"https://api-web.nhle.com/v1/player/{playerId}/landing"
-
-    response = requests.get(url, timeout=30)
-    response.raise_for_status()
-    response = response.json()
+    response = fetch_json(_landing_url(playerId))
 
     if key in response.keys():
         response = response[key]
@@ -76,77 +73,78 @@ def scrapePlayer(playerId, key=None):
     return response
 
 def scrapeTeamIds():
-    # URL to fetch data from current teams
-    current_teams_url = f'https://api.nhle.com/stats/rest/en/team/summary?cayenneExp=seasonId={SEASON_ID}'
-
-    # Send GET request to NHL API
-    response = requests.get(current_teams_url, timeout=30)
-    response.raise_for_status()
-    current_team_data = response.json()
-
-    # Retrieve team IDs and abbreviations
-    team_ids = [team['teamId'] for team in current_team_data['data']]
-    #print("Team IDs:", team_ids)
-
-    teams_url = 'https://api.nhle.com/stats/rest/en/team'
-    team_data = requests.get(teams_url, timeout=30)
-    team_data.raise_for_status()
-    team_data = team_data.json()
-    #print(team_data)
-    team_dict = {}
-
-
-    for data in team_data['data']:
-        for id in team_ids:
-            if data['id'] == id:
-                team_dict[id] = data['triCode']
-
-    team_dict = dict(sorted(team_dict.items()))
-    return team_dict
+    # Current-season team ids and the id -> triCode lookup, fetched together
+    responses, errors = fetch_json_many({
+        'current': f'https://api.nhle.com/stats/rest/en/team/summary?cayenneExp=seasonId={SEASON_ID}',
+        'all': 'https://api.nhle.com/stats/rest/en/team',
+    })
+    if errors:
+        raise next(iter(errors.values()))
+
+    team_ids = {team['teamId'] for team in responses['current']['data']}
+    team_dict = {
+        data['id']: data['triCode']
+        for data in responses['all']['data']
+        if data['id'] in team_ids
+    }
+    return dict(sorted(team_dict.items()))
 
 def scrapeAllPlayerIds(team_dict):
-    player_ids = []
     base_url = 'https://api-web.nhle.com/v1/'
-    team_count = 0
-    print(team_dict)
-    for item in team_dict:
-        team_count += 1
-        print(team_count)
-        team_abbrv = team_dict[item]
-        roster_url_endpoint = f'roster/{team_abbrv}/{SEASON_ID}'
-        final_url = base_url + roster_url_endpoint
-
-        print(final_url)
-        response = requests.get(final_url, timeout=30)
-        response.raise_for_status()
-        roster_data = response.json()
-        
-        for forward in roster_data['forwards']:
-            player_ids.append(forward['id'])
-
-        for defense in roster_data['defensemen']:
-            player_ids.append(defense['id'])
-
-        for goalie in roster_data['goalies']:
-            player_ids.append(goalie['id'])
+    urls = {
+        team_abbrv: f'{base_url}roster/{team_abbrv}/{SEASON_ID}'
+        for team_abbrv in team_dict.values()
+    }
+    rosters, errors = fetch_json_many(urls)
+    if errors:
+        # A missing roster would silently drop a whole team from the dimension.
+        raise next(iter(errors.values()))
+
+    player_ids = []
+    for team_abbrv in urls:
+        roster_data = rosters[team_abbrv]
+        for group in ('forwards', 'defensemen', 'goalies'):
+            player_ids.extend(player['id'] for player in roster_data[group])
 
     return player_ids
 
-def scrape_players():
-    ids = scrapeAllPlayerIds(team_dict=scrapeTeamIds())
+def scrape_players(skip_ids=None, unchanged=None):
+    """Landing data for every rostered player, minus ``skip_ids`` (already fresh in the table).
+
+    With an ``unchanged`` set, pages identical to the copy last acknowledged by
+    ``acknowledge_players`` are not returned; their ids are added to the set instead.
+    """
+    ids = list(dict.fromkeys(scrapeAllPlayerIds(team_dict=scrapeTeamIds())))
+    skip = set(skip_ids or ())
+    to_fetch = [player_id for player_id in ids if player_id not in skip]
+
+    print(f"Total Player IDs scraped: {len(ids)} ({len(to_fetch)} landing pages to refresh)")
 
-    print(f"Total Player IDs scraped: {len(ids)}")
+    results, errors = fetch_json_many(
+        {player_id: _landing_url(player_id) for player_id in to_fetch},
+        progress_every=200,
+        label="Player landing pages",
+        skip_unchanged=unchanged is not None,
+    )
+    for player_id, e in errors.items():
+        print(f"  Error scraping player {player_id}: {e}")
 
     all_players_data = []
-    for player_id in ids:
-        print(f"Scraping data for Player ID: {player_id}")
-        player_data = scrapePlayer(playerId=player_id, key=None)
-        all_players_data.append(player_data)
-    
-    # pd.json_normalize(all_players_data).to_csv(r'../raw/all_players_data.csv', index=False)
+    for player_id in to_fetch:
+        data = results.get(player_id)
+        if data is UNCHANGED:
+            unchanged.add(player_id)
+        elif data is not None:
+            all_players_data.append(data)
+    archive_records("player_landing", all_players_data)
     return all_players_data
 
 
+def acknowledge_players(player_ids):
+    """Record that these players' fetched landing pages were written to the players table."""
+    acknowledge_loaded(_landing_url(player_id) for player_id in player_ids)
+
+
 
 if __name__ == "__main__":
     scrape_players()
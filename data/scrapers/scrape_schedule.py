@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+try:
+    from scrapers.http_engine import fetch_json_many
+except ImportError:
+    from http_engine import fetch_json_many
+
+# Games in these states have final box scores and game-log entries.
+COMPLETED_STATES = {"OFF", "FINAL"}
+
+
+def scrape_schedule_games(start_date, end_date=None, game_type=2):
+    """Completed games in [start_date, end_date], oldest first.
+
+    Each entry is the schedule feed's game object (``id``, ``season`` and both
+    teams' ``abbrev`` and final ``score``) plus its ``gameDate``. The endpoint
+    returns a week per call, so a month of history costs about five requests,
+    fetched concurrently.
+    """
+    end_date = end_date or date.today()
+    week_starts = []
+    cursor = start_date
+    while cursor <= end_date:
+        week_starts.append(cursor)
+        cursor += timedelta(days=7)
+    urls = {week: f"https://api-web.nhle.com/v1/schedule/{week.isoformat()}" for week in week_starts}
+    weeks, errors = fetch_json_many(urls)
+    if errors:
+        # A missing week would make players look up to date when they are not.
+        raise next(iter(errors.values()))
+
+    games = []
+    for week in weeks.values():
+        for day in week.get("gameWeek", []):
+            game_date = date.fromisoformat(day["date"])
+            if not start_date <= game_date <= end_date:
+                continue
+            for game in day.get("games", []):
+                if game.get("gameType") != game_type or game.get("gameState") not in COMPLETED_STATES:
+                    continue
+                games.append({**game, "gameDate": day["date"]})
+    return sorted(games, key=lambda game: (game["gameDate"], game["id"]))
+
+
+def teams_by_date(games):
+    """Map each date to the teams that finished a game that day."""
+    teams = {}
+    for game in games:
+        day = teams.setdefault(date.fromisoformat(game["gameDate"]), set())
+        day.add(game["homeTeam"]["abbrev"])
+        day.add(game["awayTeam"]["abbrev"])
+    return teams
+
+
+def scrape_completed_games(start_date, end_date=None, game_type=2):
+    """Map each date in [start_date, end_date] to the teams that finished a game that day."""
+    return teams_by_date(scrape_schedule_games(start_date, end_date, game_type))
+
+
+if __name__ == "__main__":
+    week = scrape_completed_games(date.today() - timedelta(days=7))
+    for game_date, teams in sorted(week.items()):
+        print(game_date, sorted(teams))
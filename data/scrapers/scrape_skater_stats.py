@@ -1,24 +1,18 @@
-import json
-import requests
-from pathlib import Path
-
 try:
+    from scrapers.http_engine import fetch_json
+    from scrapers.raw_archive import archive_records
     from scrapers.season_config import DEFAULT_SEASON_ID
 except ImportError:
+    from http_engine import fetch_json
+    from raw_archive import archive_records
     from season_config import DEFAULT_SEASON_ID
 
-RAW_DIR = Path(__file__).parent.parent / "raw"
-RAW_DIR.mkdir(exist_ok=True)
-
 def scrape_skater_stats(season_id=DEFAULT_SEASON_ID):
     url = f"https://api.nhle.com/stats/rest/en/skater/summary?cayenneExp=seasonId={season_id}&limit=-1"
 
-    response = requests.get(url)
-    response.raise_for_status()
-    data = response.json()
+    data = fetch_json(url)
 
-    with open(RAW_DIR / "skater_stats.json", "w") as f:
-        json.dump(data, f, indent=4)
+    archive_records("skater_stats", data.get('data', []))
     print(f"Skater stats scraped: {len(data.get('data', []))} records")
 
     return data
@@ -16,13 +16,13 @@ export default async function middleware(request) {
 
   const playerId = match[1]
 
-  // Fetch player data to populate OG tags
+  // Fetch the lightweight summary (served from the API's in-memory index) for OG tags
   let title = 'Player Profile'
   let description = 'NHL player stats and analytics'
   let ogImageUrl = `${API_BASE}/players/${playerId}/og-image`
 
   try {
-    const res = await fetch(`${API_BASE}/players/${playerId}/detail`)
+    const res = await fetch(`${API_BASE}/players/${playerId}/summary`)
     if (res.ok) {
       const data = await res.json()
       const p = data.player || {}
@@ -16,11 +16,12 @@ export default function Teams() {
         setLoading(true)
         setError(null)
 
-        const res = await fetch(`${API_BASE}/standings`)
+        // Standings rows plus server-derived team metrics, precomputed per refresh.
+        const res = await fetch(`${API_BASE}/teams/aggregates`)
         if (!res.ok) throw new Error(`HTTP ${res.status}`)
 
         const data = await res.json()
-        setStandings(data.standings ?? [])
+        setStandings(data.teams ?? [])
       } catch (e) {
         console.error('Error fetching standings:', e)
         setError('Failed to load team standings')
@@ -1,11 +1,27 @@
 import asyncio
+import threading
 import time
+from collections import OrderedDict
 from typing import List, Dict, Any
 from .supa import supa, fetch_all
+from .season_index import build_season_index
 
 CACHE: List[Dict] = []
 # O(1) lookup index by player id, kept in sync with CACHE via set_cache().
 CACHE_BY_ID: Dict[Any, Dict] = {}
+# Season index partitions (see season_index.py). The current season's partition
+# is replaced wholesale on refresh so concurrent readers always see one
+# consistent snapshot, and is never evicted. Older seasons load on first request
+# and are kept in an LRU capped at MAX_SEASON_PARTITIONS. Seasons with no data are
+# remembered for TTL_SECONDS so unknown ids don't trigger a rebuild per request.
+# _partition_lock only guards the dicts; builds run under a per-season lock.
+_season_index: Dict[str, Any] = {}
+_season_partitions: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_empty_partitions: "OrderedDict[int, tuple]" = OrderedDict()
+_season_locks: Dict[int, threading.Lock] = {}
+_partition_lock = threading.Lock()
+MAX_SEASON_PARTITIONS = 3
+MAX_EMPTY_PARTITIONS = 256
 REFRESH_SECONDS = 600  # 10m
 REFRESH_STATE: Dict[str, Any] = {
     "last_attempt_at": None,
@@ -18,24 +34,93 @@ REFRESH_STATE: Dict[str, Any] = {
 # ---------------------------------------------------------------------------
 # Generic TTL cache — stores {key: (data, timestamp)}
 # ---------------------------------------------------------------------------
-_timed_cache: Dict[str, tuple] = {}
+# Capped as an LRU: keys include client-chosen parameters (date ranges, filters),
+# so expiry on read alone would let clients grow it without bound.
+_timed_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_timed_lock = threading.Lock()
 TTL_SECONDS = 600  # 10 min, same as player cache
+MAX_TIMED_ENTRIES = 2048
 
 
 def timed_get(key: str) -> Any | None:
     """Return cached value if present and fresh, else None."""
-    entry = _timed_cache.get(key)
-    if entry is None:
-        return None
-    data, ts = entry
-    if time.monotonic() - ts > TTL_SECONDS:
-        del _timed_cache[key]
-        return None
-    return data
+    with _timed_lock:
+        entry = _timed_cache.get(key)
+        if entry is None:
+            return None
+        data, ts = entry
+        if time.monotonic() - ts > TTL_SECONDS:
+            del _timed_cache[key]
+            return None
+        _timed_cache.move_to_end(key)
+        return data
 
 
 def timed_set(key: str, data: Any) -> None:
-    _timed_cache[key] = (data, time.monotonic())
+    with _timed_lock:
+        _timed_cache[key] = (data, time.monotonic())
+        _timed_cache.move_to_end(key)
+        while len(_timed_cache) > MAX_TIMED_ENTRIES:
+            _timed_cache.popitem(last=False)
+
+
+def _cached_partition(season_id: int) -> Dict[str, Any] | None:
+    # Caller holds _partition_lock.
+    index = _season_partitions.get(season_id)
+    if index is not None:
+        _season_partitions.move_to_end(season_id)
+        return index
+    entry = _empty_partitions.get(season_id)
+    if entry is not None:
+        index, ts = entry
+        if time.monotonic() - ts <= TTL_SECONDS:
+            return index
+        del _empty_partitions[season_id]
+    return None
+
+
+def get_season_index(season_id: int | None = None) -> Dict[str, Any]:
+    """Return the partition for ``season_id`` (default: current season), loading it if needed."""
+    if season_id is None or season_id == _season_index.get("season_id"):
+        return _season_index
+    with _partition_lock:
+        index = _cached_partition(season_id)
+        if index is not None:
+            return index
+        season_lock = _season_locks.setdefault(season_id, threading.Lock())
+    with season_lock:
+        # Another request may have built it while this one waited.
+        with _partition_lock:
+            index = _cached_partition(season_id)
+            if index is not None:
+                return index
+        index = build_season_index(supa(), season_id)
+        with _partition_lock:
+            if index.get("summaries"):
+                _season_partitions[season_id] = index
+                while len(_season_partitions) > MAX_SEASON_PARTITIONS:
+                    evicted, _ = _season_partitions.popitem(last=False)
+                    print(f"evicted season partition {evicted}")
+            else:
+                _empty_partitions[season_id] = (index, time.monotonic())
+                while len(_empty_partitions) > MAX_EMPTY_PARTITIONS:
+                    _empty_partitions.popitem(last=False)
+            _season_locks.pop(season_id, None)
+        return index
+
+
+def set_season_index(index: Dict[str, Any]) -> None:
+    global _season_index
+    _season_index = index
+    with _partition_lock:
+        # The current season is held separately; drop any stale historical copy.
+        _season_partitions.pop(index.get("season_id"), None)
+        _empty_partitions.pop(index.get("season_id"), None)
+
+
+def cached_season_ids() -> List[int]:
+    current = _season_index.get("season_id")
+    return ([current] if current else []) + list(_season_partitions)
 
 
 def get_refresh_state() -> Dict[str, Any]:
@@ -75,6 +160,8 @@ async def refresh_once():
         print(f"Fetched {len(data)} players from database")
         set_cache([normalize(r) for r in data])
         print(len(CACHE), "players cached")
+        set_season_index(build_season_index(client))
+        print(len(_season_index.get("summaries", {})), "season summaries indexed")
     except Exception as e:
         REFRESH_STATE["last_error_at"] = time.time()
         REFRESH_STATE["last_error"] = str(e)
@@ -0,0 +1,118 @@
+"""Vectorized aggregates over a player's game log.
+
+A log is turned into one float matrix (games x stats, newest game first) so the
+last-N windows are read straight off a cumulative sum and every split is a masked
+or grouped column sum, instead of one Python ``sum()`` per stat per block.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+WINDOWS = (5, 10, 20)
+
+SKATER_STATS = (
+    "goals", "assists", "points", "shots", "pp_points", "plus_minus", "penalty_minutes", "toi_seconds",
+)
+GOALIE_STATS = ("goals_against", "shots_against", "saves", "shutouts")
+GOALIE_DECISIONS = {"wins": "W", "losses": "L", "ot_losses": "OTL"}
+# Games with a recorded TOI and the points scored in them, so per-game and per-60
+# rates skip rows ingested before toi_seconds existed.
+TIMED_STATS = ("toi_games", "toi_points")
+
+
+def season_game_id_range(season_id: int) -> tuple:
+    """Inclusive game-id bounds; NHL game ids start with the season's first year (2025020001 -> 2025-26)."""
+    start_year = int(str(season_id)[:4])
+    return start_year * 1_000_000, (start_year + 1) * 1_000_000 - 1
+
+
+def _stat_matrix(games: List[Dict[str, Any]], is_goalie: bool) -> tuple:
+    stats = GOALIE_STATS if is_goalie else SKATER_STATS
+    matrix = np.array(
+        [[g.get(stat) or 0 for stat in stats] for g in games],
+        dtype=np.float64,
+    ).reshape(len(games), len(stats))
+    if is_goalie:
+        decisions = np.array([g.get("decision") or "" for g in games], dtype=object)
+        flags = np.column_stack(
+            [decisions == code for code in GOALIE_DECISIONS.values()]
+        ).astype(np.float64) if games else np.zeros((0, len(GOALIE_DECISIONS)))
+        matrix = np.hstack([matrix, flags])
+        stats = stats + tuple(GOALIE_DECISIONS)
+    else:
+        timed = np.array([g.get("toi_seconds") is not None for g in games], dtype=np.float64)
+        points = matrix[:, stats.index("points")]
+        matrix = np.hstack([matrix, np.column_stack([timed, points * timed]).reshape(len(games), 2)])
+        stats = stats + TIMED_STATS
+    return stats, matrix
+
+
+def _block(stats: Sequence[str], totals: np.ndarray, gp: int, is_goalie: bool) -> Dict[str, Any]:
+    values = dict(zip(stats, totals.tolist()))
+    if is_goalie:
+        shots_against = values["shots_against"]
+        goals_against = values["goals_against"]
+        return {
+            "games": gp,
+            "wins": int(values["wins"]),
+            "losses": int(values["losses"]),
+            "ot_losses": int(values["ot_losses"]),
+            "goals_against": int(goals_against),
+            "shots_against": int(shots_against),
+            "saves": int(values["saves"]),
+            "shutouts": int(values["shutouts"]),
+            "save_pct": round((shots_against - goals_against) / shots_against, 3) if shots_against > 0 else 0.0,
+            "gaa": round(goals_against / gp, 2) if gp else 0.0,
+        }
+    block = {"games": gp}
+    block.update({stat: int(values[stat]) for stat in SKATER_STATS})
+    block["points_per_game"] = round(values["points"] / gp, 2) if gp else 0.0
+    # TOI rates cover only the games with a recorded TOI; None when there are none.
+    toi = values["toi_seconds"]
+    toi_games = values["toi_games"]
+    block["toi_per_game"] = round(toi / toi_games, 1) if toi_games and toi else None
+    block["points_per_60"] = round(values["toi_points"] * 3600 / toi, 2) if toi else None
+    return block
+
+
+def _grouped(stats, matrix, keys: List[Any], is_goalie: bool) -> Dict[str, Dict[str, Any]]:
+    if not keys:
+        return {}
+    labels, inverse = np.unique(np.array(keys, dtype=str), return_inverse=True)
+    sums = np.zeros((len(labels), matrix.shape[1]))
+    np.add.at(sums, inverse, matrix)
+    counts = np.bincount(inverse, minlength=len(labels))
+    return {
+        str(label): _block(stats, sums[i], int(counts[i]), is_goalie)
+        for i, label in enumerate(labels)
+        if label
+    }
+
+
+def aggregate_game_log(games: List[Dict[str, Any]], is_goalie: bool) -> Dict[str, Any]:
+    """Compute last-N windows, season totals and splits for a newest-first game log."""
+    stats, matrix = _stat_matrix(games, is_goalie)
+    n = len(games)
+    cumulative = np.cumsum(matrix, axis=0) if n else np.zeros((0, len(stats)))
+    empty = np.zeros(len(stats))
+
+    windows = {}
+    for size in WINDOWS:
+        gp = min(size, n)
+        windows[f"last_{size}"] = _block(stats, cumulative[gp - 1] if gp else empty, gp, is_goalie)
+
+    home_road = np.array([g.get("home_road") or "" for g in games], dtype=object)
+    home = home_road == "H"
+    away = home_road == "R"
+
+    return {
+        "windows": windows,
+        "season_totals": _block(stats, cumulative[-1] if n else empty, n, is_goalie),
+        "splits": {
+            "home": _block(stats, matrix[home].sum(axis=0) if n else empty, int(home.sum()), is_goalie),
+            "away": _block(stats, matrix[away].sum(axis=0) if n else empty, int(away.sum()), is_goalie),
+            "by_month": _grouped(stats, matrix, [(g.get("game_date") or "")[:7] for g in games], is_goalie),
+            "by_opponent": _grouped(stats, matrix, [g.get("opponent_abbrev") or "" for g in games], is_goalie),
+        },
+    }
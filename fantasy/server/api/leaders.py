@@ -0,0 +1,68 @@
+"""Per-category top-K leaderboards, precomputed once per refresh.
+
+Each category keeps only its top ``TOP_K`` qualifying players (via ``heapq``), so
+a leaders request slices a few short lists instead of sorting the whole league
+once per widget.
+"""
+
+import heapq
+from typing import Any, Dict, Iterable, List
+
+TOP_K = 25
+
+# category -> (season stat column, higher is better, minimum games played)
+SKATER_CATEGORIES: Dict[str, tuple] = {
+    "points": ("points", True, 0),
+    "goals": ("goals", True, 0),
+    "assists": ("assists", True, 0),
+    "pp_points": ("pp_points", True, 0),
+    "shots": ("shots", True, 0),
+    "plus_minus": ("plus_minus", True, 0),
+    "game_winning_goals": ("game_winning_goals", True, 0),
+    "points_per_game": ("points_per_game", True, 20),
+    "shooting_pct": ("shooting_pct", True, 20),
+    "toi_per_game": ("toi_per_game", True, 20),
+}
+GOALIE_CATEGORIES: Dict[str, tuple] = {
+    "wins": ("wins", True, 0),
+    "shutouts": ("shutouts", True, 0),
+    "saves": ("saves", True, 0),
+    "save_pct": ("save_pct", True, 15),
+    "goals_against_average": ("goals_against_average", False, 15),
+}
+CATEGORIES = {"skater": SKATER_CATEGORIES, "goalie": GOALIE_CATEGORIES}
+
+
+def top_k(
+    rows: Iterable[Dict[str, Any]],
+    column: str,
+    descending: bool,
+    min_games: int,
+    k: int = TOP_K,
+) -> List[Dict[str, Any]]:
+    """Top ``k`` rows by ``column`` among players with at least ``min_games`` GP."""
+    qualifying = (
+        r for r in rows
+        if r.get(column) is not None and (r.get("games_played") or 0) >= min_games
+    )
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    return [
+        {
+            "player_id": r.get("player_id"),
+            "value": r.get(column),
+            "gamesPlayed": r.get("games_played"),
+        }
+        for r in pick(k, qualifying, key=lambda r: r[column])
+    ]
+
+
+def build_leaders(skaters: Dict[int, Dict[str, Any]], goalies: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Precompute every category at its default games threshold."""
+    rows_by_type = {"skater": list(skaters.values()), "goalie": list(goalies.values())}
+    return {
+        season_type: {
+            name: top_k(rows_by_type[season_type], column, descending, min_games)
+            for name, (column, descending, min_games) in categories.items()
+        }
+        for season_type, categories in CATEGORIES.items()
+    }
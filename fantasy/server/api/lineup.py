@@ -0,0 +1,132 @@
+"""Exact fantasy lineup optimization under roster-slot constraints.
+
+Filling slots is a rectangular assignment problem (slot instances x players),
+solved exactly with the Hungarian algorithm. Only the top players per position
+can ever make a lineup (a position eligible for N slots never uses more than its
+N best players), so the pool is pruned to that before solving. Full-league pools
+therefore solve in about the same time as small ones.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Slot -> natural positions that may fill it.
+SLOT_ELIGIBILITY: Dict[str, frozenset] = {
+    "C": frozenset({"C"}),
+    "LW": frozenset({"LW"}),
+    "RW": frozenset({"RW"}),
+    "D": frozenset({"D"}),
+    "G": frozenset({"G"}),
+    "F": frozenset({"C", "LW", "RW"}),
+    "UTIL": frozenset({"C", "LW", "RW", "D"}),
+}
+DEFAULT_SLOTS: Dict[str, int] = {"C": 2, "LW": 2, "RW": 2, "D": 4, "UTIL": 1, "G": 2}
+# The solve is O(slots^2 * pool) in memory and O(slots^3) in time; real rosters
+# stay far below these.
+MAX_SLOTS_PER_TYPE = 20
+MAX_TOTAL_SLOTS = 30
+
+# NHL position codes (player_season_stats.position_code / players.position).
+POSITION_ALIASES = {"L": "LW", "R": "RW"}
+
+_INELIGIBLE = 1e12
+
+
+def normalize_position(position: str | None) -> str:
+    code = str(position or "").upper()
+    return POSITION_ALIASES.get(code, code)
+
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """Min-cost assignment for an n x m matrix with n <= m; returns the column for each row."""
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    assignment = np.full(n, -1, dtype=np.int64)
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def prune_pool(
+    candidates: Sequence[Tuple[int, str, float]], slots: Dict[str, int]
+) -> List[Tuple[int, str, float]]:
+    """Keep only the players that could appear in an optimal lineup."""
+    capacity: Dict[str, int] = {}
+    for slot, count in slots.items():
+        for position in SLOT_ELIGIBILITY[slot]:
+            capacity[position] = capacity.get(position, 0) + count
+    by_position: Dict[str, List[Tuple[int, str, float]]] = {}
+    for candidate in candidates:
+        if candidate[1] in capacity:
+            by_position.setdefault(candidate[1], []).append(candidate)
+    pool = []
+    for position, group in by_position.items():
+        group.sort(key=lambda c: c[2], reverse=True)
+        pool.extend(group[:capacity[position]])
+    return pool
+
+
+def optimize_lineup(
+    candidates: Sequence[Tuple[int, str, float]], slots: Dict[str, int]
+) -> Tuple[List[Tuple[str, int, float]], List[str]]:
+    """Pick the points-maximizing legal lineup.
+
+    ``candidates`` are ``(player_id, position, points)`` with normalized positions.
+    Returns ``(assignments, unfilled)`` where assignments are ``(slot, player_id,
+    points)``. A slot is left unfilled rather than given a negative-value player.
+    """
+    slot_list = [slot for slot, count in slots.items() for _ in range(count)]
+    if not slot_list:
+        return [], []
+    pool = prune_pool(candidates, slots)
+
+    # Columns: pool players, then one zero-value "empty" column per slot.
+    n_slots, n_pool = len(slot_list), len(pool)
+    cost = np.full((n_slots, n_pool + n_slots), _INELIGIBLE)
+    cost[:, n_pool:] = 0.0
+    points = np.array([c[2] for c in pool], dtype=np.float64)
+    positions = np.array([c[1] for c in pool], dtype=object)
+    for row, slot in enumerate(slot_list):
+        eligible = np.isin(positions, list(SLOT_ELIGIBILITY[slot])) if n_pool else np.zeros(0, dtype=bool)
+        cost[row, :n_pool][eligible] = -points[eligible]
+
+    assignment = _hungarian(cost)
+    lineup, unfilled = [], []
+    for row, column in enumerate(assignment):
+        if column < n_pool:
+            player_id, _, score = pool[column]
+            lineup.append((slot_list[row], player_id, score))
+        else:
+            unfilled.append(slot_list[row])
+    return lineup, unfilled
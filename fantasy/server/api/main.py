@@ -1,8 +1,11 @@
-from fastapi import FastAPI, Query, HTTPException, Response
+from fastapi import FastAPI, Query, HTTPException, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 import asyncio
+import math
+from datetime import date
 from typing import List, Dict, Any
+from pydantic import BaseModel
 from .cache import (
     CACHE,
     CACHE_BY_ID,
@@ -11,9 +14,24 @@ from .cache import (
     timed_get,
     timed_set,
     get_refresh_state,
+    get_season_index,
+    cached_season_ids,
 )
 from .supa import supa, fetch_all
-from .og_image import generate_player_card
+from .og_image import generate_player_card, negotiate_format, MEDIA_TYPES
+from .game_log import aggregate_game_log, season_game_id_range
+from .similarity import nearest
+from .scoring import SCORING_PROFILES, STAT_COLUMNS, parse_weights, rank_players
+from .lineup import (
+    DEFAULT_SLOTS,
+    MAX_SLOTS_PER_TYPE,
+    MAX_TOTAL_SLOTS,
+    SLOT_ELIGIBILITY,
+    normalize_position,
+    optimize_lineup,
+)
+from .leaders import CATEGORIES, TOP_K, top_k
+from .season_index import build_summary
 
 client = supa()
 
@@ -56,6 +74,7 @@ def health():
         "ok": cache_ready,
         "degraded": bool(refresh.get("last_error")),
         "players_cached": len(CACHE),
+        "season_partitions": cached_season_ids(),
         "cache_ready": cache_ready,
         "last_refresh_attempt_at": refresh.get("last_attempt_at"),
         "last_refresh_success_at": refresh.get("last_success_at"),
@@ -140,34 +159,25 @@ def _build_career_players() -> List[Dict[str, Any]]:
     return rows
 
 
-def _build_season_players() -> List[Dict[str, Any]]:
-    cache_by_id = CACHE_BY_ID
+def _season_partition(season_id: int | None) -> Dict[str, Any]:
+    """Season index for ``season_id`` (current season when None); 404 if it has no data."""
+    index = get_season_index(season_id)
+    if season_id is not None and not index.get("summaries"):
+        raise HTTPException(status_code=404, detail="Season not found")
+    return index
 
-    # Only the current (latest loaded) season is relevant to the season-scope list.
-    # Filtering server-side avoids pulling every player's full season history, which
-    # also keeps us well under PostgREST's 1000-row response cap.
-    season_id = _latest_loaded_season_id("player_season_stats", "goalie_season_stats")
-    if not season_id:
-        return CACHE
 
-    players_rows = fetch_all(
-        lambda: client.table("players").select(
-            "player_id, first_name, last_name, headshot, position"
-        )
-    )
-    players_by_id = {r.get("player_id"): r for r in players_rows}
+def _build_season_players(index: Dict[str, Any]) -> List[Dict[str, Any]]:
+    cache_by_id = CACHE_BY_ID
 
-    skater_rows = fetch_all(
-        lambda: client.table("player_season_stats")
-        .select("player_id, season_id, team_abbrev, games_played, goals, assists, points, position_code")
-        .eq("season_id", season_id)
-    )
+    # Built from one season's in-memory partition rather than re-reading the
+    # season-stat tables, so any loaded season costs no Supabase round trips.
+    if not index.get("season_id"):
+        return CACHE
 
-    goalie_rows = fetch_all(
-        lambda: client.table("goalie_season_stats")
-        .select("player_id, season_id, team_abbrev, games_played, goals, assists, points")
-        .eq("season_id", season_id)
-    )
+    players_by_id = index.get("players", {})
+    skater_rows = list(index.get("skaters", {}).values())
+    goalie_rows = list(index.get("goalies", {}).values())
 
     # Track which player_ids are goalies so we can assign position="G"
     goalie_ids: set = {row.get("player_id") for row in goalie_rows if row.get("player_id") is not None}
@@ -218,20 +228,38 @@ def players(response: Response,
             team: str = Query(default=""),
             sort_by: str = Query(default="points"),
             sort_order: str = Query(default="desc"),
-            stats_scope: str = Query(default="season", pattern="^(season|career)$")
+            stats_scope: str = Query(default="season", pattern="^(season|career)$"),
+            scoring_profile: str = Query(default="standard"),
+            weights: str = Query(default="", description="Custom scoring, e.g. G:3,A:2,SOG:0.4"),
+            season_id: int | None = Query(default=None, description="Season scope only; defaults to current")
             ) -> Dict[str, Any]:
     response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    if stats_scope == "career" and season_id is not None:
+        raise HTTPException(status_code=422, detail="season_id is only available for season scope")
+    index = _season_partition(season_id)
+    # Sort keys computed from the season index rather than stored on the list rows.
+    index_sort = None
+    if sort_by in {"fantasy", "projectedPoints"}:
+        if stats_scope != "season":
+            raise HTTPException(status_code=422, detail=f"Sorting by {sort_by} is only available for season scope")
+        if sort_by == "fantasy":
+            ranking = rank_players(index, _scoring_weights(scoring_profile, weights))
+            index_sort = ("fantasyPoints", ranking["points_by_id"])
+        else:
+            index_sort = ("projectedPoints", index.get("projected_points", {}))
+
     # Keep career behavior consistent with legacy app data in CACHE (test_database).
     # Season scope is sourced from the new season-stat tables.
     if stats_scope == "career":
         filtered = CACHE if CACHE else _build_career_players()
     else:
-        cached = timed_get("season_players")
+        key = f"season_players:{index.get('season_id')}"
+        cached = timed_get(key)
         if cached is not None:
             filtered = cached
         else:
-            filtered = _build_season_players()
-            timed_set("season_players", filtered)
+            filtered = _build_season_players(index)
+            timed_set(key, filtered)
 
     # search by name
     if q:
@@ -248,7 +276,11 @@ def players(response: Response,
 
     # sorting
     valid_sort_fields = ["points", "goals", "assists", "gamesPlayed", "firstName", "lastName"]
-    if sort_by in valid_sort_fields:
+    if index_sort is not None:
+        reverse = sort_order.lower() == "desc"
+        values = index_sort[1]
+        filtered = sorted(filtered, key=lambda p: values.get(p.get("id"), 0.0), reverse=reverse)
+    elif sort_by in valid_sort_fields:
         reverse = sort_order.lower() == "desc"
         if sort_by in {"firstName", "lastName"}:
             filtered = sorted(filtered, key=lambda p: (p.get(sort_by) or "").lower(), reverse=reverse)
@@ -261,6 +293,9 @@ def players(response: Response,
     start = (page - 1) * limit
     end = start + limit
     page_data = filtered[start:end]
+    if index_sort is not None:
+        field, values = index_sort
+        page_data = [{**p, field: values.get(p.get("id"), 0.0)} for p in page_data]
 
     return {
         "data": page_data,
@@ -270,6 +305,103 @@ def players(response: Response,
     }
 
 
+MAX_BATCH_IDS = 200
+
+
+def _latest_season_rows_for(table: str, player_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Each player's latest season row from ``table`` in a single ``in_()`` query."""
+    rows = fetch_all(
+        lambda: client.table(table)
+        .select("*")
+        .in_("player_id", player_ids)
+        .order("season_id", desc=True)
+    )
+    latest: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        latest.setdefault(row.get("player_id"), row)
+    return latest
+
+
+# Declared before /players/{player_id} so "batch" is not parsed as a player id.
+@app.get("/players/batch")
+def players_batch(ids: str = Query(..., description="Comma-separated player ids")) -> Dict[str, Any]:
+    """Resolve many players at once for comparison views.
+
+    Players in the latest-season index cost nothing; any others are resolved with
+    at most one ``in_()`` query per table, regardless of how many ids are asked for.
+    """
+    try:
+        player_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    if len(player_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    index = get_season_index()
+    players_by_id = index.get("players", {})
+    skaters = index.get("skaters", {})
+    goalies = index.get("goalies", {})
+
+    missing_dim = [pid for pid in player_ids if pid not in players_by_id]
+    missing_season = [pid for pid in player_ids if pid not in skaters and pid not in goalies]
+    fetched_players: Dict[int, Dict[str, Any]] = {}
+    fetched_skaters: Dict[int, Dict[str, Any]] = {}
+    fetched_goalies: Dict[int, Dict[str, Any]] = {}
+    if missing_dim:
+        rows = client.table("players").select("*").in_("player_id", missing_dim).execute().data or []
+        fetched_players = {r.get("player_id"): r for r in rows}
+    if missing_season:
+        fetched_skaters = _latest_season_rows_for("player_season_stats", missing_season)
+        fetched_goalies = _latest_season_rows_for("goalie_season_stats", missing_season)
+
+    results = []
+    missing = []
+    for pid in player_ids:
+        player_row = players_by_id.get(pid) or fetched_players.get(pid)
+        cache_row = CACHE_BY_ID.get(pid)
+        goalie_row = goalies.get(pid) or fetched_goalies.get(pid)
+        skater_row = skaters.get(pid) or fetched_skaters.get(pid)
+        if not player_row and not cache_row and not goalie_row and not skater_row:
+            missing.append(pid)
+            continue
+        position = (player_row or {}).get("position") or (cache_row or {}).get("position")
+        if goalie_row or skater_row:
+            is_goalie = goalie_row is not None
+        else:
+            is_goalie = str(position or "").upper() == "G"
+        season = (goalie_row if is_goalie else skater_row) or {}
+        if not is_goalie:
+            position = season.get("position_code") or position
+        results.append({
+            "player": _player_payload(pid, player_row, cache_row, season, position),
+            "season_type": "goalie" if is_goalie else "skater",
+            "season": season,
+        })
+
+    return {"players": results, "missing": missing}
+
+
+def _scoring_weights(scoring_profile: str, weights: str) -> Dict[str, float]:
+    if weights:
+        try:
+            return parse_weights(weights)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    profile = SCORING_PROFILES.get(scoring_profile)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown scoring profile")
+    return profile
+
+
+@app.get("/scoring-profiles")
+def scoring_profiles() -> Dict[str, Any]:
+    """Built-in fantasy scoring profiles and the stat keys custom weights may use."""
+    return {
+        "profiles": SCORING_PROFILES,
+        "stats": {season_type: list(columns) for season_type, columns in STAT_COLUMNS.items()},
+    }
+
+
 @app.get("/players/{player_id}")
 def get_player(player_id: int) -> Dict[str, Any]:
     """Return a single player by ID."""
@@ -279,6 +411,45 @@ def get_player(player_id: int) -> Dict[str, Any]:
     raise HTTPException(status_code=404, detail="Player not found")
 
 
+@app.get("/players/{player_id}/summary")
+def player_summary(player_id: int, response: Response) -> Dict[str, Any]:
+    """Name, position, team and headline season line for OG/link previews.
+
+    Players in the current season are served from the in-memory season index.
+    Anyone else (injured all season, retired) gets their latest season instead,
+    read once and kept in the timed cache.
+    """
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    index = get_season_index()
+    summary = index.get("summaries", {}).get(player_id)
+    if summary is not None:
+        return summary
+    key = f"player_summary:{player_id}"
+    summary = timed_get(key)
+    if summary is not None:
+        return summary
+    player_row = index.get("players", {}).get(player_id)
+    cache_row = CACHE_BY_ID.get(player_id)
+    if player_row is None and cache_row is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    if player_row is None:
+        player_row = {
+            "first_name": cache_row.get("firstName"),
+            "last_name": cache_row.get("lastName"),
+            "position": cache_row.get("position"),
+            "headshot": cache_row.get("headshot"),
+        }
+    is_goalie = str(player_row.get("position") or "").upper() == "G"
+    season_row = _latest_season_row(player_id, "goalie_season_stats" if is_goalie else "player_season_stats")
+    summary = build_summary(player_id, player_row, season_row, is_goalie)
+    if not season_row:
+        summary["season"] = {}
+    if not summary["player"]["teamAbbr"] and cache_row is not None:
+        summary["player"]["teamAbbr"] = cache_row.get("teamAbbr")
+    timed_set(key, summary)
+    return summary
+
+
 def _num(value: Any) -> float:
     if value is None:
         return 0.0
@@ -310,28 +481,13 @@ def _latest_loaded_season_id(*tables: str) -> int:
     return latest
 
 
-def _build_radar_context(season_type: str) -> Dict[str, Any]:
-    if season_type == "goalie":
-        table = "goalie_season_stats"
-        fields = "player_id, season_id, games_played, wins, save_pct, goals_against_average, shutouts, games_started, shots_against"
-    else:
-        table = "player_season_stats"
-        fields = "player_id, season_id, games_played, goals, assists, shooting_pct, toi_per_game, pp_points, plus_minus"
-
-    season_id = _latest_season_id(table)
-    if season_id == 0:
+def _build_radar_context(season_type: str, index: Dict[str, Any]) -> Dict[str, Any]:
+    season_id = index.get("season_id")
+    if not season_id:
         return {"season_type": season_type, "season_id": None, "count": 0, "players": []}
 
-    min_gp = 10 if season_type == "goalie" else 10
-    response = (
-        client
-        .table(table)
-        .select(fields)
-        .eq("season_id", season_id)
-        .gte("games_played", min_gp)
-        .execute()
-    )
-    rows = response.data or []
+    source = index.get("goalies" if season_type == "goalie" else "skaters", {})
+    rows = [row for row in source.values() if _num(row.get("games_played")) >= 10]
     players = []
 
     for row in rows:
@@ -368,23 +524,25 @@ def _build_radar_context(season_type: str) -> Dict[str, Any]:
 
 @app.get("/player-radar-context")
 def player_radar_context(
-    season_type: str = Query(default="skater", pattern="^(skater|goalie)$")
+    season_type: str = Query(default="skater", pattern="^(skater|goalie)$"),
+    season_id: int | None = Query(default=None),
 ) -> Dict[str, Any]:
-    key = f"radar_context:{season_type}"
+    index = _season_partition(season_id)
+    key = f"radar_context:{index.get('season_id')}:{season_type}"
     cached = timed_get(key)
     if cached is not None:
         return cached
-    result = _build_radar_context(season_type)
+    result = _build_radar_context(season_type, index)
     timed_set(key, result)
     return result
 
 
-def _latest_season_row(player_id: int, table: str) -> Dict[str, Any]:
+def _latest_season_row(player_id: int, table: str, season_id: int | None = None) -> Dict[str, Any]:
+    query = client.table(table).select("*").eq("player_id", player_id)
+    if season_id is not None:
+        query = query.eq("season_id", season_id)
     response = (
-        client
-        .table(table)
-        .select("*")
-        .eq("player_id", player_id)
+        query
         .order("season_id", desc=True)
         .limit(1)
         .execute()
@@ -393,12 +551,15 @@ def _latest_season_row(player_id: int, table: str) -> Dict[str, Any]:
     return rows[0] if rows else {}
 
 
-def _load_recent_games(player_id: int, table: str, limit: int = 10) -> List[Dict[str, Any]]:
+def _load_recent_games(
+    player_id: int, table: str, limit: int = 10, season_id: int | None = None
+) -> List[Dict[str, Any]]:
+    query = client.table(table).select("*").eq("player_id", player_id)
+    if season_id is not None:
+        first_game_id, last_game_id = season_game_id_range(season_id)
+        query = query.gte("game_id", first_game_id).lte("game_id", last_game_id)
     response = (
-        client
-        .table(table)
-        .select("*")
-        .eq("player_id", player_id)
+        query
         .order("game_date", desc=True)
         .limit(limit)
         .execute()
@@ -406,68 +567,128 @@ def _load_recent_games(player_id: int, table: str, limit: int = 10) -> List[Dict
     return response.data or []
 
 
-def _build_skater_form(games: List[Dict[str, Any]]) -> Dict[str, Any]:
-    last5 = games[:5]
-    gp = len(last5)
+FORM_GAMES = 5
+# Flipped off once the functions are reported missing, so an unapplied migration
+# costs one round trip per process rather than one per request. Other errors
+# (timeouts, network) fall back for that request only.
+_form_splits_rpc = True
+# PostgREST "function not found" and Postgres undefined_function.
+MISSING_FUNCTION_CODES = {"PGRST202", "42883"}
+
+
+def _load_form_splits(player_id: int, is_goalie: bool, season_id: int | None) -> List[Dict[str, Any]] | None:
+    """Form and home/away aggregates from the ``*_form_splits`` SQL functions.
+
+    Returns one row per bucket ("form", "home", "away"), or None when the
+    functions are missing (migration not applied yet) or the call failed.
+    """
+    global _form_splits_rpc
+    if not _form_splits_rpc:
+        return None
+    fn = "goalie_form_splits" if is_goalie else "skater_form_splits"
+    params = {"p_player_id": player_id, "p_season_id": season_id, "p_form_games": FORM_GAMES}
+    try:
+        return client.rpc(fn, params).execute().data or []
+    except Exception as e:
+        if str(getattr(e, "code", "")) in MISSING_FUNCTION_CODES:
+            print(f"{fn} rpc missing, aggregating in Python from now on:", e)
+            _form_splits_rpc = False
+        else:
+            print(f"{fn} rpc failed, aggregating in Python for this request:", e)
+        return None
+
+
+def _load_season_games(
+    player_id: int, table: str, season_id: int | None, recent_games: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Every game of the season, newest first; defaults to the season of the latest game."""
+    if season_id is None:
+        if not recent_games or recent_games[0].get("game_id") is None:
+            return []
+        start_year = int(recent_games[0]["game_id"]) // 1_000_000
+        season_id = start_year * 10000 + start_year + 1
+    first_game_id, last_game_id = season_game_id_range(season_id)
+    return fetch_all(
+        lambda: client.table(table)
+        .select("*")
+        .eq("player_id", player_id)
+        .gte("game_id", first_game_id)
+        .lte("game_id", last_game_id)
+        .order("game_date", desc=True)
+    )
+
+
+def _form_split_buckets(games: List[Dict[str, Any]], is_goalie: bool) -> List[Dict[str, Any]]:
+    """Python equivalent of the ``*_form_splits`` SQL functions over a season's games, newest first."""
+    buckets = {
+        "form": games[:FORM_GAMES],
+        "home": [g for g in games if g.get("home_road") == "H"],
+        "away": [g for g in games if g.get("home_road") == "R"],
+    }
+    rows = []
+    for bucket, group in buckets.items():
+        row: Dict[str, Any] = {"bucket": bucket, "games": len(group)}
+        if is_goalie:
+            row["wins"] = sum(1 for g in group if g.get("decision") == "W")
+            row["losses"] = sum(1 for g in group if g.get("decision") == "L")
+            row["ot_losses"] = sum(1 for g in group if g.get("decision") == "OTL")
+            row["goals_against"] = sum(_num(g.get("goals_against")) for g in group)
+            row["shots_against"] = sum(_num(g.get("shots_against")) for g in group)
+        else:
+            for field in ("goals", "assists", "points", "shots"):
+                row[field] = sum(int(_num(g.get(field))) for g in group)
+        rows.append(row)
+    return rows
+
+
+def _build_skater_form(agg: Dict[str, Any]) -> Dict[str, Any]:
+    gp = int(_num(agg.get("games")))
     if gp == 0:
         return {"games": 0, "goals": 0, "assists": 0, "points": 0, "shots": 0, "points_per_game": 0.0}
-    goals = sum(int(_num(g.get("goals"))) for g in last5)
-    assists = sum(int(_num(g.get("assists"))) for g in last5)
-    points = sum(int(_num(g.get("points"))) for g in last5)
-    shots = sum(int(_num(g.get("shots"))) for g in last5)
+    points = int(_num(agg.get("points")))
     return {
         "games": gp,
-        "goals": goals,
-        "assists": assists,
+        "goals": int(_num(agg.get("goals"))),
+        "assists": int(_num(agg.get("assists"))),
         "points": points,
-        "shots": shots,
+        "shots": int(_num(agg.get("shots"))),
         "points_per_game": round(points / gp, 2),
     }
 
 
-def _build_goalie_form(games: List[Dict[str, Any]]) -> Dict[str, Any]:
-    last5 = games[:5]
-    gp = len(last5)
+def _build_goalie_form(agg: Dict[str, Any]) -> Dict[str, Any]:
+    gp = int(_num(agg.get("games")))
     if gp == 0:
         return {"games": 0, "wins": 0, "losses": 0, "ot_losses": 0, "save_pct": 0.0, "gaa": 0.0}
-    wins = sum(1 for g in last5 if g.get("decision") == "W")
-    losses = sum(1 for g in last5 if g.get("decision") == "L")
-    ot_losses = sum(1 for g in last5 if g.get("decision") == "OTL")
-    goals_against = sum(_num(g.get("goals_against")) for g in last5)
-    shots_against = sum(_num(g.get("shots_against")) for g in last5)
+    goals_against = _num(agg.get("goals_against"))
+    shots_against = _num(agg.get("shots_against"))
     save_pct = (shots_against - goals_against) / shots_against if shots_against > 0 else 0.0
-    gaa = goals_against / gp
     return {
         "games": gp,
-        "wins": wins,
-        "losses": losses,
-        "ot_losses": ot_losses,
+        "wins": int(_num(agg.get("wins"))),
+        "losses": int(_num(agg.get("losses"))),
+        "ot_losses": int(_num(agg.get("ot_losses"))),
         "save_pct": round(save_pct, 3),
-        "gaa": round(gaa, 2),
+        "gaa": round(goals_against / gp, 2),
     }
 
 
-def _build_home_away_splits(games: List[Dict[str, Any]], is_goalie: bool) -> Dict[str, Any]:
-    home_games = [g for g in games if g.get("home_road") == "H"]
-    away_games = [g for g in games if g.get("home_road") == "R"]
-
-    def skater_block(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-        gp = len(rows)
-        points = sum(int(_num(g.get("points"))) for g in rows)
-        goals = sum(int(_num(g.get("goals"))) for g in rows)
-        assists = sum(int(_num(g.get("assists"))) for g in rows)
+def _build_home_away_splits(buckets: Dict[str, Dict[str, Any]], is_goalie: bool) -> Dict[str, Any]:
+    def skater_block(agg: Dict[str, Any]) -> Dict[str, Any]:
+        gp = int(_num(agg.get("games")))
+        points = int(_num(agg.get("points")))
         return {
             "games": gp,
-            "goals": goals,
-            "assists": assists,
+            "goals": int(_num(agg.get("goals"))),
+            "assists": int(_num(agg.get("assists"))),
             "points": points,
             "points_per_game": round(points / gp, 2) if gp else 0.0,
         }
 
-    def goalie_block(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
-        gp = len(rows)
-        goals_against = sum(_num(g.get("goals_against")) for g in rows)
-        shots_against = sum(_num(g.get("shots_against")) for g in rows)
+    def goalie_block(agg: Dict[str, Any]) -> Dict[str, Any]:
+        gp = int(_num(agg.get("games")))
+        goals_against = _num(agg.get("goals_against"))
+        shots_against = _num(agg.get("shots_against"))
         save_pct = (shots_against - goals_against) / shots_against if shots_against > 0 else 0.0
         return {
             "games": gp,
@@ -476,11 +697,39 @@ def _build_home_away_splits(games: List[Dict[str, Any]], is_goalie: bool) -> Dic
         }
 
     block = goalie_block if is_goalie else skater_block
-    return {"home": block(home_games), "away": block(away_games)}
+    return {"home": block(buckets.get("home", {})), "away": block(buckets.get("away", {}))}
+
+
+def _player_payload(
+    player_id: int,
+    player_row: Dict[str, Any] | None,
+    cache_row: Dict[str, Any] | None,
+    season: Dict[str, Any] | None,
+    position: Any,
+) -> Dict[str, Any]:
+    player_row = player_row or {}
+    cache_row = cache_row or {}
+    return {
+        "id": player_id,
+        "firstName": player_row.get("first_name") or cache_row.get("firstName"),
+        "lastName": player_row.get("last_name") or cache_row.get("lastName"),
+        "position": position,
+        "teamAbbr": (season or {}).get("team_abbrev") or cache_row.get("teamAbbr"),
+        "headshot": player_row.get("headshot") or cache_row.get("headshot"),
+        "birthDate": player_row.get("birth_date"),
+        "birthCity": player_row.get("birth_city"),
+        "birthCountry": player_row.get("birth_country"),
+        "heightCm": player_row.get("height_cm"),
+        "weightKg": player_row.get("weight_kg"),
+        "shootsCatches": player_row.get("shoots_catches"),
+        "draftYear": player_row.get("draft_year"),
+        "draftRound": player_row.get("draft_round"),
+        "draftOverallPick": player_row.get("draft_overall_pick"),
+    }
 
 
 @app.get("/players/{player_id}/detail")
-def player_detail(player_id: int) -> Dict[str, Any]:
+def player_detail(player_id: int, season_id: int | None = Query(default=None)) -> Dict[str, Any]:
     player_resp = (
         client
         .table("players")
@@ -502,29 +751,26 @@ def player_detail(player_id: int) -> Dict[str, Any]:
     season_table = "goalie_season_stats" if is_goalie else "player_season_stats"
     games_table = "goalie_game_stats" if is_goalie else "player_game_stats"
 
-    season = _latest_season_row(player_id, season_table)
-    # TODO(#8): Add `games_limit` query param so Player Detail can fetch full-season logs for heatmap/timeline.
-    recent_games = _load_recent_games(player_id, games_table, limit=10)
-    form = _build_goalie_form(recent_games) if is_goalie else _build_skater_form(recent_games)
-    splits = _build_home_away_splits(recent_games, is_goalie=is_goalie)
-
-    player_payload = {
-        "id": player_id,
-        "firstName": (player_row or {}).get("first_name") or (cache_row or {}).get("firstName"),
-        "lastName": (player_row or {}).get("last_name") or (cache_row or {}).get("lastName"),
-        "position": position,
-        "teamAbbr": (season or {}).get("team_abbrev") or (cache_row or {}).get("teamAbbr"),
-        "headshot": (player_row or {}).get("headshot") or (cache_row or {}).get("headshot"),
-        "birthDate": (player_row or {}).get("birth_date"),
-        "birthCity": (player_row or {}).get("birth_city"),
-        "birthCountry": (player_row or {}).get("birth_country"),
-        "heightCm": (player_row or {}).get("height_cm"),
-        "weightKg": (player_row or {}).get("weight_kg"),
-        "shootsCatches": (player_row or {}).get("shoots_catches"),
-        "draftYear": (player_row or {}).get("draft_year"),
-        "draftRound": (player_row or {}).get("draft_round"),
-        "draftOverallPick": (player_row or {}).get("draft_overall_pick"),
-    }
+    # Any season already held in memory is answered from its partition; other
+    # explicit seasons fall back to a season-scoped query.
+    index = get_season_index(season_id) if season_id is not None else {}
+    season = (index.get("goalies" if is_goalie else "skaters") or {}).get(player_id)
+    if season is None:
+        season = _latest_season_row(player_id, season_table, season_id)
+    # Full-season logs for heatmap/timeline views come from /players/{id}/games.
+    recent_games = _load_recent_games(player_id, games_table, limit=10, season_id=season_id)
+    # Form and season-long home/away splits are aggregated in Postgres; without
+    # the RPC functions the season's games are read and bucketed here instead.
+    agg_rows = _load_form_splits(player_id, is_goalie, season_id)
+    if agg_rows is None:
+        season_games = _load_season_games(player_id, games_table, season_id, recent_games)
+        agg_rows = _form_split_buckets(season_games, is_goalie)
+    buckets = {row.get("bucket"): row for row in agg_rows}
+    form_agg = buckets.get("form", {})
+    form = _build_goalie_form(form_agg) if is_goalie else _build_skater_form(form_agg)
+    splits = _build_home_away_splits(buckets, is_goalie=is_goalie)
+
+    player_payload = _player_payload(player_id, player_row, cache_row, season, position)
 
     return {
         "player": player_payload,
@@ -536,31 +782,263 @@ def player_detail(player_id: int) -> Dict[str, Any]:
     }
 
 
+def _is_goalie_id(player_id: int) -> bool | None:
+    """Resolve goalie vs skater from in-memory indexes; None if the player is unknown."""
+    index = get_season_index()
+    if player_id in index.get("goalies", {}):
+        return True
+    if player_id in index.get("skaters", {}):
+        return False
+    row = index.get("players", {}).get(player_id) or CACHE_BY_ID.get(player_id)
+    if row is None:
+        return None
+    return str(row.get("position") or "").upper() == "G"
+
+
+@app.get("/players/{player_id}/games")
+def player_games(
+    player_id: int,
+    limit: int | None = Query(default=None, ge=1),
+    start_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+) -> Dict[str, Any]:
+    """Full-season game log with server-side rolling windows and splits.
+
+    Windows (last 5/10/20), season totals and splits cover every game in the
+    requested date range; ``limit`` only trims the returned ``games`` list.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date must not be after end_date")
+    is_goalie = _is_goalie_id(player_id)
+    if is_goalie is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    key = f"games:{player_id}:{start_date}:{end_date}"
+    result = timed_get(key)
+    if result is None:
+        season_id = get_season_index().get("season_id") or _latest_loaded_season_id(
+            "player_season_stats", "goalie_season_stats"
+        )
+        table = "goalie_game_stats" if is_goalie else "player_game_stats"
+
+        def query():
+            q = client.table(table).select("*").eq("player_id", player_id)
+            if season_id:
+                first_game, last_game = season_game_id_range(season_id)
+                q = q.gte("game_id", first_game).lte("game_id", last_game)
+            if start_date:
+                q = q.gte("game_date", start_date.isoformat())
+            if end_date:
+                q = q.lte("game_date", end_date.isoformat())
+            return q.order("game_date", desc=True)
+
+        games = fetch_all(query)
+        result = {
+            "player_id": player_id,
+            "season_type": "goalie" if is_goalie else "skater",
+            "season_id": season_id or None,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+            "total": len(games),
+            "games": games,
+            **aggregate_game_log(games, is_goalie),
+        }
+        timed_set(key, result)
+
+    if limit is not None and limit < len(result["games"]):
+        return {**result, "games": result["games"][:limit]}
+    return result
+
+
+@app.get("/players/{player_id}/projection")
+def player_projection(player_id: int) -> Dict[str, Any]:
+    """Rest-of-season projection computed by the pipeline's projection stage."""
+    projection = get_season_index().get("projections", {}).get(player_id)
+    if projection is None:
+        raise HTTPException(status_code=404, detail="No projection for player")
+    return {"projection": projection}
+
+
+@app.get("/players/{player_id}/similar")
+def similar_players(player_id: int, k: int = Query(default=5, ge=1, le=50)) -> Dict[str, Any]:
+    """Top-k most similar players of the same type by standardized season stat vector."""
+    index = get_season_index()
+    is_goalie = player_id in index.get("goalies", {})
+    season_row = index.get("goalies" if is_goalie else "skaters", {}).get(player_id)
+    if season_row is None:
+        raise HTTPException(status_code=404, detail="No current-season stats for player")
+
+    season_type = "goalie" if is_goalie else "skater"
+    summaries = index.get("summaries", {})
+    similar = []
+    for other_id, distance in nearest(index["similarity"][season_type], season_row, k):
+        summary = summaries.get(other_id) or {}
+        similar.append({
+            **summary.get("player", {"id": other_id}),
+            "distance": round(distance, 4),
+            "similarity": round(1 / (1 + distance), 4),
+        })
+    return {
+        "player_id": player_id,
+        "season_type": season_type,
+        "season_id": index.get("season_id"),
+        "similar": similar,
+    }
+
+
 @app.get("/players/{player_id}/og-image")
-def player_og_image(player_id: int):
-    """Generate a trading-card style OG image for a player."""
-    detail = player_detail(player_id)
+def player_og_image(
+    player_id: int,
+    format: str = Query(default="", pattern="^(|webp|jpeg|jpg|png)$"),
+    quality: int | None = Query(default=None, ge=0, le=100),
+    accept: str = Header(default=""),
+):
+    """Generate a trading-card style OG image for a player.
+
+    The encoding is taken from ``format`` when given, otherwise negotiated from the
+    ``Accept`` header. ``quality`` is the WebP/JPEG quality or the PNG compress level.
+    """
+    fmt = negotiate_format(accept, format)
+    detail = player_detail(player_id, season_id=None)
     player = detail["player"]
     season = detail.get("season") or {}
     season_type = detail.get("season_type", "skater")
     is_goalie = season_type == "goalie"
 
     radar_type = "goalie" if is_goalie else "skater"
-    radar_key = f"radar_context:{radar_type}"
+    index = get_season_index()
+    radar_key = f"radar_context:{index.get('season_id')}:{radar_type}"
     radar = timed_get(radar_key)
     if radar is None:
-        radar = _build_radar_context(radar_type)
+        radar = _build_radar_context(radar_type, index)
         timed_set(radar_key, radar)
     league_players = radar.get("players", [])
 
-    png_bytes = generate_player_card(player, season, season_type, league_players)
+    image_bytes = generate_player_card(player, season, season_type, league_players, fmt=fmt, quality=quality)
+    headers = {"Cache-Control": "public, max-age=600"}
+    if not format:
+        # The body depends on Accept, so shared caches must key on it too.
+        headers["Vary"] = "Accept"
     return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={"Cache-Control": "public, max-age=600"},
+        content=image_bytes,
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
     )
 
 
+@app.get("/leaders")
+def leaders(
+    response: Response,
+    categories: str = Query(default="", description="Comma-separated categories; empty for all"),
+    season_type: str = Query(default="", pattern="^(|skater|goalie)$"),
+    limit: int = Query(default=10, ge=1, le=TOP_K),
+    min_games: int | None = Query(default=None, ge=0),
+) -> Dict[str, Any]:
+    """Top players for many stat categories in one response, split by skater and goalie.
+
+    Served from per-category top-K lists built at refresh. ``min_games`` overrides
+    each category's default threshold; those lists are computed on demand and
+    cached for the TTL.
+    """
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    requested = [c.strip() for c in categories.split(",") if c.strip()]
+    known = set(CATEGORIES["skater"]) | set(CATEGORIES["goalie"])
+    unknown = [c for c in requested if c not in known]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown categories: {', '.join(unknown)}")
+
+    index = get_season_index()
+    summaries = index.get("summaries", {})
+    result: Dict[str, Any] = {"season_id": index.get("season_id")}
+    for kind in ("skater", "goalie"):
+        if season_type and kind != season_type:
+            continue
+        table = index.get("skaters" if kind == "skater" else "goalies", {})
+        board = {}
+        for name, (column, descending, default_min) in CATEGORIES[kind].items():
+            if requested and name not in requested:
+                continue
+            if min_games is None or min_games == default_min:
+                entries = index.get("leaders", {}).get(kind, {}).get(name, [])
+            else:
+                key = f"leaders:{index.get('season_id')}:{kind}:{name}:{min_games}"
+                entries = timed_get(key)
+                if entries is None:
+                    entries = top_k(table.values(), column, descending, min_games)
+                    timed_set(key, entries)
+            board[name] = [
+                {**(summaries.get(e["player_id"]) or {}).get("player", {"id": e["player_id"]}), **e}
+                for e in entries[:limit]
+            ]
+        result[kind] = board
+    return result
+
+
+class LineupRequest(BaseModel):
+    # Candidate pool; omit to optimize over every player in the current season.
+    player_ids: List[int] | None = None
+    slots: Dict[str, int] = DEFAULT_SLOTS
+    scoring_profile: str = "standard"
+    weights: Dict[str, float] | None = None
+
+
+@app.post("/lineup/optimize")
+def lineup_optimize(body: LineupRequest) -> Dict[str, Any]:
+    """Return the fantasy-points-maximizing lineup that fits the roster slots."""
+    unknown_slots = [slot for slot in body.slots if slot not in SLOT_ELIGIBILITY]
+    if unknown_slots:
+        raise HTTPException(status_code=422, detail=f"Unknown roster slots: {', '.join(unknown_slots)}")
+    if any(count < 0 or count > MAX_SLOTS_PER_TYPE for count in body.slots.values()):
+        raise HTTPException(
+            status_code=422, detail=f"Slot counts must be between 0 and {MAX_SLOTS_PER_TYPE}"
+        )
+    if sum(body.slots.values()) > MAX_TOTAL_SLOTS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_TOTAL_SLOTS} roster slots in total")
+
+    if body.weights:
+        weights = body.weights
+        known = set(STAT_COLUMNS["skater"]) | set(STAT_COLUMNS["goalie"])
+        if not set(weights) <= known:
+            raise HTTPException(status_code=422, detail="Unknown scoring stat in weights")
+        if not all(math.isfinite(value) for value in weights.values()):
+            raise HTTPException(status_code=422, detail="Scoring weights must be finite numbers")
+    else:
+        weights = _scoring_weights(body.scoring_profile, "")
+
+    index = get_season_index()
+    ranking = rank_players(index, weights)
+    points_by_id = ranking["points_by_id"]
+    skaters = index.get("skaters", {})
+    goalies = index.get("goalies", {})
+
+    pool_ids = body.player_ids if body.player_ids is not None else list(points_by_id)
+    candidates = []
+    for pid in dict.fromkeys(pool_ids):
+        if pid in goalies:
+            position = "G"
+        elif pid in skaters:
+            position = normalize_position(skaters[pid].get("position_code"))
+        else:
+            continue
+        candidates.append((pid, position, points_by_id.get(pid, 0.0)))
+
+    lineup, unfilled = optimize_lineup(candidates, body.slots)
+    summaries = index.get("summaries", {})
+    return {
+        "profile_hash": ranking["profile_hash"],
+        "total_points": round(sum(points for _, _, points in lineup), 2),
+        "lineup": [
+            {
+                "slot": slot,
+                "player": (summaries.get(pid) or {}).get("player", {"id": pid}),
+                "fantasyPoints": points,
+            }
+            for slot, pid, points in lineup
+        ],
+        "unfilled": unfilled,
+    }
+
+
 @app.get("/teams")
 def teams(response: Response) -> Dict[str, Any]:
     """Return unique team abbreviations from both career and season stats data."""
@@ -587,9 +1065,120 @@ def teams(response: Response) -> Dict[str, Any]:
     timed_set("teams", result)
     return result
 
+@app.get("/teams/aggregates")
+def teams_aggregates(response: Response) -> Dict[str, Any]:
+    """Standings rows enriched with derived rates, special teams and player rollups per team.
+
+    Player rollups (skater_*, goalie_save_pct, *_used, top_scorers) come from
+    season totals, so a player traded mid-season counts entirely for their
+    latest club, including games played for earlier ones. Team-level columns
+    from team_stats are unaffected.
+    """
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    return get_season_index().get("team_aggregates") or {"season_id": None, "teams": [], "league": {}}
+
+
+ROSTER_NAME_SORTS = {"firstName", "lastName"}
+
+
+@app.get("/teams/{team_abbr}/players")
+def team_players(
+    team_abbr: str,
+    response: Response,
+    sort_by: str = Query(default="points", description="Season stat column, firstName or lastName"),
+    sort_order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    position: str = Query(default=""),
+) -> Dict[str, Any]:
+    """Current-season roster for one team, looked up from the per-team roster index.
+
+    Cost is proportional to the roster size, not the league. Numeric sorts use
+    season stat columns (e.g. points, goals, games_played, wins, save_pct).
+    Players missing that column sort last. A player traded mid-season is listed
+    only under their latest club, with their full-season totals.
+    """
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    index = get_season_index()
+    team = team_abbr.upper()
+    roster_ids = index.get("rosters", {}).get(team)
+    if roster_ids is None:
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    summaries = index.get("summaries", {})
+    skaters = index.get("skaters", {})
+    goalies = index.get("goalies", {})
+    roster = []
+    for pid in roster_ids.tolist():
+        summary = summaries.get(pid) or {}
+        player = summary.get("player", {"id": pid})
+        if position and str(player.get("position") or "").upper() != position.upper():
+            continue
+        roster.append({
+            **player,
+            "season_type": summary.get("season_type"),
+            "season": goalies.get(pid) or skaters.get(pid) or {},
+        })
+
+    reverse = sort_order == "desc"
+    if sort_by in ROSTER_NAME_SORTS:
+        roster.sort(key=lambda p: (p.get(sort_by) or "").lower(), reverse=reverse)
+    else:
+        present = [p for p in roster if p["season"].get(sort_by) is not None]
+        absent = [p for p in roster if p["season"].get(sort_by) is None]
+        present.sort(key=lambda p: p["season"][sort_by], reverse=reverse)
+        roster = present + absent
+
+    return {"team": team, "season_id": index.get("season_id"), "total": len(roster), "players": roster}
+
+
+@app.get("/teams/{team_abbr}/games")
+def team_games(
+    team_abbr: str,
+    response: Response,
+    season_id: int | None = Query(default=None),
+    limit: int = Query(default=82, ge=1, le=200),
+) -> Dict[str, Any]:
+    """A team's game log, newest first, from the per-team game facts joined to their games."""
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    team = team_abbr.upper()
+    key = f"team_games:{team}:{season_id}:{limit}"
+    cached = timed_get(key)
+    if cached is not None:
+        return cached
+    query = client.table("team_game_log").select("*").eq("team_abbrev", team)
+    if season_id is not None:
+        query = query.eq("season_id", season_id)
+    rows = query.order("game_date", desc=True).limit(limit).execute().data or []
+    result = {"team": team, "total": len(rows), "games": rows}
+    timed_set(key, result)
+    return result
+
+
+@app.get("/games")
+def games_on_date(
+    response: Response,
+    date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$", description="YYYY-MM-DD"),
+) -> Dict[str, Any]:
+    """Games played on one date, with both sides and final scores."""
+    response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    key = f"games:{date}"
+    cached = timed_get(key)
+    if cached is not None:
+        return cached
+    rows = client.table("games").select("*").eq("game_date", date).order("game_id").execute().data or []
+    result = {"date": date, "total": len(rows), "games": rows}
+    timed_set(key, result)
+    return result
+
+
 @app.get("/standings")
-def standings(response: Response) -> Dict[str, Any]:
+def standings(response: Response, season_id: int | None = Query(default=None)) -> Dict[str, Any]:
     response.headers["Cache-Control"] = LIST_CACHE_CONTROL
+    index = _season_partition(season_id)
+    if index.get("standings"):
+        return {"season_id": index.get("season_id"), "standings": index["standings"]}
+    if season_id is not None:
+        # The fallback below reads the latest season; never label it as another one.
+        return {"season_id": season_id, "standings": []}
     cached = timed_get("standings")
     if cached is not None:
         return cached
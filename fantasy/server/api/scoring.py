@@ -0,0 +1,128 @@
+"""Fantasy scoring: weighted sums over the season stat columns.
+
+Season rows are packed into one stat matrix per season type at refresh, so scoring
+the whole league under any profile is a single matrix-vector product. Rankings
+are memoized per profile hash on the season index, which is rebuilt (and so
+invalidated) on every refresh.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+# Profile stat keys -> season stat columns, per season type.
+SKATER_STAT_COLUMNS: Dict[str, str] = {
+    "G": "goals",
+    "A": "assists",
+    "PTS": "points",
+    "PPG": "power_play_goals",
+    "PPP": "pp_points",
+    "SHG": "sh_goals",
+    "SHP": "sh_points",
+    "GWG": "game_winning_goals",
+    "SOG": "shots",
+    "+/-": "plus_minus",
+    "PIM": "penalty_minutes",
+}
+GOALIE_STAT_COLUMNS: Dict[str, str] = {
+    "W": "wins",
+    "L": "losses",
+    "OTL": "ot_losses",
+    "GS": "games_started",
+    "SV": "saves",
+    "GA": "goals_against",
+    "SO": "shutouts",
+    "G": "goals",
+    "A": "assists",
+    "PIM": "penalty_minutes",
+}
+STAT_COLUMNS = {"skater": SKATER_STAT_COLUMNS, "goalie": GOALIE_STAT_COLUMNS}
+
+SCORING_PROFILES: Dict[str, Dict[str, float]] = {
+    "standard": {
+        "G": 3, "A": 2, "PPP": 1, "SHP": 2, "SOG": 0.4, "+/-": 1,
+        "W": 4, "SV": 0.2, "GA": -2, "SO": 3, "OTL": 1,
+    },
+    "goals_assists": {"G": 1, "A": 1, "W": 2, "SO": 2},
+    "shots_heavy": {
+        "G": 2, "A": 1, "PPP": 0.5, "SOG": 0.5, "+/-": 0.5, "PIM": 0.2,
+        "W": 3, "SV": 0.2, "GA": -1, "SO": 2,
+    },
+}
+
+MAX_CACHED_RANKINGS = 64
+# Guards every partition's "rankings" OrderedDict; scoring itself runs unlocked.
+_rankings_lock = threading.Lock()
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parse ``"G:3,A:2,SOG:0.4"`` into a weights dict; raises ValueError on bad input."""
+    known = set(SKATER_STAT_COLUMNS) | set(GOALIE_STAT_COLUMNS)
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        stat, sep, value = part.rpartition(":")
+        stat = stat.strip().upper()
+        if not sep or stat not in known:
+            raise ValueError(f"Unknown scoring stat in '{part}'")
+        weights[stat] = float(value)
+        if not math.isfinite(weights[stat]):
+            raise ValueError(f"Scoring weight must be a finite number in '{part}'")
+    if not weights:
+        raise ValueError("Empty scoring weights")
+    return weights
+
+
+def profile_hash(weights: Dict[str, float]) -> str:
+    canonical = ",".join(f"{k}:{float(v)!r}" for k, v in sorted(weights.items()))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+def build_stat_matrix(rows: Iterable[Dict[str, Any]], season_type: str) -> Dict[str, Any]:
+    """Pack season rows into ``ids`` and a (players x stats) float matrix."""
+    rows = [r for r in rows if r.get("player_id") is not None]
+    keys = list(STAT_COLUMNS[season_type])
+    columns = [STAT_COLUMNS[season_type][k] for k in keys]
+    return {
+        "keys": keys,
+        "ids": np.array([r["player_id"] for r in rows], dtype=np.int64),
+        "matrix": np.array(
+            [[r.get(col) or 0 for col in columns] for r in rows], dtype=np.float64
+        ).reshape(len(rows), len(columns)),
+    }
+
+
+def _score(stats: Dict[str, Any], weights: Dict[str, float]) -> np.ndarray:
+    vector = np.array([float(weights.get(k, 0)) for k in stats["keys"]])
+    return stats["matrix"] @ vector
+
+
+def rank_players(index: Dict[str, Any], weights: Dict[str, float]) -> Dict[str, Any]:
+    """Fantasy points for every skater and goalie under ``weights``, cached per profile hash."""
+    cache: OrderedDict = index.get("rankings", OrderedDict())
+    key = profile_hash(weights)
+    with _rankings_lock:
+        ranking = cache.get(key)
+        if ranking is not None:
+            cache.move_to_end(key)
+            return ranking
+
+    points_by_id: Dict[int, float] = {}
+    for season_type in ("skater", "goalie"):
+        stats = index.get("scoring", {}).get(season_type)
+        if stats is None or not len(stats["ids"]):
+            continue
+        scores = np.round(_score(stats, weights), 2)
+        points_by_id.update(zip(stats["ids"].tolist(), scores.tolist()))
+
+    ranking = {"profile_hash": key, "points_by_id": points_by_id}
+    with _rankings_lock:
+        cache[key] = ranking
+        if len(cache) > MAX_CACHED_RANKINGS:
+            cache.popitem(last=False)
+    return ranking
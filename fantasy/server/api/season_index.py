@@ -0,0 +1,165 @@
+"""Per-season in-memory indexes (one "partition" per season).
+
+Everything here is computed once per partition load from a handful of paged
+Supabase reads, so hot read paths (OG summaries, crawler traffic) are plain dict
+lookups. The cache refresher rebuilds the current season's partition; older
+seasons are built on demand and held in an LRU (see cache.get_season_index).
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from .supa import fetch_all
+from .similarity import build_similarity_index, SKATER_VECTOR_FIELDS, GOALIE_VECTOR_FIELDS
+from .scoring import build_stat_matrix
+from .leaders import build_leaders
+from .teams import build_roster_index, build_team_aggregates
+
+SKATER_SUMMARY_FIELDS = ("games_played", "points", "goals", "assists")
+GOALIE_SUMMARY_FIELDS = ("games_played", "wins", "save_pct", "goals_against_average")
+
+
+def _latest_season_id(client, *tables: str) -> int:
+    latest = 0
+    for table in tables:
+        rows = (
+            client
+            .table(table)
+            .select("season_id")
+            .order("season_id", desc=True)
+            .limit(1)
+            .execute()
+        ).data or []
+        if rows and rows[0].get("season_id") is not None:
+            latest = max(latest, int(rows[0]["season_id"]))
+    return latest
+
+
+def build_summary(
+    player_id: int,
+    player_row: Dict[str, Any],
+    season_row: Dict[str, Any],
+    is_goalie: bool,
+) -> Dict[str, Any]:
+    """OG/link-preview payload from a players-dimension row and one season row."""
+    if is_goalie:
+        position = player_row.get("position") or "G"
+        fields = GOALIE_SUMMARY_FIELDS
+    else:
+        position = season_row.get("position_code") or player_row.get("position")
+        fields = SKATER_SUMMARY_FIELDS
+    season = {"season_id": season_row.get("season_id")}
+    for field in fields:
+        season[field] = season_row.get(field)
+    return {
+        "player": {
+            "id": player_id,
+            "firstName": player_row.get("first_name") or "",
+            "lastName": player_row.get("last_name") or "",
+            "position": position,
+            "teamAbbr": season_row.get("team_abbrev"),
+            "headshot": player_row.get("headshot"),
+        },
+        "season_type": "goalie" if is_goalie else "skater",
+        "season": season,
+    }
+
+
+def _load_projections(client, season_id: int) -> Dict[int, Dict[str, Any]]:
+    try:
+        rows = fetch_all(
+            lambda: client.table("player_projections").select("*").eq("season_id", season_id)
+        )
+    except Exception as e:
+        # Projections are optional until the projections migration has been applied.
+        print("projections unavailable:", e)
+        return {}
+    return {r["player_id"]: r for r in rows if r.get("player_id") is not None}
+
+
+def build_season_index(client, season_id: int | None = None) -> Dict[str, Any]:
+    """Load one season's player, skater, goalie and team rows and index them.
+
+    ``season_id`` defaults to the latest season with player stats loaded.
+    """
+    if season_id is None:
+        season_id = _latest_season_id(client, "player_season_stats", "goalie_season_stats")
+    index: Dict[str, Any] = {
+        "season_id": season_id or None,
+        "players": {},
+        "skaters": {},
+        "goalies": {},
+        "summaries": {},
+        "similarity": {
+            "skater": build_similarity_index([], SKATER_VECTOR_FIELDS),
+            "goalie": build_similarity_index([], GOALIE_VECTOR_FIELDS),
+        },
+        "scoring": {
+            "skater": build_stat_matrix([], "skater"),
+            "goalie": build_stat_matrix([], "goalie"),
+        },
+        # Fantasy rankings memoized per scoring-profile hash (see scoring.rank_players).
+        "rankings": OrderedDict(),
+        "projections": {},
+        "projected_points": {},
+        "leaders": build_leaders({}, {}),
+        "team_aggregates": build_team_aggregates(None, [], {}, {}, {}),
+        "rosters": {},
+        "standings": [],
+    }
+    if not season_id:
+        return index
+
+    skater_rows = fetch_all(
+        lambda: client.table("player_season_stats").select("*").eq("season_id", season_id)
+    )
+    goalie_rows = fetch_all(
+        lambda: client.table("goalie_season_stats").select("*").eq("season_id", season_id)
+    )
+    # A season without stat rows (unknown or not loaded yet) needs nothing else.
+    if not skater_rows and not goalie_rows:
+        return index
+    players_rows: List[Dict[str, Any]] = fetch_all(lambda: client.table("players").select("*"))
+
+    players = {r["player_id"]: r for r in players_rows if r.get("player_id") is not None}
+    skaters = {r["player_id"]: r for r in skater_rows if r.get("player_id") is not None}
+    goalies = {r["player_id"]: r for r in goalie_rows if r.get("player_id") is not None}
+
+    team_rows = fetch_all(
+        lambda: client.table("team_stats").select("*").eq("season_id", season_id)
+    )
+    projections = _load_projections(client, season_id)
+
+    summaries: Dict[int, Dict[str, Any]] = {}
+    for player_id, row in skaters.items():
+        summaries[player_id] = build_summary(player_id, players.get(player_id) or {}, row, is_goalie=False)
+    for player_id, row in goalies.items():
+        summaries[player_id] = build_summary(player_id, players.get(player_id) or {}, row, is_goalie=True)
+
+    index.update({
+        "players": players,
+        "skaters": skaters,
+        "goalies": goalies,
+        "summaries": summaries,
+        "projections": projections,
+        "projected_points": {
+            pid: row["ros_points"] for pid, row in projections.items() if row.get("ros_points") is not None
+        },
+        "leaders": build_leaders(skaters, goalies),
+        "team_aggregates": build_team_aggregates(season_id, team_rows, skaters, goalies, summaries),
+        "rosters": build_roster_index(skaters, goalies),
+        "standings": sorted(
+            team_rows,
+            key=lambda r: (r.get("points") or 0, r.get("goals_for") or 0),
+            reverse=True,
+        ),
+        "similarity": {
+            "skater": build_similarity_index(skaters.values(), SKATER_VECTOR_FIELDS),
+            "goalie": build_similarity_index(goalies.values(), GOALIE_VECTOR_FIELDS),
+        },
+        "scoring": {
+            "skater": build_stat_matrix(skaters.values(), "skater"),
+            "goalie": build_stat_matrix(goalies.values(), "goalie"),
+        },
+    })
+    return index
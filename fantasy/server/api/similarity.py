@@ -0,0 +1,69 @@
+"""Nearest-neighbour player similarity over standardized season stat vectors.
+
+The vectors use the same axes as the player radar chart. Each refresh builds one
+z-scored matrix per season type, so a query is a single vectorized distance
+computation plus ``argpartition`` rather than any database work.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+SKATER_VECTOR_FIELDS = ("goals", "assists", "shooting_pct", "toi_per_game", "pp_points", "plus_minus")
+GOALIE_VECTOR_FIELDS = ("wins", "save_pct", "goals_against_average", "shutouts", "games_started", "shots_against")
+
+# Same peer floor as the radar context, so tiny samples don't dominate the scale.
+MIN_GAMES_PLAYED = 10
+
+
+def _vector(row: Dict[str, Any], fields) -> List[float]:
+    return [float(row.get(field) or 0) for field in fields]
+
+
+def build_similarity_index(rows: Iterable[Dict[str, Any]], fields) -> Dict[str, Any]:
+    """Standardize every qualifying player's stat vector into one matrix."""
+    peers = [
+        r for r in rows
+        if r.get("player_id") is not None and (r.get("games_played") or 0) >= MIN_GAMES_PLAYED
+    ]
+    ids = np.array([r["player_id"] for r in peers], dtype=np.int64)
+    raw = np.array([_vector(r, fields) for r in peers], dtype=np.float64).reshape(len(peers), len(fields))
+    mean = raw.mean(axis=0) if len(peers) else np.zeros(len(fields))
+    std = raw.std(axis=0) if len(peers) else np.ones(len(fields))
+    std[std == 0] = 1.0
+    matrix = (raw - mean) / std
+    return {
+        "fields": fields,
+        "ids": ids,
+        "row_of": {int(pid): i for i, pid in enumerate(ids)},
+        "mean": mean,
+        "std": std,
+        "matrix": matrix,
+        # |a - b|^2 = |a|^2 - 2a.b + |b|^2, so a query is one matrix-vector product.
+        "sq_norms": (matrix ** 2).sum(axis=1),
+    }
+
+
+def nearest(index: Dict[str, Any], row: Dict[str, Any], k: int) -> List[tuple]:
+    """Return up to ``k`` ``(player_id, distance)`` pairs closest to ``row``, nearest first."""
+    matrix = index["matrix"]
+    if not len(matrix):
+        return []
+    player_id = row.get("player_id")
+    position = index["row_of"].get(player_id)
+    if position is not None:
+        target = matrix[position]
+    else:
+        # Players under the games floor are still searchable against the peer set.
+        target = (np.array(_vector(row, index["fields"])) - index["mean"]) / index["std"]
+
+    squared = index["sq_norms"] - 2 * (matrix @ target) + target @ target
+    distances = np.sqrt(np.maximum(squared, 0.0))
+    if position is not None:
+        distances[position] = np.inf
+    count = min(k, len(distances) - (1 if position is not None else 0))
+    if count <= 0:
+        return []
+    candidates = np.argpartition(distances, count - 1)[:count]
+    candidates = candidates[np.argsort(distances[candidates])]
+    return [(int(index["ids"][i]), float(distances[i])) for i in candidates]
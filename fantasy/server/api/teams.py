@@ -0,0 +1,132 @@
+"""Team-level rollups of team_stats and player season stats, built once per refresh."""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+# team_stats only carries team_full_name, and the pipeline does not load the teams
+# table, so names are mapped here; mirrors TEAM_ABBR_BY_NAME in client teamColors.js.
+# A franchise rename needs an entry here and in the client.
+TEAM_ABBR_BY_NAME: Dict[str, str] = {
+    "anaheim ducks": "ANA", "boston bruins": "BOS", "buffalo sabres": "BUF",
+    "carolina hurricanes": "CAR", "columbus blue jackets": "CBJ", "calgary flames": "CGY",
+    "chicago blackhawks": "CHI", "colorado avalanche": "COL", "dallas stars": "DAL",
+    "detroit red wings": "DET", "edmonton oilers": "EDM", "florida panthers": "FLA",
+    "los angeles kings": "LAK", "minnesota wild": "MIN", "montreal canadiens": "MTL", "montréal canadiens": "MTL",
+    "new jersey devils": "NJD", "nashville predators": "NSH", "new york islanders": "NYI",
+    "new york rangers": "NYR", "ottawa senators": "OTT", "philadelphia flyers": "PHI",
+    "pittsburgh penguins": "PIT", "seattle kraken": "SEA", "san jose sharks": "SJS",
+    "st. louis blues": "STL", "st louis blues": "STL", "tampa bay lightning": "TBL",
+    "toronto maple leafs": "TOR", "utah hockey club": "UTA", "utah mammoth": "UTA", "vancouver canucks": "VAN",
+    "vegas golden knights": "VGK", "winnipeg jets": "WPG", "washington capitals": "WSH",
+}
+
+SKATER_ROLLUP = ("goals", "assists", "points", "pp_points", "shots", "penalty_minutes")
+GOALIE_ROLLUP = ("saves", "shots_against")
+TOP_SCORERS = 3
+
+
+def team_abbr_from_name(name: str | None) -> str | None:
+    return TEAM_ABBR_BY_NAME.get((name or "").lower())
+
+
+def current_team(team_abbrevs: str | None) -> str:
+    """Traded players carry "OLD,NEW" in team_abbrev; attribute them to the latest club.
+
+    Season rows hold one total across clubs, so the whole season goes with the
+    player; splitting it would need the per-game rows (player_game_stats.team_abbrev).
+    """
+    return (team_abbrevs or "").split(",")[-1].strip()
+
+
+def build_roster_index(
+    skaters: Dict[int, Dict[str, Any]], goalies: Dict[int, Dict[str, Any]]
+) -> Dict[str, np.ndarray]:
+    """Team abbreviation -> array of player ids on that team's current-season roster."""
+    rosters: Dict[str, List[int]] = {}
+    for rows in (skaters, goalies):
+        for player_id, row in rows.items():
+            team = current_team(row.get("team_abbrev"))
+            if team:
+                rosters.setdefault(team.upper(), []).append(player_id)
+    return {team: np.array(ids, dtype=np.int64) for team, ids in rosters.items()}
+
+
+def _group_sums(rows: List[Dict[str, Any]], columns) -> tuple:
+    teams = np.array([current_team(r.get("team_abbrev")) for r in rows], dtype=str)
+    matrix = np.array(
+        [[r.get(c) or 0 for c in columns] for r in rows], dtype=np.float64
+    ).reshape(len(rows), len(columns))
+    labels, inverse = np.unique(teams, return_inverse=True)
+    sums = np.zeros((len(labels), len(columns)))
+    np.add.at(sums, inverse, matrix)
+    counts = np.bincount(inverse, minlength=len(labels))
+    return {str(label): i for i, label in enumerate(labels)}, sums, counts
+
+
+def _rate(numerator: float, denominator: float, digits: int = 2) -> float:
+    return round(numerator / denominator, digits) if denominator else 0.0
+
+
+def build_team_aggregates(
+    season_id: int | None,
+    team_rows: List[Dict[str, Any]],
+    skaters: Dict[int, Dict[str, Any]],
+    goalies: Dict[int, Dict[str, Any]],
+    summaries: Dict[int, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Derived team metrics plus a group-by of player season stats per team."""
+    skater_rows = list(skaters.values())
+    skater_pos, skater_sums, skater_counts = _group_sums(skater_rows, SKATER_ROLLUP)
+    goalie_pos, goalie_sums, goalie_counts = _group_sums(list(goalies.values()), GOALIE_ROLLUP)
+
+    scorers: Dict[str, List[Dict[str, Any]]] = {}
+    for row in sorted(skater_rows, key=lambda r: r.get("points") or 0, reverse=True):
+        team = current_team(row.get("team_abbrev"))
+        bucket = scorers.setdefault(team, [])
+        if len(bucket) < TOP_SCORERS:
+            player = (summaries.get(row.get("player_id")) or {}).get("player", {"id": row.get("player_id")})
+            bucket.append({**player, "points": row.get("points"), "goals": row.get("goals"), "assists": row.get("assists")})
+
+    teams = []
+    for row in team_rows:
+        abbr = team_abbr_from_name(row.get("team_full_name"))
+        gp = row.get("games_played") or 0
+        goals_for = row.get("goals_for") or 0
+        goals_against = row.get("goals_against") or 0
+        pp_pct = row.get("power_play_pct") or 0.0
+        pk_pct = row.get("penalty_kill_pct") or 0.0
+
+        record = dict(row)
+        record.update({
+            "team_abbrev": abbr,
+            "points_pct": _rate(row.get("points") or 0, 2 * gp, 3),
+            "goal_differential": goals_for - goals_against,
+            "goal_differential_per_game": _rate(goals_for - goals_against, gp),
+            "special_teams_index": round(pp_pct + pk_pct, 3),
+        })
+
+        i = skater_pos.get(abbr)
+        totals = dict(zip(SKATER_ROLLUP, skater_sums[i].tolist())) if i is not None else {}
+        record.update({f"skater_{c}": int(totals.get(c, 0)) for c in SKATER_ROLLUP})
+        record["skaters_used"] = int(skater_counts[i]) if i is not None else 0
+
+        j = goalie_pos.get(abbr)
+        saves, shots_against = goalie_sums[j].tolist() if j is not None else (0, 0)
+        record["goalie_save_pct"] = _rate(saves, shots_against, 3)
+        record["goalies_used"] = int(goalie_counts[j]) if j is not None else 0
+        record["top_scorers"] = scorers.get(abbr, [])
+        teams.append(record)
+
+    teams.sort(key=lambda t: (t.get("points") or 0, t.get("goals_for") or 0), reverse=True)
+
+    league: Dict[str, Any] = {}
+    for metric in ("goals_for_per_game", "goals_against_per_game", "points", "goal_differential"):
+        values = np.array([t.get(metric) or 0 for t in teams], dtype=np.float64)
+        league[metric] = {
+            "min": float(values.min()) if len(values) else 0.0,
+            "max": float(values.max()) if len(values) else 0.0,
+            "avg": round(float(values.mean()), 3) if len(values) else 0.0,
+        }
+
+    return {"season_id": season_id, "teams": teams, "league": league}
@@ -0,0 +1,70 @@
+"""Benchmark the lineup optimizer over realistic pool sizes.
+
+Run from fantasy/server:  python bench_lineup.py [runs]
+
+Also cross-checks the solver against brute force on small pools.
+"""
+
+import itertools
+import random
+import sys
+import time
+
+from api.lineup import DEFAULT_SLOTS, SLOT_ELIGIBILITY, optimize_lineup
+
+POSITION_MIX = ["C"] * 30 + ["LW"] * 25 + ["RW"] * 25 + ["D"] * 35 + ["G"] * 10
+SLOT_CONFIGS = {
+    "default": DEFAULT_SLOTS,
+    "deep": {"C": 3, "LW": 3, "RW": 3, "F": 2, "D": 5, "UTIL": 2, "G": 3},
+}
+
+
+def _pool(size, rng):
+    return [(i, rng.choice(POSITION_MIX), round(rng.gauss(60, 40), 1)) for i in range(size)]
+
+
+def _brute_force(candidates, slots):
+    slot_list = [s for s, c in slots.items() for _ in range(c)]
+    best = 0.0
+    options = list(candidates) + [None] * len(slot_list)
+    for picks in itertools.permutations(range(len(options)), len(slot_list)):
+        total, seen = 0.0, set()
+        for slot, pick in zip(slot_list, picks):
+            cand = options[pick]
+            if cand is None:
+                continue
+            if cand[1] not in SLOT_ELIGIBILITY[slot] or cand[0] in seen:
+                break
+            seen.add(cand[0])
+            total += cand[2]
+        else:
+            best = max(best, total)
+    return best
+
+
+def check(rng, trials=30):
+    slots = {"C": 1, "LW": 1, "D": 1, "UTIL": 1, "G": 1}
+    for _ in range(trials):
+        pool = _pool(7, rng)
+        lineup, _ = optimize_lineup(pool, slots)
+        got = sum(p for _, _, p in lineup)
+        assert abs(got - _brute_force(pool, slots)) < 1e-6, (pool, lineup)
+    print(f"brute-force cross-check: {trials} pools OK")
+
+
+def main(runs: int = 20):
+    rng = random.Random(7)
+    check(rng)
+    print(f"{'slots':<8} {'pool':>6} {'ms/solve':>9}")
+    for name, slots in SLOT_CONFIGS.items():
+        for size in (50, 200, 900, 2000):
+            pools = [_pool(size, rng) for _ in range(runs)]
+            start = time.perf_counter()
+            for pool in pools:
+                optimize_lineup(pool, slots)
+            elapsed_ms = (time.perf_counter() - start) / runs * 1000
+            print(f"{name:<8} {size:>6} {elapsed_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,75 @@
+"""Benchmark OG card encoding: encode time vs. byte size per format and level.
+
+Run from fantasy/server:  python bench_og_image.py [runs]
+
+Rendering is done once with a representative player and league so only the
+encoder is measured. Network fetches (headshot/logo) are skipped.
+"""
+
+import io
+import sys
+import time
+
+from api import og_image
+from api.og_image import encode_image, render_player_card
+
+CONFIGS = [
+    ("png", "optimize", None),
+    ("png", "level 1", 1),
+    ("png", "level 6", 6),
+    ("png", "level 9", 9),
+    ("jpeg", "q70", 70),
+    ("jpeg", "q85", 85),
+    ("jpeg", "q95", 95),
+    ("webp", "ll e0", 0),
+    ("webp", "ll e50", 50),
+    ("webp", "ll e100", 100),
+    ("webp", "lossy q80", None),
+]
+
+
+def _sample_card():
+    player = {"id": 8478402, "firstName": "Connor", "lastName": "McDavid", "position": "C", "teamAbbr": "EDM"}
+    season = {"season_id": 20252026, "games_played": 60, "points": 92, "goals": 35, "assists": 57}
+    league = [
+        {
+            "player_id": 8478402 if i == 0 else i,
+            "goals": 35 - i % 30,
+            "assists": 57 - i % 50,
+            "shooting_pct": 0.15 - (i % 10) / 100,
+            "toi_per_game": 1300 - i,
+            "pp_points": 30 - i % 25,
+            "plus_minus": 15 - i % 30,
+        }
+        for i in range(400)
+    ]
+    return render_player_card(player, season, "skater", league)
+
+
+def _encode(img, fmt, level):
+    if fmt == "png" and level is None:
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", optimize=True)
+        return buf.getvalue()
+    if fmt == "webp" and level is None:
+        buf = io.BytesIO()
+        img.save(buf, format="WEBP", quality=80, method=og_image.WEBP_METHOD)
+        return buf.getvalue()
+    return encode_image(img, fmt, level)
+
+
+def main(runs: int = 10):
+    og_image._fetch_image = lambda url: None
+    img = _sample_card()
+    print(f"{'format':<6} {'setting':<10} {'ms/encode':>10} {'bytes':>9}")
+    for fmt, label, level in CONFIGS:
+        data = _encode(img, fmt, level)
+        start = time.perf_counter()
+        for _ in range(runs):
+            _encode(img, fmt, level)
+        elapsed_ms = (time.perf_counter() - start) / runs * 1000
+        print(f"{fmt:<6} {label:<10} {elapsed_ms:>10.1f} {len(data):>9}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)